@@ -1,45 +1,122 @@
 from starlette.exceptions import HTTPException as StarletteHTTPException
-from fastapi import FastAPI, Request, status
-from fastapi.responses import JSONResponse
-from fastapi.encoders import jsonable_encoder
+from fastapi import Depends, FastAPI, Request, status
 from fastapi.exceptions import RequestValidationError
 from fastapi_jwt_auth.exceptions import AuthJWTException
-from .core.models.error_response import ErrorSchema, ErrorResponseSchema
+from .core.utilities.responses import ORJSONResponse
+from .core.utilities.compression import CompressionMiddleware
+from .core.utilities.metrics import metrics
+from .core.utilities.jwt_config import EmployeeRoleChecker, load_jwt_config
+from .core.constants.employee_roles import EmployeeRole
+from .core.utilities.invalidation import (
+    CACHE_INVALIDATION_ENABLED,
+    invalidation_bus,
+)
+from .core.models.error_response import ErrorResponseSchema
+from .core.error.error_body import (
+    ErrorBody,
+    ErrorDetail,
+    error_response,
+    method_not_allowed_body,
+    static_error_body,
+)
 from .core.constants.error_type import (
     UNAUTHORIZED,
     NOT_FOUND,
-    METHOD_NOT_ALLOWED,
     UNKNOWN_ERROR,
     UNPROCESSABLE_VALUE,
 )
 from .features.auth.routers import auth_router
 from .features.account import employee_router
 from .features.account import customer_router
+from .features.account.employee import controller as employee_controller
+from .features.account.customer import controller as customer_controller
+from .features.auth import controller as session_controller
 from .features.inventory import inventory_item_router
+from .features.inventory.item import controller as inventory_item_controller
+from .features.inventory.issue import controller as inventory_issue_controller
+from .features.inventory.purchase import (
+    controller as inventory_purchase_controller,
+)
+from .features.inventory.forecast import (
+    controller as inventory_forecast_controller,
+)
 from .features.inventory import inventory_issue_router
 from .features.inventory import inventory_purchase_router
+from .features.inventory import inventory_forecast_router
+from .features.inventory import inventory_report_router
+from .features.inventory import inventory_unit_router
+from .features.inventory.unit import controller as inventory_unit_controller
 from .features.restaurant import menu_router
+from .features.restaurant.menu import controller as menu_controller
+
+
+api = FastAPI(
+    responses={422: {"model": ErrorResponseSchema}},
+    default_response_class=ORJSONResponse,
+)
+api.add_middleware(
+    CompressionMiddleware,
+    route_classes={
+        "/inventory/issue/export": "export",
+        "/inventory/purchase/export": "export",
+    },
+)
+
+
+@api.on_event("startup")
+def load_jwt_keys():
+    # fail on a bad key configuration now rather than on the first request
+    load_jwt_config()
+
 
+@api.on_event("startup")
+async def create_indexes():
+    await inventory_item_controller.create_indexes()
+    await inventory_issue_controller.create_indexes()
+    await inventory_purchase_controller.create_indexes()
+    await inventory_forecast_controller.create_indexes()
+    await inventory_unit_controller.create_indexes()
+    await menu_controller.create_indexes()
+    await employee_controller.create_indexes()
+    await customer_controller.create_indexes()
+    await session_controller.create_indexes()
+    await invalidation_bus.create_indexes()
 
-api = FastAPI(responses={422: {"model": ErrorResponseSchema}})
+
+@api.on_event("startup")
+async def warm_caches():
+    await inventory_unit_controller.refresh_unit_registry()
+    await inventory_item_controller.refresh_reference_caches()
+    await menu_controller.refresh_reference_caches()
+
+
+@api.on_event("startup")
+async def start_cache_invalidation():
+    if CACHE_INVALIDATION_ENABLED:
+        invalidation_bus.start()
+
+
+@api.on_event("shutdown")
+async def stop_cache_invalidation():
+    await invalidation_bus.stop()
+
+
+@api.on_event("shutdown")
+def stop_forecast_executor():
+    inventory_forecast_controller.shutdown_forecast_executor()
 
 
 @api.exception_handler(
     AuthJWTException,
 )
 def authjwt_exception_handler(request: Request, exception: AuthJWTException):
-    return JSONResponse(
+    return error_response(
         status_code=exception.status_code,
-        content=ErrorResponseSchema(
-            success=False,
-            errors=[
-                ErrorSchema(
-                    type=UNAUTHORIZED,
-                    message=exception.message,
-                    location=["cookies", "access_token"],
-                )
-            ],
-        ).dict(),
+        body=static_error_body(
+            type=UNAUTHORIZED,
+            message=exception.message,
+            location=("cookies", "access_token"),
+        ),
     )
 
 
@@ -47,59 +124,42 @@ def authjwt_exception_handler(request: Request, exception: AuthJWTException):
 async def http_exception_handler(
     request: Request, exception: StarletteHTTPException
 ):
-    if type(exception.detail) == ErrorResponseSchema:
-        return JSONResponse(
+    if type(exception.detail) == ErrorBody:
+        return error_response(
             status_code=exception.status_code,
-            content=exception.detail.dict(),
+            body=exception.detail.render(),
         )
 
     if exception.status_code == 404:
-        return JSONResponse(
+        return error_response(
             status_code=status.HTTP_404_NOT_FOUND,
-            content=jsonable_encoder(
-                ErrorResponseSchema(
-                    success=False,
-                    errors=[
-                        ErrorSchema(
-                            type=NOT_FOUND,
-                            message=f"this path/route[{request.url}] does not exist. double check you url",
-                            location=["path"],
-                        )
-                    ],
-                ).dict()
-            ),
+            body=ErrorBody(
+                errors=[
+                    ErrorDetail(
+                        type=NOT_FOUND,
+                        message=f"this path/route[{request.url}] does not exist. double check you url",
+                        location=["path"],
+                    )
+                ],
+            ).render(),
         )
     elif exception.status_code == 405:
-        return JSONResponse(
+        return error_response(
             status_code=status.HTTP_405_METHOD_NOT_ALLOWED,
-            content=jsonable_encoder(
-                ErrorResponseSchema(
-                    success=False,
-                    errors=[
-                        ErrorSchema(
-                            type=METHOD_NOT_ALLOWED,
-                            message=f"this method [{request.method}] is not allowed for this route. try using an other method",
-                            location=["path"],
-                        )
-                    ],
-                ).dict()
-            ),
+            body=method_not_allowed_body(method=request.method),
         )
 
-    return JSONResponse(
+    return error_response(
         status_code=exception.status_code,
-        content=jsonable_encoder(
-            ErrorResponseSchema(
-                success=False,
-                errors=[
-                    ErrorSchema(
-                        type=UNKNOWN_ERROR,
-                        message=str(exception.detail),
-                        location=[],
-                    )
-                ],
-            ).dict()
-        ),
+        body=ErrorBody(
+            errors=[
+                ErrorDetail(
+                    type=UNKNOWN_ERROR,
+                    message=str(exception.detail),
+                    location=[],
+                )
+            ],
+        ).render(),
     )
 
 
@@ -107,21 +167,18 @@ async def http_exception_handler(
 async def http_exception_handler(
     request: Request, exception: RequestValidationError
 ):
-    return JSONResponse(
+    return error_response(
         status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
-        content=jsonable_encoder(
-            ErrorResponseSchema(
-                success=False,
-                errors=[
-                    ErrorSchema(
-                        type=UNPROCESSABLE_VALUE,
-                        message=error.get("msg"),
-                        location=error.get("loc"),
-                    )
-                    for error in exception.errors()
-                ],
-            ).dict()
-        ),
+        body=ErrorBody(
+            errors=[
+                ErrorDetail(
+                    type=UNPROCESSABLE_VALUE,
+                    message=error.get("msg"),
+                    location=error.get("loc"),
+                )
+                for error in exception.errors()
+            ],
+        ).render(),
     )
 
 
@@ -132,6 +189,17 @@ api.include_router(customer_router, prefix="/account/customer")
 api.include_router(inventory_item_router, prefix="/inventory/item")
 api.include_router(inventory_purchase_router, prefix="/inventory/purchase")
 api.include_router(inventory_issue_router, prefix="/inventory/issue")
+api.include_router(inventory_forecast_router, prefix="/inventory/forecast")
+api.include_router(inventory_report_router, prefix="/inventory/report")
+api.include_router(inventory_unit_router, prefix="/inventory/unit")
+
+
+@api.get(
+    "/api/metrics",
+    dependencies=[Depends(EmployeeRoleChecker(EmployeeRole.MANAGE_EMPLOYEES))],
+)
+def get_metrics():
+    return {"success": True, "metrics": metrics.snapshot()}
 
 
 @api.get("/api")
@@ -1,4 +1,6 @@
 from enum import Enum
+from typing import Iterable, NamedTuple
+import numpy as np
 
 
 class MeasurementUnit(str, Enum):
@@ -43,7 +45,7 @@ measurement_unit_value = {
     "milliliter": 1,
     "juice glass": 350,
     "tea cup": 300,
-    "soda_botel": 300,
+    "soda botel": 300,
     "plastic soda botel": 500,
     "piece": 1,
     "bunch": 1,
@@ -55,7 +57,7 @@ measurement_unit_value = {
 measurement_unit_nickname = {
     "juice glass": "glass",
     "tea cup": "cup",
-    "soda_botel": "botel",
+    "soda botel": "botel",
     "plastic soda botel": "plastic",
 }
 
@@ -90,13 +92,104 @@ count = [
 ]
 
 
+class MeasurementDimension(str, Enum):
+    WEIGHT = "weight"
+    VOLUME = "volume"
+    COUNT = "count"
+
+
+class UnitDefinition(NamedTuple):
+    dimension: MeasurementDimension
+    factor: float
+
+
+def unit_key(unit) -> str:
+    # enum members hash by name, so always look units up by their value
+    return unit.value if isinstance(unit, Enum) else unit
+
+
+def build_unit_registry() -> dict[str, UnitDefinition]:
+    registry = {}
+
+    for dimension, units in (
+        (MeasurementDimension.WEIGHT, weight),
+        (MeasurementDimension.VOLUME, volume),
+        (MeasurementDimension.COUNT, count),
+    ):
+        for unit in units:
+            if unit in registry:
+                raise ValueError(f"unit [{unit}] has more than one dimension")
+
+            if unit not in measurement_unit_value:
+                raise ValueError(f"unit [{unit}] has no measurement value")
+
+            registry[unit] = UnitDefinition(
+                dimension=dimension, factor=float(measurement_unit_value[unit])
+            )
+
+    missing_units = {unit.value for unit in MeasurementUnit} - registry.keys()
+    unknown_units = (
+        measurement_unit_value.keys() | measurement_unit_nickname.keys()
+    ) - registry.keys()
+
+    if missing_units:
+        raise ValueError(f"units without a dimension: {missing_units}")
+
+    if unknown_units:
+        raise ValueError(f"values for unknown units: {unknown_units}")
+
+    return registry
+
+
+unit_registry = build_unit_registry()
+
+unit_codes = {unit: code for code, unit in enumerate(unit_registry)}
+unit_factors = np.array(
+    [definition.factor for definition in unit_registry.values()]
+)
+unit_dimensions = np.array(
+    [definition.dimension.value for definition in unit_registry.values()]
+)
+
+
 def is_same_measurement_type(a, b) -> bool:
-    # c =
+    a_definition = unit_registry.get(unit_key(a))
+    b_definition = unit_registry.get(unit_key(b))
+
+    return (
+        a_definition is not None
+        and b_definition is not None
+        and a_definition.dimension == b_definition.dimension
+    )
+
+
+def conversion_ratio(from_unit, to_unit) -> float:
+    if not is_same_measurement_type(from_unit, to_unit):
+        raise ValueError(f"can not convert [{from_unit}] to [{to_unit}]")
 
     return (
-        True
-        if (a in weight and b in weight)
-        or (a in volume and b in volume)
-        or (a in count and b in count)
-        else False
+        unit_registry[unit_key(from_unit)].factor
+        / unit_registry[unit_key(to_unit)].factor
     )
+
+
+def convert(
+    amounts: Iterable[float], from_units: Iterable[str], to_unit
+) -> np.ndarray:
+    amounts = np.asarray(amounts, dtype=float)
+    codes = np.array(
+        [unit_codes.get(unit_key(unit), -1) for unit in from_units],
+        dtype=np.int64,
+    )
+    target = unit_registry[unit_key(to_unit)]
+
+    if len(codes) != len(amounts):
+        raise ValueError("amounts and from_units must have the same length")
+
+    if (codes < 0).any():
+        raise ValueError("unknown unit in from_units")
+
+    if (unit_dimensions[codes] != target.dimension.value).any():
+        raise ValueError(f"not every unit can be converted to [{to_unit}]")
+
+    return amounts * unit_factors[codes] / target.factor
@@ -0,0 +1,66 @@
+from functools import lru_cache
+from typing import Any
+import orjson
+from fastapi.responses import Response
+from ..constants.error_type import METHOD_NOT_ALLOWED
+from ..utilities.responses import orjson_default
+
+
+class ErrorDetail:
+    __slots__ = ("type", "message", "location")
+
+    def __init__(self, type: str, message: str, location: Any = []):
+        self.type = type
+        self.message = message
+        self.location = location
+
+    def dict(self) -> dict:
+        return {
+            "type": self.type,
+            "message": self.message,
+            "location": self.location,
+        }
+
+
+class ErrorBody:
+    __slots__ = ("errors",)
+
+    def __init__(self, errors: list[ErrorDetail]):
+        self.errors = errors
+
+    def dict(self) -> dict:
+        return {
+            "success": False,
+            "errors": [error.dict() for error in self.errors],
+        }
+
+    def render(self) -> bytes:
+        return orjson.dumps(self.dict(), default=orjson_default)
+
+
+@lru_cache(maxsize=1024)
+def static_error_body(type: str, message: str, location: tuple = ()) -> bytes:
+    return ErrorBody(
+        errors=[
+            ErrorDetail(type=type, message=message, location=list(location))
+        ]
+    ).render()
+
+
+def method_not_allowed_body(method: str) -> bytes:
+    return static_error_body(
+        type=METHOD_NOT_ALLOWED,
+        message=f"this method [{method}] is not allowed for this route. try using an other method",
+        location=("path",),
+    )
+
+
+def error_response(status_code: int, body: bytes) -> Response:
+    return Response(
+        content=body, status_code=status_code, media_type="application/json"
+    )
+
+
+# the handful of methods a client can send are rendered once up front
+for method in ("GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"):
+    method_not_allowed_body(method=method)
@@ -14,16 +14,15 @@ from ..constants.error_type import (
     INTERNAL_ERROR,
 
 )
-from ..models.error_response import ErrorSchema, ErrorResponseSchema
+from .error_body import ErrorBody, ErrorDetail
 
 
 def custom_http_exception_raiser(http_status, type: str, message: str, location: list[str]):
     raise HTTPException(
         status_code=http_status,
-        detail=ErrorResponseSchema(
-            success=False,
+        detail=ErrorBody(
             errors=[
-                ErrorSchema(
+                ErrorDetail(
                     type=type,
                     message=message,
                     location=location,
@@ -0,0 +1,790 @@
+from datetime import datetime, timedelta, timezone
+from functools import cmp_to_key
+from heapq import merge
+from itertools import islice
+from json import dump, load
+from typing import AsyncIterator
+from os import environ, listdir, makedirs, rename, stat
+from os.path import exists, isdir, join
+from shutil import rmtree
+import numpy as np
+from bson.objectid import ObjectId
+from dotenv import load_dotenv
+from fastapi.concurrency import run_in_threadpool
+from motor.motor_asyncio import AsyncIOMotorCollection, AsyncIOMotorCursor
+from .unit_registry import unit_registry
+
+load_dotenv()
+
+# ledger rows moved out of mongodb are kept here as one directory of
+# memory-mapped .npy columns per ledger and month (eg. inventory_issues/2023-01)
+LEDGER_ARCHIVE_DIR = environ.get("LEDGER_ARCHIVE_DIR")
+
+epoch = datetime(1970, 1, 1)
+missing_time = np.iinfo(np.int64).min
+missing_code = -1
+
+ledger_archive_schemas = {
+    "inventory_issues": {
+        "time_field": "issued_at",
+        "float_fields": ["amount", "cost", "base_amount", "base_unit_cost"],
+        "time_fields": ["issued_at", "updated_at"],
+        "category_fields": ["item", "unit", "issued_by", "updated_by"],
+    },
+    "inventory_purchases": {
+        "time_field": "purchased_at",
+        "float_fields": [
+            "amount",
+            "price",
+            "base_amount",
+            "base_unit_cost",
+        ],
+        "time_fields": ["purchased_at", "updated_at"],
+        "category_fields": ["item", "unit", "purchased_by", "updated_by"],
+    },
+}
+
+
+def is_archive_enabled() -> bool:
+    return bool(LEDGER_ARCHIVE_DIR)
+
+
+def to_naive_utc(value: datetime | None) -> datetime | None:
+    # query parameters may carry an offset, stored times are naive utc
+    if value is None or value.tzinfo is None:
+        return value
+
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def to_milliseconds(value: datetime | None) -> int:
+    if value is None:
+        return missing_time
+
+    return (to_naive_utc(value) - epoch) // timedelta(milliseconds=1)
+
+
+def from_milliseconds(value: int) -> datetime | None:
+    if value == missing_time:
+        return None
+
+    return epoch + timedelta(milliseconds=int(value))
+
+
+def month_start(value: datetime) -> datetime:
+    return value.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def next_month(value: datetime) -> datetime:
+    return month_start(month_start(value) + timedelta(days=32))
+
+
+def segment_path(ledger: str, month: datetime) -> str:
+    return join(LEDGER_ARCHIVE_DIR, ledger, month.strftime("%Y-%m"))
+
+
+class LedgerSegment:
+    def __init__(self, ledger: str, month: datetime):
+        self.ledger = ledger
+        self.month = month
+        self.path = segment_path(ledger=ledger, month=month)
+        self.schema = ledger_archive_schemas[ledger]
+        self.columns: dict[str, np.ndarray] = {}
+        self.dictionaries: dict[str, list[str]] = {}
+        self.id_range: tuple[ObjectId, ObjectId] | None = None
+
+    def column(self, name: str) -> np.ndarray:
+        if name not in self.columns:
+            self.columns[name] = np.load(
+                join(self.path, f"{name}.npy"), mmap_mode="r"
+            )
+
+        return self.columns[name]
+
+    def has_column(self, name: str) -> bool:
+        return name in self.columns or exists(join(self.path, f"{name}.npy"))
+
+    def dictionary(self, field: str) -> list[str]:
+        if field not in self.dictionaries:
+            with open(join(self.path, f"{field}.values.json")) as file:
+                self.dictionaries[field] = load(file)
+
+        return self.dictionaries[field]
+
+    def __len__(self) -> int:
+        return len(self.column("_id"))
+
+    def may_contain(self, id: ObjectId) -> bool:
+        if self.id_range is None:
+            range_path = join(self.path, "_id.range.json")
+
+            if exists(range_path):
+                with open(range_path) as file:
+                    lowest, highest = load(file)
+            else:
+                # segments written before the range was stored
+                lowest, highest = id_range(self.column("_id"))
+
+            self.id_range = (ObjectId(lowest), ObjectId(highest))
+
+        return self.id_range[0] <= id <= self.id_range[1]
+
+    def find_id(self, id: ObjectId) -> np.ndarray:
+        if not len(self) or not self.may_contain(id):
+            return np.empty(0, dtype=np.int64)
+
+        target = np.frombuffer(id.binary, dtype=np.uint8)
+
+        return np.flatnonzero((self.column("_id") == target).all(axis=1))
+
+    def match(
+        self,
+        equals: dict[str, str | None],
+        start: datetime | None = None,
+        end: datetime | None = None,
+    ) -> np.ndarray:
+        mask = np.ones(len(self), dtype=bool)
+
+        for field, value in equals.items():
+            if value is None:
+                continue
+
+            values = self.dictionary(field)
+
+            if value not in values:
+                return np.empty(0, dtype=np.int64)
+
+            mask &= self.column(f"{field}.codes") == values.index(value)
+
+        times = self.column(self.schema["time_field"])
+
+        if start is not None:
+            mask &= times >= to_milliseconds(start)
+
+        if end is not None:
+            mask &= times <= to_milliseconds(end)
+
+        return np.flatnonzero(mask)
+
+    def sort_keys(self, field: str, indices: np.ndarray) -> list[np.ndarray]:
+        # (present, value) pairs, the same order compare_documents uses
+        if field == "_id":
+            ids = self.column("_id")[indices]
+            # 4 byte words stay exact as float64
+            values = [
+                ids[:, start : start + 4]
+                .copy()
+                .view(">u4")
+                .reshape(-1)
+                .astype(np.float64)
+                for start in (0, 4, 8)
+            ]
+            return [np.ones(len(indices)), *values]
+
+        if field in self.schema["category_fields"]:
+            # dictionaries are sorted, so codes order like the strings
+            values = self.column(f"{field}.codes")[indices]
+            present = values != missing_code
+        elif field in self.schema["time_fields"]:
+            values = self.column(field)[indices]
+            present = values != missing_time
+        elif field in self.schema["float_fields"] and self.has_column(field):
+            values = self.column(field)[indices]
+            present = ~np.isnan(values)
+        else:
+            return []
+
+        return [
+            present.astype(np.float64),
+            np.where(present, values, 0).astype(np.float64),
+        ]
+
+    def ordered(
+        self, indices: np.ndarray, sort: list[tuple[str, int]]
+    ) -> np.ndarray:
+        keys = []
+
+        for field, direction in sort:
+            keys.extend(
+                key * direction
+                for key in self.sort_keys(field=field, indices=indices)
+            )
+
+        if not keys:
+            return indices
+
+        # lexsort takes the primary key last
+        return indices[np.lexsort(keys[::-1], axis=0)]
+
+    def documents(self, indices: np.ndarray) -> list[dict]:
+        ids = self.column("_id")[indices]
+        columns = {"_id": [ObjectId(bytes(value)) for value in ids]}
+
+        for field in self.schema["float_fields"]:
+            # segments written before a field was added to the schema
+            if not self.has_column(field):
+                columns[field] = [None] * len(indices)
+                continue
+
+            columns[field] = [
+                None if np.isnan(value) else float(value)
+                for value in self.column(field)[indices]
+            ]
+
+        for field in self.schema["time_fields"]:
+            columns[field] = [
+                from_milliseconds(value)
+                for value in self.column(field)[indices]
+            ]
+
+        for field in self.schema["category_fields"]:
+            values = self.dictionary(field)
+            columns[field] = [
+                None if code == missing_code else values[code]
+                for code in self.column(f"{field}.codes")[indices]
+            ]
+
+        return [
+            {field: column[i] for field, column in columns.items()}
+            for i in range(len(indices))
+        ]
+
+
+def id_range(ids: np.ndarray) -> tuple[str, str]:
+    # fixed width bytes compare like ObjectIds, numpy strips trailing zero
+    # bytes so they are padded back
+    values = np.sort(np.ascontiguousarray(ids).view("S12").reshape(-1))
+
+    return tuple(
+        bytes(value).ljust(12, b"\0").hex()
+        for value in (values[0], values[-1])
+    )
+
+
+def write_segment(ledger: str, month: datetime, documents: list[dict]):
+    schema = ledger_archive_schemas[ledger]
+    path = segment_path(ledger=ledger, month=month)
+    temporary_path = f"{path}.tmp"
+
+    if isdir(temporary_path):
+        rmtree(temporary_path)
+
+    makedirs(temporary_path)
+
+    documents = sorted(
+        documents,
+        key=lambda document: to_milliseconds(
+            document.get(schema["time_field"])
+        ),
+    )
+
+    np.save(
+        join(temporary_path, "_id.npy"),
+        np.array(
+            [list(document["_id"].binary) for document in documents],
+            dtype=np.uint8,
+        ).reshape(len(documents), 12),
+    )
+
+    for field in schema["float_fields"]:
+        np.save(
+            join(temporary_path, f"{field}.npy"),
+            np.array(
+                [
+                    np.nan if document.get(field) is None else document[field]
+                    for document in documents
+                ],
+                dtype=np.float64,
+            ),
+        )
+
+    for field in schema["time_fields"]:
+        np.save(
+            join(temporary_path, f"{field}.npy"),
+            np.array(
+                [
+                    to_milliseconds(document.get(field))
+                    for document in documents
+                ],
+                dtype=np.int64,
+            ),
+        )
+
+    for field in schema["category_fields"]:
+        values = sorted(
+            {
+                str(document[field])
+                for document in documents
+                if document.get(field) is not None
+            }
+        )
+        codes = {value: code for code, value in enumerate(values)}
+
+        np.save(
+            join(temporary_path, f"{field}.codes.npy"),
+            np.array(
+                [
+                    (
+                        missing_code
+                        if document.get(field) is None
+                        else codes[str(document[field])]
+                    )
+                    for document in documents
+                ],
+                dtype=np.int32,
+            ),
+        )
+
+        with open(join(temporary_path, f"{field}.values.json"), "w") as file:
+            dump(values, file)
+
+    if documents:
+        with open(join(temporary_path, "_id.range.json"), "w") as file:
+            dump(
+                [
+                    str(min(document["_id"] for document in documents)),
+                    str(max(document["_id"] for document in documents)),
+                ],
+                file,
+            )
+
+    # swap directories so readers never see a half written segment
+    if isdir(path):
+        rename(path, f"{path}.old")
+
+    rename(temporary_path, path)
+
+    if isdir(f"{path}.old"):
+        rmtree(f"{path}.old")
+
+
+def read_segment(ledger: str, month: datetime) -> list[dict]:
+    if not exists(segment_path(ledger=ledger, month=month)):
+        return []
+
+    segment = LedgerSegment(ledger=ledger, month=month)
+
+    return segment.documents(np.arange(len(segment)))
+
+
+# opened segments keep their memory maps and dictionaries between requests,
+# a rewritten segment is a new directory, its new inode reopens it
+segment_cache: dict[str, tuple[tuple[int, int], LedgerSegment]] = {}
+
+
+def open_segment(ledger: str, month: datetime) -> LedgerSegment:
+    path = segment_path(ledger=ledger, month=month)
+    status = stat(path)
+    version = (status.st_ino, status.st_mtime_ns)
+    cached = segment_cache.get(path)
+
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    segment = LedgerSegment(ledger=ledger, month=month)
+    segment_cache[path] = (version, segment)
+
+    return segment
+
+
+def find_segments(
+    ledger: str,
+    start: datetime | None = None,
+    end: datetime | None = None,
+) -> list[LedgerSegment]:
+    if not is_archive_enabled():
+        return []
+
+    ledger_path = join(LEDGER_ARCHIVE_DIR, ledger)
+
+    if not isdir(ledger_path):
+        return []
+
+    start, end = to_naive_utc(start), to_naive_utc(end)
+    segments = []
+
+    for name in sorted(listdir(ledger_path)):
+        try:
+            month = datetime.strptime(name, "%Y-%m")
+        except ValueError:
+            continue
+
+        if start is not None and next_month(month) <= start:
+            continue
+
+        if end is not None and month > end:
+            continue
+
+        try:
+            segments.append(open_segment(ledger=ledger, month=month))
+        except FileNotFoundError:
+            # removed while listing
+            continue
+
+    return segments
+
+
+def match_archived(
+    ledger: str,
+    equals: dict[str, str | None],
+    start: datetime | None = None,
+    end: datetime | None = None,
+) -> list[tuple[LedgerSegment, np.ndarray]]:
+    matches = []
+
+    for segment in find_segments(ledger=ledger, start=start, end=end):
+        indices = segment.match(equals=equals, start=start, end=end)
+
+        if len(indices):
+            matches.append((segment, indices))
+
+    return matches
+
+
+def archived_documents(
+    matches: list[tuple[LedgerSegment, np.ndarray]],
+    skip: int = 0,
+    limit: int | None = None,
+) -> list[dict]:
+    documents = []
+
+    for segment, indices in matches:
+        if skip >= len(indices):
+            skip -= len(indices)
+            continue
+
+        indices = indices[skip:]
+        skip = 0
+
+        if limit is not None:
+            indices = indices[: limit - len(documents)]
+
+        documents.extend(segment.documents(indices))
+
+        if limit is not None and len(documents) >= limit:
+            break
+
+    return documents
+
+
+def read_archived_by_id(
+    ledger: str, id: ObjectId, projection: dict | None = None
+) -> dict:
+    # ids are not ordered by the time field segments are split on, so only
+    # the segments whose id range covers the id have their _id column scanned
+    for segment in find_segments(ledger=ledger):
+        indices = segment.find_id(id)
+
+        if len(indices):
+            return project_documents(
+                documents=segment.documents(indices[:1]),
+                projection=projection,
+            )[0]
+
+    return {}
+
+
+async def find_archived_by_id(
+    ledger: str, id: ObjectId, projection: dict | None = None
+) -> dict:
+    if not is_archive_enabled():
+        return {}
+
+    return await run_in_threadpool(
+        read_archived_by_id, ledger=ledger, id=id, projection=projection
+    )
+
+
+async def stream_with_archive(
+    ledger: str,
+    cursor: AsyncIOMotorCursor,
+    equals: dict[str, str | None],
+    start: datetime | None,
+    end: datetime | None,
+    batch_size: int,
+) -> AsyncIterator[dict]:
+    # archived rows are older than everything still in mongodb, so they are
+    # streamed first, segment by segment in time order
+    matches = await run_in_threadpool(
+        match_archived, ledger=ledger, equals=equals, start=start, end=end
+    )
+
+    for segment, indices in matches:
+        for offset in range(0, len(indices), batch_size):
+            for document in await run_in_threadpool(
+                segment.documents, indices[offset : offset + batch_size]
+            ):
+                yield document
+
+    async for document in cursor:
+        yield document
+
+
+def project_documents(
+    documents: list[dict], projection: dict | None
+) -> list[dict]:
+    if not projection:
+        return documents
+
+    fields = {"_id", *projection}
+
+    return [
+        {field: value for field, value in document.items() if field in fields}
+        for document in documents
+    ]
+
+
+def compare_documents(sort: list[tuple[str, int]]):
+    def compare(left: dict, right: dict) -> int:
+        for field, direction in sort:
+            left_value, right_value = left.get(field), right.get(field)
+
+            # missing values sort first, like mongodb
+            if left_value is None or right_value is None:
+                order = (left_value is not None) - (right_value is not None)
+            else:
+                order = (left_value > right_value) - (left_value < right_value)
+
+            if order:
+                return order * direction
+
+        return 0
+
+    return compare
+
+
+def first_sorted_documents(
+    matches: list[tuple[LedgerSegment, np.ndarray]],
+    sort: list[tuple[str, int]],
+    count: int,
+) -> list[list[dict]]:
+    # no more than count rows can come from any one segment, so each
+    # contributes its first rows in sort order
+    return [
+        segment.documents(segment.ordered(indices=indices, sort=sort)[:count])
+        for segment, indices in matches
+    ]
+
+
+async def find_with_archive(
+    ledger: str,
+    collection: AsyncIOMotorCollection,
+    filter: dict,
+    equals: dict[str, str | None],
+    start: datetime | None,
+    end: datetime | None,
+    skip: int,
+    limit: int,
+    sort: list[tuple[str, int]],
+    projection: dict | None = None,
+) -> list[dict]:
+    matches = (
+        await run_in_threadpool(
+            match_archived, ledger=ledger, equals=equals, start=start, end=end
+        )
+        if is_archive_enabled()
+        else []
+    )
+    archived_count = sum(len(indices) for _, indices in matches)
+
+    if not archived_count:
+        return [
+            document
+            async for document in collection.find(
+                filter=filter,
+                projection=projection,
+                skip=skip,
+                limit=limit,
+                sort=sort,
+            )
+        ]
+
+    if not sort:
+        # archived rows are always older than hot rows, so they come first
+        documents = project_documents(
+            documents=await run_in_threadpool(
+                archived_documents, matches=matches, skip=skip, limit=limit
+            ),
+            projection=projection,
+        )
+
+        if len(documents) >= limit:
+            return documents
+
+        return documents + [
+            document
+            async for document in collection.find(
+                filter=filter,
+                projection=projection,
+                skip=max(skip - archived_count, 0),
+                limit=limit - len(documents),
+            )
+        ]
+
+    # the sort fields are needed to merge with the archive even when the
+    # caller did not ask for them
+    documents = [
+        document
+        async for document in collection.find(
+            filter=filter,
+            projection=(
+                {**projection, **{field: 1 for field, _ in sort}}
+                if projection
+                else None
+            ),
+            limit=skip + limit,
+            sort=sort,
+        )
+    ]
+    segment_documents = await run_in_threadpool(
+        first_sorted_documents,
+        matches=matches,
+        sort=sort,
+        count=skip + limit,
+    )
+
+    return project_documents(
+        documents=list(
+            islice(
+                merge(
+                    documents,
+                    *segment_documents,
+                    key=cmp_to_key(compare_documents(sort=sort)),
+                ),
+                skip,
+                skip + limit,
+            )
+        ),
+        projection=projection,
+    )
+
+
+def truncate_periods(milliseconds: np.ndarray, period: str) -> np.ndarray:
+    days = milliseconds // 86_400_000
+
+    if period == "day":
+        truncated = days.astype("datetime64[D]")
+    elif period == "week":
+        # weeks start on sunday like mongodb $dateTrunc, 1970-01-01 was a thursday
+        truncated = (days - (days + 4) % 7).astype("datetime64[D]")
+    elif period == "month":
+        truncated = days.astype("datetime64[D]").astype("datetime64[M]")
+    else:
+        truncated = days.astype("datetime64[D]").astype("datetime64[Y]")
+
+    return truncated.astype("datetime64[ms]").astype(np.int64)
+
+
+def sum_archived(
+    ledger: str,
+    money_field: str,
+    period: str,
+    equals: dict[str, str | None],
+    start: datetime | None = None,
+    end: datetime | None = None,
+) -> dict[tuple[str, datetime], dict]:
+    schema = ledger_archive_schemas[ledger]
+    totals = {}
+
+    for segment, indices in match_archived(
+        ledger=ledger, equals=equals, start=start, end=end
+    ):
+        item_codes = segment.column("item.codes")[indices]
+        unit_codes = segment.column("unit.codes")[indices]
+        items = segment.dictionary("item")
+        units = segment.dictionary("unit")
+        # custom units can be item specific, so factors are resolved once per
+        # distinct (item, unit) pair
+        pairs, pair_inverse = np.unique(
+            np.stack([item_codes, unit_codes]), axis=1, return_inverse=True
+        )
+        unit_values = np.array(
+            [
+                (
+                    np.nan
+                    if unit_code == missing_code
+                    else unit_registry.factor(
+                        unit=units[unit_code],
+                        item=(
+                            None
+                            if item_code == missing_code
+                            else items[item_code]
+                        ),
+                    )
+                    or np.nan
+                )
+                for item_code, unit_code in pairs.T
+            ],
+            dtype=np.float64,
+        )
+        base_amounts = (
+            segment.column("amount")[indices]
+            * unit_values[pair_inverse.reshape(-1)]
+        )
+
+        if segment.has_column("base_amount"):
+            stored_base_amounts = segment.column("base_amount")[indices]
+            base_amounts = np.where(
+                np.isnan(stored_base_amounts),
+                base_amounts,
+                stored_base_amounts,
+            )
+        money = segment.column(money_field)[indices]
+        periods = truncate_periods(
+            segment.column(schema["time_field"])[indices], period=period
+        )
+
+        keys, inverse = np.unique(
+            np.stack([item_codes.astype(np.int64), periods]),
+            axis=1,
+            return_inverse=True,
+        )
+        inverse = inverse.reshape(-1)
+        key_count = keys.shape[1]
+        sums = {
+            "base_amount": np.bincount(
+                inverse,
+                weights=np.nan_to_num(base_amounts),
+                minlength=key_count,
+            ),
+            money_field: np.bincount(
+                inverse, weights=np.nan_to_num(money), minlength=key_count
+            ),
+            "count": np.bincount(inverse, minlength=key_count),
+        }
+
+        for i in range(key_count):
+            if keys[0, i] == missing_code:
+                continue
+
+            key = (items[keys[0, i]], from_milliseconds(keys[1, i]))
+            total = totals.setdefault(
+                key, {"base_amount": 0.0, money_field: 0.0, "count": 0}
+            )
+
+            for name, values in sums.items():
+                total[name] += values[i].item()
+
+    return totals
+
+
+async def archived_totals(
+    ledger: str,
+    money_field: str,
+    period: str,
+    equals: dict[str, str | None],
+    start: datetime | None = None,
+    end: datetime | None = None,
+) -> dict[tuple[str, datetime], dict]:
+    if not is_archive_enabled():
+        return {}
+
+    return await run_in_threadpool(
+        sum_archived,
+        ledger=ledger,
+        money_field=money_field,
+        period=period,
+        equals=equals,
+        start=start,
+        end=end,
+    )
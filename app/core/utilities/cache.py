@@ -0,0 +1,264 @@
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from functools import wraps
+from hashlib import sha1
+from inspect import signature
+from os import environ
+from time import monotonic
+from typing import Any, Callable
+import bson
+from bson import json_util
+from dotenv import load_dotenv
+from .invalidation import CACHE_INVALIDATION_ENABLED
+from .metrics import metrics
+
+try:
+    from redis import asyncio as redis
+except ImportError:
+    redis = None
+
+load_dotenv()
+
+# "memory" keeps a per worker LRU, "redis" shares entries between workers
+CACHE_BACKEND = environ.get("CACHE_BACKEND", "memory")
+CACHE_REDIS_URL = environ.get("CACHE_REDIS_URL", "redis://localhost:6379/0")
+CACHE_MAX_ENTRIES = int(environ.get("CACHE_MAX_ENTRIES", "10000"))
+CACHE_DEFAULT_TTL_SECONDS = float(
+    environ.get("CACHE_DEFAULT_TTL_SECONDS", "60")
+)
+
+
+class CacheBackend(ABC):
+    @abstractmethod
+    async def get(self, key: str) -> bytes | None: ...
+
+    @abstractmethod
+    async def get_many(self, keys: list[str]) -> list[bytes | None]: ...
+
+    @abstractmethod
+    async def set(self, key: str, value: bytes, ttl: float | None = None): ...
+
+    @abstractmethod
+    async def delete(self, *keys: str): ...
+
+    @abstractmethod
+    async def increment(self, key: str) -> int: ...
+
+
+class MemoryCacheBackend(CacheBackend):
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.entries: OrderedDict[str, tuple[float | None, bytes]] = (
+            OrderedDict()
+        )
+        # counters live outside the LRU, evicting a namespace generation
+        # would bring back entries that were already cleared
+        self.counters: dict[str, int] = {}
+
+    def read(self, key: str) -> bytes | None:
+        if key in self.counters:
+            return str(self.counters[key]).encode()
+
+        entry = self.entries.get(key)
+
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+
+        if expires_at is not None and expires_at <= monotonic():
+            del self.entries[key]
+
+            return None
+
+        self.entries.move_to_end(key)
+
+        return value
+
+    async def get(self, key: str) -> bytes | None:
+        return self.read(key)
+
+    async def get_many(self, keys: list[str]) -> list[bytes | None]:
+        return [self.read(key) for key in keys]
+
+    async def set(self, key: str, value: bytes, ttl: float | None = None):
+        self.entries[key] = (monotonic() + ttl if ttl else None, value)
+        self.entries.move_to_end(key)
+
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    async def delete(self, *keys: str):
+        for key in keys:
+            self.entries.pop(key, None)
+
+    async def increment(self, key: str) -> int:
+        self.counters[key] = self.counters.get(key, 0) + 1
+
+        return self.counters[key]
+
+
+class RedisCacheBackend(CacheBackend):
+    def __init__(self, url: str):
+        if redis is None:
+            raise RuntimeError(
+                "CACHE_BACKEND=redis needs the redis package, run pipenv "
+                "sync to install it"
+            )
+
+        self.client = redis.from_url(url)
+
+    async def get(self, key: str) -> bytes | None:
+        return await self.client.get(key)
+
+    async def get_many(self, keys: list[str]) -> list[bytes | None]:
+        return await self.client.mget(keys) if keys else []
+
+    async def set(self, key: str, value: bytes, ttl: float | None = None):
+        await self.client.set(key, value, px=int(ttl * 1000) if ttl else None)
+
+    async def delete(self, *keys: str):
+        if keys:
+            await self.client.delete(*keys)
+
+    async def increment(self, key: str) -> int:
+        return await self.client.incr(key)
+
+
+def create_cache_backend(name: str = CACHE_BACKEND) -> CacheBackend:
+    if name == "redis":
+        return RedisCacheBackend(url=CACHE_REDIS_URL)
+
+    return MemoryCacheBackend(max_entries=CACHE_MAX_ENTRIES)
+
+
+cache_backend = create_cache_backend()
+
+
+def dump_value(value: Any) -> bytes:
+    # bson keeps ObjectId and datetime values intact, a list or a bare value
+    # is wrapped because only documents can be encoded
+    return bson.encode({"value": value})
+
+
+def load_value(data: bytes) -> Any:
+    return bson.decode(data)["value"]
+
+
+class Cache:
+    def __init__(
+        self,
+        namespace: str,
+        version: int = 1,
+        ttl: float | None = CACHE_DEFAULT_TTL_SECONDS,
+        backend: CacheBackend | None = None,
+        allow_stale: bool = False,
+    ):
+        self.namespace = namespace
+        # bump when the shape of the cached values changes
+        self.version = version
+        self.ttl = ttl
+        self.backend = backend or cache_backend
+        # a per worker cache misses writes made through other workers unless
+        # the invalidation bus is on, so it is bypassed rather than serving
+        # stale values for up to a ttl
+        self.enabled = (
+            allow_stale
+            or CACHE_INVALIDATION_ENABLED
+            or not isinstance(self.backend, MemoryCacheBackend)
+        )
+
+    @property
+    def generation_key(self) -> str:
+        return f"{self.namespace}:generation"
+
+    async def get_prefix(self) -> str:
+        generation = await self.backend.get(self.generation_key)
+
+        return f"{self.namespace}:v{self.version}:{int(generation or 0)}"
+
+    async def get(self, key: str) -> Any | None:
+        data = await self.backend.get(f"{await self.get_prefix()}:{key}")
+        metrics.increment(
+            "cache_hits" if data is not None else "cache_misses",
+            namespace=self.namespace,
+        )
+
+        return load_value(data) if data is not None else None
+
+    async def get_many(self, keys: list[str]) -> dict[str, Any]:
+        prefix = await self.get_prefix()
+        values = await self.backend.get_many(
+            [f"{prefix}:{key}" for key in keys]
+        )
+        hits = {
+            key: load_value(data)
+            for key, data in zip(keys, values)
+            if data is not None
+        }
+        metrics.increment("cache_hits", len(hits), namespace=self.namespace)
+        metrics.increment(
+            "cache_misses", len(keys) - len(hits), namespace=self.namespace
+        )
+
+        return hits
+
+    async def set(self, key: str, value: Any, ttl: float | None = None):
+        await self.backend.set(
+            f"{await self.get_prefix()}:{key}",
+            dump_value(value),
+            ttl=ttl or self.ttl,
+        )
+
+    async def delete(self, *keys: str):
+        if not self.enabled:
+            return
+
+        prefix = await self.get_prefix()
+        await self.backend.delete(*[f"{prefix}:{key}" for key in keys])
+
+    async def clear(self):
+        if not self.enabled:
+            return
+
+        # entries of older generations are never read again and age out
+        await self.backend.increment(self.generation_key)
+
+
+def arguments_key(name: str, arguments: dict) -> str:
+    digest = sha1(
+        json_util.dumps(arguments, sort_keys=True).encode()
+    ).hexdigest()
+
+    return f"{name}:{digest}"
+
+
+def cached(cache: Cache, key: Callable[..., str] | None = None):
+    def decorator(function):
+        function_signature = signature(function)
+
+        @wraps(function)
+        async def wrapper(*args, **kwargs):
+            if not cache.enabled:
+                return await function(*args, **kwargs)
+
+            arguments = function_signature.bind(*args, **kwargs)
+            arguments.apply_defaults()
+            cache_key = (
+                key(**arguments.arguments)
+                if key
+                else arguments_key(function.__name__, arguments.arguments)
+            )
+            value = await cache.get(cache_key)
+
+            if value is not None:
+                return value
+
+            value = await function(*args, **kwargs)
+            await cache.set(cache_key, value)
+
+            return value
+
+        return wrapper
+
+    return decorator
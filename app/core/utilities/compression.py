@@ -0,0 +1,288 @@
+import zlib
+from os import environ
+from dotenv import load_dotenv
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from .metrics import metrics
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+load_dotenv()
+
+COMPRESSION_MINIMUM_SIZE = int(environ.get("COMPRESSION_MINIMUM_SIZE", "1024"))
+# server side preference, the first one the client accepts is used
+COMPRESSION_ENCODINGS = environ.get("COMPRESSION_ENCODINGS", "zstd,br,gzip")
+# streamed bodies are flushed once this many input bytes are buffered
+COMPRESSION_FLUSH_SIZE = int(environ.get("COMPRESSION_FLUSH_SIZE", "65536"))
+
+compressible_content_types = (
+    "application/json",
+    "application/x-ndjson",
+    "text/",
+)
+
+default_compression_levels = {
+    "default": {"gzip": 6, "br": 4, "zstd": 3},
+    # streamed exports favour throughput over ratio
+    "export": {"gzip": 1, "br": 1, "zstd": 1},
+}
+
+
+class Compressor:
+    def __init__(self, encoding: str, level: int):
+        self.encoding = encoding
+
+        if encoding == "gzip":
+            self.compressor = zlib.compressobj(
+                level, zlib.DEFLATED, 16 + zlib.MAX_WBITS
+            )
+        elif encoding == "br":
+            self.compressor = brotli.Compressor(quality=level)
+        else:
+            self.compressor = zstandard.ZstdCompressor(
+                level=level
+            ).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        if self.encoding == "br":
+            return self.compressor.process(data)
+
+        return self.compressor.compress(data)
+
+    def flush(self) -> bytes:
+        if self.encoding == "br":
+            return self.compressor.flush()
+
+        if self.encoding == "gzip":
+            return self.compressor.flush(zlib.Z_SYNC_FLUSH)
+
+        return self.compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self.compressor.finish()
+
+        return self.compressor.flush()
+
+
+def available_encodings(encodings: str) -> list[str]:
+    installed = {"gzip": True, "br": bool(brotli), "zstd": bool(zstandard)}
+
+    return [
+        encoding.strip()
+        for encoding in encodings.split(",")
+        if installed.get(encoding.strip())
+    ]
+
+
+def accepted_encodings(accept_encoding: str) -> set[str]:
+    accepted = set()
+
+    for part in accept_encoding.split(","):
+        encoding, _, parameters = part.strip().partition(";")
+        quality = parameters.strip()
+
+        if quality.startswith("q="):
+            try:
+                if float(quality[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+
+        accepted.add(encoding.strip().lower())
+
+    return accepted
+
+
+class CompressionMiddleware:
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = COMPRESSION_MINIMUM_SIZE,
+        flush_size: int = COMPRESSION_FLUSH_SIZE,
+        encodings: str = COMPRESSION_ENCODINGS,
+        content_types: tuple[str, ...] = compressible_content_types,
+        levels: dict[str, dict[str, int]] = default_compression_levels,
+        route_classes: dict[str, str] = {},
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.flush_size = flush_size
+        self.encodings = available_encodings(encodings=encodings)
+        self.content_types = content_types
+        self.levels = levels
+        # longest prefix wins
+        self.route_classes = sorted(
+            route_classes.items(), key=lambda route: -len(route[0])
+        )
+
+    def choose_encoding(self, scope: Scope) -> str | None:
+        accepted = accepted_encodings(
+            Headers(scope=scope).get("accept-encoding", "")
+        )
+
+        for encoding in self.encodings:
+            if encoding in accepted:
+                return encoding
+
+        return None
+
+    def route_class(self, path: str) -> str:
+        for prefix, route_class in self.route_classes:
+            if path.startswith(prefix):
+                return route_class
+
+        return "default"
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = self.choose_encoding(scope=scope)
+
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        level = self.levels[self.route_class(path=scope["path"])][encoding]
+        responder = CompressionResponder(
+            send=send,
+            encoding=encoding,
+            level=level,
+            minimum_size=self.minimum_size,
+            flush_size=self.flush_size,
+            content_types=self.content_types,
+        )
+
+        await self.app(scope, receive, responder.send)
+
+
+class CompressionResponder:
+    def __init__(
+        self,
+        send: Send,
+        encoding: str,
+        level: int,
+        minimum_size: int,
+        flush_size: int,
+        content_types: tuple[str, ...],
+    ):
+        self.downstream_send = send
+        self.encoding = encoding
+        self.level = level
+        self.minimum_size = minimum_size
+        self.flush_size = flush_size
+        self.content_types = content_types
+        self.start_message: Message | None = None
+        self.compressor: Compressor | None = None
+        self.passthrough = False
+        self.buffered = bytearray()
+        self.buffered_size = 0
+
+    def is_compressible(self, message: Message) -> bool:
+        headers = Headers(raw=message["headers"])
+        content_type = headers.get("content-type", "")
+
+        return (
+            message["status"] not in (204, 304)
+            and "content-encoding" not in headers
+            and content_type.startswith(self.content_types)
+        )
+
+    async def send(self, message: Message):
+        if message["type"] == "http.response.start":
+            self.start_message = message
+            self.passthrough = not self.is_compressible(message=message)
+            return
+
+        if message["type"] != "http.response.body":
+            await self.downstream_send(message)
+            return
+
+        if self.passthrough:
+            if self.start_message is not None:
+                await self.downstream_send(self.start_message)
+                self.start_message = None
+
+            await self.downstream_send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.compressor is None:
+            if not more_body and len(body) < self.minimum_size:
+                await self.downstream_send(self.start_message)
+                await self.downstream_send(message)
+                return
+
+            self.compressor = Compressor(
+                encoding=self.encoding, level=self.level
+            )
+            headers = MutableHeaders(raw=self.start_message["headers"])
+            headers["Content-Encoding"] = self.encoding
+            headers.add_vary_header("Accept-Encoding")
+            metrics.increment("compression_responses", encoding=self.encoding)
+
+            if more_body:
+                del headers["Content-Length"]
+            else:
+                compressed = (
+                    self.compressor.compress(body) + self.compressor.finish()
+                )
+                headers["Content-Length"] = str(len(compressed))
+                await self.downstream_send(self.start_message)
+                await self.downstream_send(
+                    {"type": "http.response.body", "body": compressed}
+                )
+                self.record(original_size=len(body), compressed=compressed)
+                return
+
+            await self.downstream_send(self.start_message)
+
+        # flushing every small chunk (one row of an export) costs more
+        # framing than it saves, so chunks are buffered up to flush_size
+        self.buffered += self.compressor.compress(body)
+        self.buffered_size += len(body)
+
+        if more_body and self.buffered_size < self.flush_size:
+            return
+
+        self.buffered += (
+            self.compressor.flush() if more_body else self.compressor.finish()
+        )
+        compressed = bytes(self.buffered)
+        self.record(original_size=self.buffered_size, compressed=compressed)
+        self.buffered.clear()
+        self.buffered_size = 0
+        await self.downstream_send(
+            {
+                "type": "http.response.body",
+                "body": compressed,
+                "more_body": more_body,
+            }
+        )
+
+    def record(self, original_size: int, compressed: bytes):
+        metrics.increment(
+            "compression_original_bytes", original_size, encoding=self.encoding
+        )
+        metrics.increment(
+            "compression_compressed_bytes",
+            len(compressed),
+            encoding=self.encoding,
+        )
+        metrics.increment(
+            "compression_saved_bytes",
+            original_size - len(compressed),
+            encoding=self.encoding,
+        )
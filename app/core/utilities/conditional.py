@@ -0,0 +1,95 @@
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from hashlib import sha1
+from fastapi import Request, Response, status
+from motor.motor_asyncio import AsyncIOMotorCollection
+
+
+async def collection_version(
+    collection: AsyncIOMotorCollection, filter: dict
+) -> dict:
+    versions = await collection.aggregate(
+        [
+            {"$match": filter},
+            {
+                "$group": {
+                    "_id": None,
+                    "count": {"$sum": 1},
+                    "updated_at": {"$max": "$updated_at"},
+                }
+            },
+            {"$project": {"_id": 0}},
+        ]
+    ).to_list(length=1)
+
+    return versions[0] if versions else {"count": 0, "updated_at": None}
+
+
+def to_http_date(value: datetime) -> str:
+    return format_datetime(
+        value.replace(tzinfo=timezone.utc, microsecond=0), usegmt=True
+    )
+
+
+def from_http_date(value: str) -> datetime | None:
+    try:
+        parsed = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+
+    return parsed
+
+
+class ResourceVersion:
+    def __init__(
+        self, request: Request, updated_at: datetime | None, count: int = 1
+    ):
+        self.request = request
+        self.updated_at = updated_at
+        # the query string is part of the tag since fields, skip and limit
+        # all change the representation
+        validator = f"{request.url.path}?{request.url.query}"
+        validator += f"|{updated_at}|{count}"
+        self.etag = f'W/"{sha1(validator.encode()).hexdigest()}"'
+
+    @property
+    def headers(self) -> dict:
+        headers = {"ETag": self.etag, "Cache-Control": "no-cache"}
+
+        if self.updated_at is not None:
+            headers["Last-Modified"] = to_http_date(self.updated_at)
+
+        return headers
+
+    def is_not_modified(self) -> bool:
+        if_none_match = self.request.headers.get("if-none-match")
+
+        if if_none_match is not None:
+            tags = [tag.strip() for tag in if_none_match.split(",")]
+
+            return "*" in tags or self.etag in tags
+
+        if_modified_since = self.request.headers.get("if-modified-since")
+
+        if if_modified_since is None or self.updated_at is None:
+            return False
+
+        since = from_http_date(if_modified_since)
+
+        return (
+            since is not None
+            and self.updated_at.replace(microsecond=0) <= since
+        )
+
+    def not_modified_response(self) -> Response:
+        return Response(
+            status_code=status.HTTP_304_NOT_MODIFIED, headers=self.headers
+        )
+
+    def apply(self, response: Response) -> Response:
+        response.headers.update(self.headers)
+
+        return response
@@ -1,6 +1,7 @@
 from os import environ
 from dotenv import load_dotenv
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ASCENDING
 from pymongo.write_concern import WriteConcern
 from pymongo.read_concern import ReadConcern
 from pymongo.read_preferences import ReadPreference
@@ -13,6 +14,72 @@ db = client["hms_db"]
 
 default_find_limit = 25
 
+# "standard" keeps the ledgers in regular collections, "timeseries" reads
+# and writes MongoDB time-series collections (metaField=item)
+LEDGER_STORAGE_MODE = environ.get("LEDGER_STORAGE_MODE", "standard")
+
+# updating and deleting time-series documents by arbitrary filters, as the
+# ledger update endpoints do, needs MongoDB 7
+ledger_time_series_min_server_version = (7, 0)
+
+ledger_time_series_options = {
+    "inventory_issues": {
+        "timeField": "issued_at",
+        "metaField": "item",
+        "granularity": "hours",
+    },
+    "inventory_purchases": {
+        "timeField": "purchased_at",
+        "metaField": "item",
+        "granularity": "hours",
+    },
+}
+
+
+def ledger_collection_name(name: str, mode: str | None = None) -> str:
+    mode = mode or LEDGER_STORAGE_MODE
+
+    return f"{name}_timeseries" if mode == "timeseries" else name
+
+
+issues_collection = ledger_collection_name("inventory_issues")
+purchases_collection = ledger_collection_name("inventory_purchases")
+
+
+async def check_time_series_support():
+    server_version = tuple((await client.server_info())["versionArray"][:2])
+
+    if server_version < ledger_time_series_min_server_version:
+        required = ".".join(map(str, ledger_time_series_min_server_version))
+        running = ".".join(map(str, server_version))
+
+        raise RuntimeError(
+            f"LEDGER_STORAGE_MODE=timeseries needs MongoDB {required} or "
+            f"newer, the server runs {running}"
+        )
+
+
+async def ensure_ledger_collection(name: str, mode: str | None = None):
+    collection_name = ledger_collection_name(name=name, mode=mode)
+
+    if (mode or LEDGER_STORAGE_MODE) != "timeseries":
+        return
+
+    await check_time_series_support()
+
+    if collection_name not in await db.list_collection_names(
+        filter={"name": collection_name}
+    ):
+        await db.create_collection(
+            collection_name, timeseries=ledger_time_series_options[name]
+        )
+
+    # time-series collections have no _id index of their own, the by id
+    # lookups and updates would scan every bucket without this one
+    await db[collection_name].create_index(
+        [("_id", ASCENDING)], name="ledger_id"
+    )
+
 
 async def mongodb_transaction_core(operations: list[dict]):
     result = []
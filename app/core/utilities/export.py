@@ -0,0 +1,100 @@
+from csv import writer
+from datetime import datetime
+from enum import Enum
+from io import StringIO
+from typing import AsyncIterable, AsyncIterator
+import orjson
+from fastapi.responses import StreamingResponse
+from .responses import orjson_default, orjson_options
+
+default_export_batch_size = 1000
+# rows are sent in chunks of about this many bytes, not one by one
+default_export_chunk_size = 65536
+
+
+class ExportFormat(str, Enum):
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+
+export_media_types = {
+    ExportFormat.NDJSON: "application/x-ndjson",
+    ExportFormat.CSV: "text/csv",
+}
+
+
+def export_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+
+    if value is None or type(value) in (str, int, float, bool):
+        return value
+
+    return str(value)
+
+
+async def ndjson_rows(
+    cursor: AsyncIterable[dict],
+    fields: list[str],
+    chunk_size: int = default_export_chunk_size,
+) -> AsyncIterator[bytes]:
+    chunk = bytearray()
+
+    async for document in cursor:
+        # encoded like regular responses, ObjectIds and dates included
+        chunk += orjson.dumps(
+            {field: document.get(field) for field in fields},
+            default=orjson_default,
+            option=orjson_options | orjson.OPT_APPEND_NEWLINE,
+        )
+
+        if len(chunk) >= chunk_size:
+            yield bytes(chunk)
+            chunk.clear()
+
+    if chunk:
+        yield bytes(chunk)
+
+
+async def csv_rows(
+    cursor: AsyncIterable[dict],
+    fields: list[str],
+    chunk_size: int = default_export_chunk_size,
+) -> AsyncIterator[bytes]:
+    buffer = StringIO()
+    csv_writer = writer(buffer)
+
+    csv_writer.writerow(fields)
+
+    async for document in cursor:
+        csv_writer.writerow(
+            [export_value(document.get(field)) for field in fields]
+        )
+
+        if buffer.tell() >= chunk_size:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate(0)
+
+    yield buffer.getvalue().encode("utf-8")
+
+
+def export_response(
+    cursor: AsyncIterable[dict],
+    fields: list[str],
+    format: ExportFormat,
+    filename: str,
+) -> StreamingResponse:
+    rows = (
+        csv_rows(cursor=cursor, fields=fields)
+        if format == ExportFormat.CSV
+        else ndjson_rows(cursor=cursor, fields=fields)
+    )
+
+    return StreamingResponse(
+        rows,
+        media_type=export_media_types[format],
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}.{format.value}"'
+        },
+    )
@@ -0,0 +1,110 @@
+from functools import lru_cache
+from typing import Optional, Type
+from fastapi import Query
+from pydantic import BaseModel, create_model
+from pydantic.fields import FieldInfo
+from ..error.exceptions import raise_unprocessable_value_exception
+
+
+@lru_cache(maxsize=256)
+def partial_model(
+    model: Type[BaseModel], names: frozenset[str]
+) -> Type[BaseModel]:
+    # a subclass where every field that was not asked for is optional, so
+    # it still validates wherever the full model is expected
+    return create_model(
+        f"Partial{model.__name__}",
+        __base__=model,
+        **{
+            name: (
+                Optional[field.outer_type_],
+                FieldInfo(None, alias=field.alias),
+            )
+            for name, field in model.__fields__.items()
+            if name not in names
+        },
+    )
+
+
+class FieldSet:
+    def __init__(
+        self, model: Type[BaseModel], names: frozenset[str] | None = None
+    ):
+        self.names = names
+        self.model = partial_model(model, names) if names else model
+        self.omitted = set(model.__fields__).difference(
+            names or model.__fields__
+        )
+        self.projection = (
+            {model.__fields__[name].alias: 1 for name in names}
+            if names
+            else None
+        )
+
+        # updated_at backs the conditional request validators, it is still
+        # left out of the response unless it was asked for
+        if self.projection and "updated_at" in model.__fields__:
+            self.projection["updated_at"] = 1
+
+    def exclude(self, key: str, many: bool = False) -> dict | None:
+        if not self.omitted:
+            return None
+
+        return {key: {"__all__": self.omitted} if many else self.omitted}
+
+
+class FieldSelector:
+    def __init__(self, model: Type[BaseModel]):
+        self.model = model
+        self.names = {
+            **{name: name for name in model.__fields__},
+            **{field.alias: name for name, field in model.__fields__.items()},
+        }
+
+    def __call__(
+        self,
+        fields: str | None = Query(
+            default=None,
+            description="comma separated list of the fields to return",
+        ),
+    ) -> FieldSet:
+        if not fields:
+            return FieldSet(model=self.model)
+
+        names = set()
+
+        for field in fields.split(","):
+            field = field.strip()
+
+            if not field:
+                continue
+
+            if field not in self.names:
+                raise_unprocessable_value_exception(
+                    message=f"unknown field [{field}]",
+                    location=["query parameter", "fields"],
+                )
+
+            names.add(self.names[field])
+
+        # the id is always returned so rows can still be addressed
+        if "id" in self.model.__fields__:
+            names.add("id")
+
+        return get_field_set(model=self.model, names=frozenset(names))
+
+
+@lru_cache(maxsize=256)
+def get_field_set(model: Type[BaseModel], names: frozenset[str]) -> FieldSet:
+    return FieldSet(model=model, names=names)
+
+
+def project_document(document: dict, projection: dict | None) -> dict:
+    if not projection:
+        return document
+
+    fields = {"_id", *projection}
+
+    return {
+        field: value for field, value in document.items() if field in fields
+    }
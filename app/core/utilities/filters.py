@@ -0,0 +1,28 @@
+from datetime import datetime
+
+
+def time_range_filter(
+    field: str,
+    start: datetime | None = None,
+    end: datetime | None = None,
+) -> dict:
+    if start is None and end is None:
+        return {}
+
+    time_range = {}
+
+    if start is not None:
+        time_range["$gte"] = start
+
+    if end is not None:
+        time_range["$lte"] = end
+
+    return {field: time_range}
+
+
+def get_processed_sort(sort_by: list[str]) -> list[tuple[str, int]]:
+    return [
+        (sort_item[1:], 1 if sort_item[0] == "+" else -1)
+        for sort_item in sort_by or []
+        if sort_item and sort_item[0] in "+-"
+    ]
@@ -0,0 +1,190 @@
+from asyncio import CancelledError, Task, create_task, sleep
+from datetime import datetime
+from time import monotonic
+from os import environ
+from socket import gethostname
+from typing import Awaitable, Callable
+from dotenv import load_dotenv
+from pymongo import ASCENDING
+from pymongo.errors import OperationFailure, PyMongoError
+from .database import db
+from .metrics import metrics
+
+load_dotenv()
+
+# change streams need a replica set, so the bus stays off unless enabled
+CACHE_INVALIDATION_ENABLED = (
+    environ.get("CACHE_INVALIDATION_ENABLED", "false").lower() == "true"
+)
+# every worker process keeps its own caches, so each one needs its own
+# resume token, a shared id would let a worker skip events it never applied.
+# the id has to stay the same across restarts for the token to be found
+# again, so it is either set outright or built from the host name and a
+# worker index the process manager sets per worker, eg. supervisor's
+# %(process_num)s or a systemd template's %i
+CACHE_INVALIDATION_WORKER_INDEX = environ.get(
+    "CACHE_INVALIDATION_WORKER_INDEX"
+)
+CACHE_INVALIDATION_CONSUMER = environ.get("CACHE_INVALIDATION_CONSUMER") or (
+    f"{gethostname()}:{CACHE_INVALIDATION_WORKER_INDEX}"
+    if CACHE_INVALIDATION_WORKER_INDEX
+    else None
+)
+# replaying a few events after a restart only invalidates twice, so the
+# resume token is saved at most this often instead of once per event
+CACHE_INVALIDATION_TOKEN_SAVE_SECONDS = float(
+    environ.get("CACHE_INVALIDATION_TOKEN_SAVE_SECONDS", "5")
+)
+# tokens of consumers that no longer run are dropped after this long
+CACHE_INVALIDATION_TOKEN_EXPIRE_SECONDS = int(
+    environ.get("CACHE_INVALIDATION_TOKEN_EXPIRE_SECONDS", "86400")
+)
+CACHE_INVALIDATION_RETRY_SECONDS = float(
+    environ.get("CACHE_INVALIDATION_RETRY_SECONDS", "5")
+)
+
+CHANGE_STREAM_FATAL_ERROR = 280
+CHANGE_STREAM_HISTORY_LOST = 286
+CHANGE_STREAM_NOT_SUPPORTED = 40573
+
+Listener = Callable[[dict], Awaitable[None]]
+
+
+class InvalidationBus:
+    def __init__(
+        self,
+        consumer: str | None,
+        token_collection: str = "cache_resume_tokens",
+        token_save_seconds: float = CACHE_INVALIDATION_TOKEN_SAVE_SECONDS,
+    ):
+        self.consumer = consumer
+        self.token_collection = token_collection
+        self.token_save_seconds = token_save_seconds
+        self.listeners: dict[str, list[Listener]] = {}
+        self.task: Task | None = None
+
+    async def create_indexes(self):
+        await db[self.token_collection].create_index(
+            [("updated_at", ASCENDING)],
+            expireAfterSeconds=CACHE_INVALIDATION_TOKEN_EXPIRE_SECONDS,
+        )
+
+    def subscribe(self, collection: str, listener: Listener):
+        self.listeners.setdefault(collection, []).append(listener)
+
+    async def publish(self, collection: str, event: dict):
+        for listener in self.listeners.get(collection, []):
+            try:
+                await listener(event)
+            except Exception:
+                metrics.increment(
+                    "cache_invalidation_errors", collection=collection
+                )
+
+        metrics.increment("cache_invalidation_events", collection=collection)
+
+    async def resync(self):
+        # an event without documentKey tells every listener to reload fully
+        for collection in list(self.listeners):
+            await self.publish(
+                collection=collection, event={"operationType": "resync"}
+            )
+
+    async def load_resume_token(self) -> dict | None:
+        token = await db[self.token_collection].find_one(
+            filter={"_id": self.consumer}
+        )
+
+        return token["token"] if token else None
+
+    async def save_resume_token(self, token: dict):
+        await db[self.token_collection].update_one(
+            filter={"_id": self.consumer},
+            update={"$set": {"token": token, "updated_at": datetime.utcnow()}},
+            upsert=True,
+        )
+
+    async def clear_resume_token(self):
+        await db[self.token_collection].delete_one(
+            filter={"_id": self.consumer}
+        )
+
+    async def watch(self):
+        resume_token = await self.load_resume_token()
+        pipeline = [
+            {"$match": {"ns.coll": {"$in": list(self.listeners)}}},
+            {"$project": {"ns": 1, "operationType": 1, "documentKey": 1}},
+        ]
+
+        async with db.watch(
+            pipeline=pipeline, resume_after=resume_token
+        ) as stream:
+            if resume_token is None:
+                # nothing to replay, so cover writes made before the stream
+                # was opened with a full reload
+                await self.resync()
+
+            saved_at = monotonic()
+
+            async for change in stream:
+                await self.publish(
+                    collection=change["ns"]["coll"], event=change
+                )
+
+                if monotonic() - saved_at >= self.token_save_seconds:
+                    await self.save_resume_token(token=stream.resume_token)
+                    saved_at = monotonic()
+
+    async def run(self):
+        while True:
+            try:
+                await self.watch()
+            except CancelledError:
+                raise
+            except OperationFailure as error:
+                if error.code == CHANGE_STREAM_NOT_SUPPORTED:
+                    metrics.increment("cache_invalidation_unsupported")
+
+                    return
+
+                if error.code in (
+                    CHANGE_STREAM_FATAL_ERROR,
+                    CHANGE_STREAM_HISTORY_LOST,
+                ):
+                    # the oplog no longer holds the stored token, start over
+                    await self.clear_resume_token()
+
+                    continue
+
+                metrics.increment("cache_invalidation_restarts")
+                await sleep(CACHE_INVALIDATION_RETRY_SECONDS)
+            except PyMongoError:
+                metrics.increment("cache_invalidation_restarts")
+                await sleep(CACHE_INVALIDATION_RETRY_SECONDS)
+
+    def start(self):
+        if self.consumer is None:
+            raise RuntimeError(
+                "set CACHE_INVALIDATION_WORKER_INDEX to a number unique to "
+                "each worker on the host, or CACHE_INVALIDATION_CONSUMER to "
+                "an id unique to each worker, to enable cache invalidation"
+            )
+
+        if self.task is None and self.listeners:
+            self.task = create_task(self.run())
+
+    async def stop(self):
+        if self.task is None:
+            return
+
+        self.task.cancel()
+
+        try:
+            await self.task
+        except CancelledError:
+            pass
+
+        self.task = None
+
+
+invalidation_bus = InvalidationBus(consumer=CACHE_INVALIDATION_CONSUMER)
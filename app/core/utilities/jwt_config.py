@@ -1,11 +1,18 @@
 from base64 import b64decode
+from collections import OrderedDict
+from hashlib import sha256
 from os import environ
+from time import time
+import jwt
 from bson.objectid import ObjectId
 from dotenv import load_dotenv
 from pydantic import BaseModel
-from fastapi import Depends
-from fastapi_jwt_auth import AuthJWT
+from fastapi import Depends, Request, Response
+from fastapi_jwt_auth import AuthJWT as BaseAuthJWT
+from fastapi_jwt_auth.exceptions import InvalidHeaderError, JWTDecodeError
 from .database import db
+from .jwt_keys import KeyRing, load_key_ring
+from .metrics import metrics
 from ..constants.employee_roles import EmployeeRole
 from ..error.exceptions import (
     raise_not_found_exception,
@@ -17,25 +24,168 @@ from ..error.exceptions import (
 
 load_dotenv()
 
+# verified access tokens kept per worker, 0 turns the cache off
+JWT_VERIFIED_CACHE_SIZE = int(environ.get("JWT_VERIFIED_CACHE_SIZE", "4096"))
+
+# loaded on first use rather than on import, so scripts under app, such as
+# the one generating the first key pair, run without any keys configured
+key_ring: KeyRing | None = None
+
+
+def get_key_ring() -> KeyRing:
+    global key_ring
+
+    if key_ring is None:
+        key_ring = load_key_ring()
+
+    return key_ring
+
 
 class JWTAuthSetting(BaseModel):
-    authjwt_algorithm: str = environ.get("JWT_ALGORITHM")
-    authjwt_decode_algorithms: list[str] = [environ.get("JWT_ALGORITHM")]
+    authjwt_algorithm: str
+    authjwt_decode_algorithms: list[str]
     authjwt_token_location: set = {"cookies", "headers"}
     authjwt_access_cookie_key: str = "access_token"
     authjwt_refresh_cookie_key: str = "refresh_token"
     authjwt_cookie_csrf_protect: bool = False
-    authjwt_public_key: str = b64decode(environ.get("JWT_PUBLIC_KEY")).decode(
-        "utf-8"
+    authjwt_public_key: str
+    authjwt_private_key: str
+
+
+def get_config() -> JWTAuthSetting:
+    key_ring = get_key_ring()
+
+    return JWTAuthSetting(
+        authjwt_algorithm=key_ring.signing_key.algorithm,
+        authjwt_decode_algorithms=sorted(
+            {key.algorithm for key in key_ring.keys.values()}
+        ),
+        authjwt_public_key=b64decode(environ.get("JWT_PUBLIC_KEY")).decode(
+            "utf-8"
+        ),
+        authjwt_private_key=b64decode(environ.get("JWT_PRIVATE_KEY")).decode(
+            "utf-8"
+        ),
     )
-    authjwt_private_key: str = b64decode(
-        environ.get("JWT_PRIVATE_KEY")
-    ).decode("utf-8")
 
 
-@AuthJWT.load_config
-def get_config():
-    return JWTAuthSetting()
+is_jwt_config_loaded = False
+
+
+def load_jwt_config():
+    global is_jwt_config_loaded
+
+    if not is_jwt_config_loaded:
+        BaseAuthJWT.load_config(get_config)
+        is_jwt_config_loaded = True
+
+
+class VerifiedTokenCache:
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.claims: OrderedDict[bytes, dict] = OrderedDict()
+
+    def get(self, key: bytes, leeway: int = 0) -> dict | None:
+        claims = self.claims.get(key)
+
+        if claims is None:
+            return None
+
+        if "exp" in claims and claims["exp"] + leeway <= time():
+            del self.claims[key]
+
+            return None
+
+        self.claims.move_to_end(key)
+
+        return claims
+
+    def set(self, key: bytes, claims: dict):
+        if self.max_entries <= 0:
+            return
+
+        self.claims[key] = claims
+
+        while len(self.claims) > self.max_entries:
+            self.claims.popitem(last=False)
+
+    def clear(self):
+        self.claims.clear()
+
+
+verified_token_cache = VerifiedTokenCache(max_entries=JWT_VERIFIED_CACHE_SIZE)
+
+
+class AuthJWT(BaseAuthJWT):
+    def __init__(self, req: Request = None, res: Response = None):
+        load_jwt_config()
+        super().__init__(req=req, res=res)
+
+    def _get_secret_key(self, algorithm: str, process: str):
+        key_ring = get_key_ring()
+
+        if process == "encode" and algorithm == key_ring.signing_key.algorithm:
+            return key_ring.signing_key.private_key
+
+        return super()._get_secret_key(algorithm, process)
+
+    def _create_token(self, *args, headers: dict | None = None, **kwargs):
+        # the kid header tells verifiers which key of the ring signed it
+        return super()._create_token(
+            *args,
+            headers={**(headers or {}), "kid": get_key_ring().signing_key.kid},
+            **kwargs,
+        )
+
+    def _decode_token(self, encoded_token: str, issuer: str | None = None):
+        try:
+            headers = jwt.get_unverified_header(encoded_token)
+        except Exception as err:
+            raise InvalidHeaderError(status_code=422, message=str(err))
+
+        keys = get_key_ring().find(
+            kid=headers.get("kid"), algorithm=headers.get("alg")
+        )
+
+        if not keys:
+            raise JWTDecodeError(
+                status_code=422, message="unknown signing key"
+            )
+
+        for key in keys:
+            try:
+                # pinned to the algorithm of the key, never the one the token
+                # names
+                return jwt.decode(
+                    encoded_token,
+                    key.public_key,
+                    issuer=issuer,
+                    audience=self._decode_audience,
+                    leeway=self._decode_leeway,
+                    algorithms=[key.algorithm],
+                )
+            except jwt.InvalidSignatureError as err:
+                # another key of the same algorithm may have signed it
+                error = err
+            except Exception as err:
+                raise JWTDecodeError(status_code=422, message=str(err))
+
+        raise JWTDecodeError(status_code=422, message=str(error))
+
+    # fastapi_jwt_auth verifies the signature again on every claim lookup,
+    # so a request used to pay for three verifications of the same token
+    def _verified_token(self, encoded_token: str, issuer: str | None = None):
+        key = sha256(f"{issuer}|{encoded_token}".encode()).digest()
+        claims = verified_token_cache.get(key, leeway=self._decode_leeway)
+
+        if claims is None:
+            metrics.increment("jwt_verified_cache_misses")
+            claims = self._decode_token(encoded_token, issuer)
+            verified_token_cache.set(key, claims)
+        else:
+            metrics.increment("jwt_verified_cache_hits")
+
+        return dict(claims)
 
 
 class EmployeeRoleChecker:
@@ -0,0 +1,174 @@
+from base64 import b64decode, b64encode
+from hashlib import sha256
+from os import environ
+import jwt
+from cryptography.exceptions import InvalidSignature
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
+from cryptography.hazmat.primitives.serialization import (
+    Encoding,
+    NoEncryption,
+    PrivateFormat,
+    PublicFormat,
+    load_pem_private_key,
+    load_pem_public_key,
+)
+from dotenv import load_dotenv
+from jwt.algorithms import Algorithm
+
+load_dotenv()
+
+ec_curves = {
+    "ES256": ec.SECP256R1,
+    "ES384": ec.SECP384R1,
+    "ES512": ec.SECP521R1,
+}
+ec_curve_algorithms = {
+    curve.name: algorithm for algorithm, curve in ec_curves.items()
+}
+
+
+class Ed25519Algorithm(Algorithm):
+    # the PyJWT release fastapi_jwt_auth pins predates EdDSA support
+    def prepare_key(self, key):
+        if isinstance(
+            key, (ed25519.Ed25519PrivateKey, ed25519.Ed25519PublicKey)
+        ):
+            return key
+
+        key = key.encode() if isinstance(key, str) else key
+
+        if b"PRIVATE" in key:
+            return load_pem_private_key(key, password=None)
+
+        return load_pem_public_key(key)
+
+    def sign(self, msg: bytes, key) -> bytes:
+        return key.sign(msg)
+
+    def verify(self, msg: bytes, key, sig: bytes) -> bool:
+        try:
+            key.verify(sig, msg)
+        except InvalidSignature:
+            return False
+
+        return True
+
+
+try:
+    jwt.register_algorithm("EdDSA", Ed25519Algorithm())
+except ValueError:
+    pass
+
+
+def key_algorithm(public_key, preferred: str | None = None) -> str:
+    if isinstance(public_key, ed25519.Ed25519PublicKey):
+        return "EdDSA"
+
+    if isinstance(public_key, ec.EllipticCurvePublicKey):
+        return ec_curve_algorithms[public_key.curve.name]
+
+    if preferred and preferred[:2] in ("RS", "PS"):
+        return preferred
+
+    return "RS256"
+
+
+class JWTKey:
+    def __init__(
+        self, public_key, private_key=None, algorithm: str | None = None
+    ):
+        self.public_key = public_key
+        self.private_key = private_key
+        self.algorithm = algorithm or key_algorithm(public_key)
+        # derived from the key itself so every worker agrees on it
+        self.kid = sha256(
+            public_key.public_bytes(
+                Encoding.DER, PublicFormat.SubjectPublicKeyInfo
+            )
+        ).hexdigest()[:16]
+
+    def private_pem(self) -> bytes:
+        return self.private_key.private_bytes(
+            Encoding.PEM, PrivateFormat.PKCS8, NoEncryption()
+        )
+
+    def public_pem(self) -> bytes:
+        return self.public_key.public_bytes(
+            Encoding.PEM, PublicFormat.SubjectPublicKeyInfo
+        )
+
+
+class KeyRing:
+    def __init__(self, signing_key: JWTKey, verification_keys: list[JWTKey]):
+        self.signing_key = signing_key
+        self.keys = {key.kid: key for key in (signing_key, *verification_keys)}
+
+    def find(self, kid: str | None, algorithm: str | None) -> list[JWTKey]:
+        if kid:
+            return [self.keys[kid]] if kid in self.keys else []
+
+        # tokens issued before kid headers could be signed by any key of the
+        # algorithm, the current one first
+        return [
+            key for key in self.keys.values() if key.algorithm == algorithm
+        ]
+
+
+def generate_key(algorithm: str) -> JWTKey:
+    if algorithm == "EdDSA":
+        private_key = ed25519.Ed25519PrivateKey.generate()
+    elif algorithm in ec_curves:
+        private_key = ec.generate_private_key(ec_curves[algorithm]())
+    else:
+        private_key = rsa.generate_private_key(
+            public_exponent=65537, key_size=2048
+        )
+
+    return JWTKey(
+        public_key=private_key.public_key(),
+        private_key=private_key,
+        algorithm=algorithm,
+    )
+
+
+def decode_pem(value: str) -> bytes:
+    return b64decode(value)
+
+
+def encode_pem(pem: bytes) -> str:
+    return b64encode(pem).decode("utf-8")
+
+
+def load_verification_key(value: str) -> JWTKey:
+    # "ALG:base64 pem" pins the algorithm, a bare base64 pem derives it
+    algorithm, _, pem = value.rpartition(":")
+    public_key = load_pem_public_key(decode_pem(pem))
+
+    return JWTKey(
+        public_key=public_key,
+        algorithm=algorithm or key_algorithm(public_key),
+    )
+
+
+def load_key_ring() -> KeyRing:
+    private_key = load_pem_private_key(
+        decode_pem(environ.get("JWT_PRIVATE_KEY")), password=None
+    )
+    public_key = load_pem_public_key(decode_pem(environ.get("JWT_PUBLIC_KEY")))
+
+    return KeyRing(
+        signing_key=JWTKey(
+            public_key=public_key,
+            private_key=private_key,
+            algorithm=key_algorithm(
+                public_key, preferred=environ.get("JWT_ALGORITHM")
+            ),
+        ),
+        # public keys of retired signing keys, kept until the tokens they
+        # signed have expired
+        verification_keys=[
+            load_verification_key(value.strip())
+            for value in environ.get("JWT_PREVIOUS_PUBLIC_KEYS", "").split(",")
+            if value.strip()
+        ],
+    )
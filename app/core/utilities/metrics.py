@@ -0,0 +1,54 @@
+from time import perf_counter
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.counters: dict[tuple, float] = {}
+        self.timings: dict[tuple, dict[str, float]] = {}
+
+    def increment(self, name: str, value: float = 1, **labels: str):
+        key = (name, *sorted(labels.items()))
+        self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name: str, seconds: float, **labels: str):
+        key = (name, *sorted(labels.items()))
+        timing = self.timings.setdefault(
+            key, {"count": 0, "total_seconds": 0.0, "max_seconds": 0.0}
+        )
+        timing["count"] += 1
+        timing["total_seconds"] += seconds
+        timing["max_seconds"] = max(timing["max_seconds"], seconds)
+
+    def timer(self, name: str, **labels: str) -> "Timer":
+        return Timer(registry=self, name=name, labels=labels)
+
+    def snapshot(self) -> dict:
+        return {
+            "counters": [
+                {"name": name, "labels": dict(labels), "value": value}
+                for (name, *labels), value in self.counters.items()
+            ],
+            "timings": [
+                {"name": name, "labels": dict(labels), **timing}
+                for (name, *labels), timing in self.timings.items()
+            ],
+        }
+
+
+class Timer:
+    def __init__(self, registry: MetricsRegistry, name: str, labels: dict):
+        self.registry = registry
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self) -> "Timer":
+        self.started_at = perf_counter()
+        return self
+
+    def __exit__(self, *exception):
+        self.registry.observe(
+            self.name, perf_counter() - self.started_at, **self.labels
+        )
+
+
+metrics = MetricsRegistry()
@@ -1,11 +1,67 @@
+from os import environ
 from re import search
+from dotenv import load_dotenv
 from passlib.context import CryptContext
+from .metrics import metrics
 
+load_dotenv()
+
+# new hashes use PASSWORD_SCHEME, hashes made with the other scheme or other
+# costs still verify and are replaced on the next login
+PASSWORD_SCHEME = environ.get("PASSWORD_SCHEME", "bcrypt")
+PASSWORD_BCRYPT_ROUNDS = int(environ.get("PASSWORD_BCRYPT_ROUNDS", "12"))
+# argon2 needs argon2-cffi installed, memory cost is in KiB
+PASSWORD_ARGON2_TIME_COST = int(environ.get("PASSWORD_ARGON2_TIME_COST", "3"))
+PASSWORD_ARGON2_MEMORY_COST = int(
+    environ.get("PASSWORD_ARGON2_MEMORY_COST", "65536")
+)
+PASSWORD_ARGON2_PARALLELISM = int(
+    environ.get("PASSWORD_ARGON2_PARALLELISM", "4")
+)
+
+password_schemes = ("bcrypt", "argon2")
+
+
+def create_password_context(
+    scheme: str = PASSWORD_SCHEME,
+    bcrypt_rounds: int = PASSWORD_BCRYPT_ROUNDS,
+    argon2_time_cost: int = PASSWORD_ARGON2_TIME_COST,
+    argon2_memory_cost: int = PASSWORD_ARGON2_MEMORY_COST,
+    argon2_parallelism: int = PASSWORD_ARGON2_PARALLELISM,
+) -> CryptContext:
+    return CryptContext(
+        schemes=[
+            scheme,
+            *(name for name in password_schemes if name != scheme),
+        ],
+        deprecated="auto",
+        bcrypt__rounds=bcrypt_rounds,
+        argon2__time_cost=argon2_time_cost,
+        argon2__memory_cost=argon2_memory_cost,
+        argon2__parallelism=argon2_parallelism,
+    )
+
+
+password_context = create_password_context()
 
-password_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 def hash_password(password: str) -> str:
     return password_context.hash(password)
 
+
 def verify_password(password: str, hashed_password: str) -> bool:
-    return password_context.verify(password, hashed_password)
+    return verify_and_update_password(
+        password=password, hashed_password=hashed_password
+    )[0]
+
+
+def verify_and_update_password(
+    password: str, hashed_password: str
+) -> tuple[bool, str | None]:
+    # the second value is a fresh hash when the stored one was made with an
+    # older scheme or cost, None otherwise
+    with metrics.timer(
+        "password_verify",
+        scheme=password_context.identify(hashed_password) or "unknown",
+    ):
+        return password_context.verify_and_update(password, hashed_password)
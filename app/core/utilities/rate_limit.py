@@ -0,0 +1,159 @@
+from collections import OrderedDict, deque
+from os import environ
+from time import time
+from uuid import uuid4
+from dotenv import load_dotenv
+from fastapi import Request
+from .cache import CACHE_REDIS_URL, redis
+from .metrics import metrics
+from ..error.exceptions import raise_too_many_request_exception
+
+load_dotenv()
+
+# "memory" counts per worker, "redis" shares the windows between workers
+RATE_LIMIT_BACKEND = environ.get("RATE_LIMIT_BACKEND", "memory")
+RATE_LIMIT_REDIS_URL = environ.get("RATE_LIMIT_REDIS_URL", CACHE_REDIS_URL)
+RATE_LIMIT_MAX_KEYS = int(environ.get("RATE_LIMIT_MAX_KEYS", "100000"))
+# only behind a proxy that sets it, otherwise clients can pick their own ip
+RATE_LIMIT_TRUST_FORWARDED_FOR = (
+    environ.get("RATE_LIMIT_TRUST_FORWARDED_FOR", "false").lower() == "true"
+)
+
+
+def parse_rate(rate: str) -> tuple[int, float]:
+    # "<attempts>/<seconds>"
+    limit, window = rate.split("/")
+
+    return int(limit), float(window)
+
+
+class MemoryRateLimitBackend:
+    def __init__(self, max_keys: int):
+        self.max_keys = max_keys
+        # least recently hit first, every key keeps the window it is
+        # counted over since limiters with different windows share the table
+        self.windows: OrderedDict[str, tuple[float, deque]] = OrderedDict()
+
+    async def hit(self, key: str, limit: int, window: float) -> float:
+        now = time()
+        entry = self.windows.get(key)
+
+        if entry is None:
+            if len(self.windows) >= self.max_keys:
+                self.evict(now=now)
+
+            entry = self.windows[key] = (window, deque(maxlen=limit))
+
+        self.windows.move_to_end(key)
+        hits = entry[1]
+
+        # only the last `limit` attempts matter, the oldest of them decides
+        # whether one more fits in the window
+        if len(hits) == limit and hits[0] > now - window:
+            return hits[0] + window - now
+
+        hits.append(now)
+
+        return 0
+
+    def evict(self, now: float):
+        key, (window, hits) = next(iter(self.windows.items()))
+
+        # the least recently hit key goes even if its window is still live,
+        # that keeps the table bounded at O(1) per new key
+        if hits and hits[-1] > now - window:
+            metrics.increment("rate_limit_live_evictions")
+
+        del self.windows[key]
+
+
+class RedisRateLimitBackend:
+    def __init__(self, url: str):
+        if redis is None:
+            raise RuntimeError(
+                "RATE_LIMIT_BACKEND=redis needs the redis package, run pipenv "
+                "sync to install it"
+            )
+
+        self.client = redis.from_url(url)
+
+    async def hit(self, key: str, limit: int, window: float) -> float:
+        now = time()
+        member = f"{now}:{uuid4().hex}"
+
+        async with self.client.pipeline(transaction=True) as pipeline:
+            pipeline.zremrangebyscore(key, 0, now - window)
+            pipeline.zadd(key, {member: now})
+            pipeline.zrange(key, 0, 0, withscores=True)
+            pipeline.zcard(key)
+            pipeline.pexpire(key, int(window * 1000))
+            _, _, oldest, count, _ = await pipeline.execute()
+
+        if count <= limit:
+            return 0
+
+        await self.client.zrem(key, member)
+
+        return oldest[0][1] + window - now
+
+
+def create_rate_limit_backend(name: str = RATE_LIMIT_BACKEND):
+    if name == "redis":
+        return RedisRateLimitBackend(url=RATE_LIMIT_REDIS_URL)
+
+    return MemoryRateLimitBackend(max_keys=RATE_LIMIT_MAX_KEYS)
+
+
+rate_limit_backend = create_rate_limit_backend()
+
+
+def client_ip(request: Request) -> str:
+    forwarded_for = request.headers.get("x-forwarded-for")
+
+    if RATE_LIMIT_TRUST_FORWARDED_FOR and forwarded_for:
+        return forwarded_for.split(",")[0].strip()
+
+    return request.client.host if request.client else "unknown"
+
+
+class RateLimiter:
+    def __init__(
+        self,
+        scope: str,
+        per_ip: str | None = None,
+        per_phone_number: str | None = None,
+    ):
+        self.scope = scope
+        self.per_ip = parse_rate(per_ip) if per_ip else None
+        self.per_phone_number = (
+            parse_rate(per_phone_number) if per_phone_number else None
+        )
+
+    async def check(self, key: str, rate: tuple[int, float], location: list):
+        retry_after = await rate_limit_backend.hit(
+            key=f"rate_limit:{self.scope}:{key}", limit=rate[0], window=rate[1]
+        )
+
+        if retry_after > 0:
+            metrics.increment("rate_limited_requests", scope=self.scope)
+            raise_too_many_request_exception(
+                message=f"too many attempts, try again in {int(retry_after) + 1} seconds",
+                location=location,
+            )
+
+    async def __call__(self, request: Request):
+        if self.per_ip:
+            await self.check(
+                key=f"ip:{client_ip(request)}",
+                rate=self.per_ip,
+                location=["request", "client"],
+            )
+
+        phone_number = request.query_params.get("phone_number")
+
+        if self.per_phone_number and phone_number:
+            await self.check(
+                key=f"phone_number:{phone_number}",
+                rate=self.per_phone_number,
+                location=["query parameter", "phone_number"],
+            )
@@ -0,0 +1,69 @@
+from bson.objectid import ObjectId
+from .database import db
+from .invalidation import CACHE_INVALIDATION_ENABLED
+from .metrics import metrics
+
+
+class ReferenceCache:
+    def __init__(self, collection: str, enabled: bool | None = None):
+        self.collection = collection
+        self.documents: dict[str, dict] = {}
+        # without the invalidation bus a worker never sees writes made
+        # through the other workers, so every lookup goes to the database
+        self.enabled = (
+            CACHE_INVALIDATION_ENABLED if enabled is None else enabled
+        )
+
+    async def refresh(self):
+        documents = {
+            str(document["_id"]): document
+            async for document in db[self.collection].find(filter={})
+        }
+
+        # swap the whole mapping so readers never see a partial reload
+        self.documents = documents
+
+    async def get(self, id: str) -> dict:
+        document = self.documents.get(id) if self.enabled else None
+
+        if document is None:
+            metrics.increment("cache_misses", namespace=self.collection)
+            document = await self.load(id)
+        else:
+            metrics.increment("cache_hits", namespace=self.collection)
+
+        return dict(document) if document else {}
+
+    async def load(self, id: str) -> dict | None:
+        if not ObjectId.is_valid(id):
+            return None
+
+        document = await db[self.collection].find_one(
+            filter={"_id": ObjectId(id)}
+        )
+
+        if document and self.enabled:
+            self.documents = {**self.documents, id: document}
+
+        return document
+
+    def __contains__(self, id: str) -> bool:
+        return id in self.documents
+
+    async def invalidate(self, event: dict):
+        key = event.get("documentKey", {}).get("_id")
+
+        if key is None:
+            await self.refresh()
+
+            return
+
+        document = await db[self.collection].find_one(filter={"_id": key})
+        documents = dict(self.documents)
+
+        if document:
+            documents[str(key)] = document
+        else:
+            documents.pop(str(key), None)
+
+        self.documents = documents
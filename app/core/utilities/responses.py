@@ -0,0 +1,49 @@
+from datetime import date
+from decimal import Decimal
+from typing import Any
+import orjson
+from bson.objectid import ObjectId
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+
+orjson_options = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def orjson_default(value: Any) -> Any:
+    if isinstance(value, ObjectId):
+        return str(value)
+
+    if isinstance(value, BaseModel):
+        return value.dict(by_alias=True)
+
+    if isinstance(value, Decimal):
+        return float(value)
+
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+
+    if isinstance(value, date):
+        return value.isoformat()
+
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+class ORJSONResponse(JSONResponse):
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(
+            content, default=orjson_default, option=orjson_options
+        )
+
+
+def model_response(
+    model: BaseModel, status_code: int = 200, exclude: dict | None = None
+) -> ORJSONResponse:
+    # skips the jsonable_encoder pass and response_model re-validation
+    # fastapi runs on plain return values
+    return ORJSONResponse(
+        content=model.dict(by_alias=True, exclude=exclude),
+        status_code=status_code,
+    )
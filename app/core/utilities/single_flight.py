@@ -0,0 +1,47 @@
+from asyncio import Task, create_task, shield
+from copy import deepcopy
+from functools import wraps
+from inspect import signature
+from typing import Callable
+from .cache import arguments_key
+from .metrics import metrics
+
+
+def single_flight(key: Callable[..., str] | None = None):
+    def decorator(function):
+        function_signature = signature(function)
+        in_flight: dict[str, Task] = {}
+
+        @wraps(function)
+        async def wrapper(*args, **kwargs):
+            arguments = function_signature.bind(*args, **kwargs)
+            arguments.apply_defaults()
+            call_key = (
+                key(**arguments.arguments)
+                if key
+                else arguments_key(function.__name__, arguments.arguments)
+            )
+            task = in_flight.get(call_key)
+
+            if task is not None:
+                metrics.increment(
+                    "single_flight_coalesced", function=function.__name__
+                )
+                # callers own what they get back, so followers receive a
+                # copy of the shared result
+                return deepcopy(await shield(task))
+
+            metrics.increment(
+                "single_flight_executed", function=function.__name__
+            )
+            # the query runs in its own task so a cancelled first caller
+            # does not fail everyone waiting on it
+            task = create_task(function(*args, **kwargs))
+            in_flight[call_key] = task
+            task.add_done_callback(lambda _: in_flight.pop(call_key, None))
+
+            return await shield(task)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,101 @@
+from ..constants.measurement_units import (
+    UnitDefinition,
+    unit_key,
+    unit_registry as measurement_unit_registry,
+)
+
+
+def normalize_unit(unit) -> str:
+    # custom unit names are stored lowercased, built in names already are
+    unit = unit_key(unit)
+
+    return unit.strip().lower() if isinstance(unit, str) else unit
+
+
+class UnitRegistry:
+    def __init__(self):
+        self.custom_units: dict[tuple[str | None, str], UnitDefinition] = {}
+
+    def load(self, units: list[dict]):
+        custom_units = {}
+
+        for unit in units:
+            base = measurement_unit_registry.get(unit_key(unit["unit"]))
+
+            if base is None:
+                continue
+
+            key = (unit.get("item"), normalize_unit(unit["name"]))
+            custom_units[key] = UnitDefinition(
+                dimension=base.dimension, factor=unit["amount"] * base.factor
+            )
+
+        # swap the whole mapping so readers never see a partial reload
+        self.custom_units = custom_units
+
+    def lookup(self, unit, item: str | None = None) -> UnitDefinition | None:
+        unit = normalize_unit(unit)
+
+        return (
+            self.custom_units.get((item, unit))
+            or self.custom_units.get((None, unit))
+            or measurement_unit_registry.get(unit)
+        )
+
+    def factors(self) -> list[tuple[str | None, str, float]]:
+        # (item, unit, factor) in lookup precedence, item specific units
+        # first, then shared custom units, then the built in ones
+        custom_units = sorted(
+            self.custom_units.items(), key=lambda unit: unit[0][0] is None
+        )
+
+        return [
+            (item, unit, definition.factor)
+            for (item, unit), definition in custom_units
+        ] + [
+            (None, unit, definition.factor)
+            for unit, definition in measurement_unit_registry.items()
+        ]
+
+    def factor(self, unit, item: str | None = None) -> float | None:
+        definition = self.lookup(unit=unit, item=item)
+
+        return definition.factor if definition else None
+
+    def base_values(
+        self, amount: float, unit, money: float, item: str | None = None
+    ) -> dict:
+        factor = self.factor(unit=unit, item=item)
+
+        if factor is None or not amount:
+            return {"base_amount": None, "base_unit_cost": None}
+
+        base_amount = amount * factor
+
+        return {
+            "base_amount": base_amount,
+            "base_unit_cost": (
+                money / base_amount if money is not None else None
+            ),
+        }
+
+    def is_same_measurement_type(self, a, b, item: str | None = None) -> bool:
+        a_definition = self.lookup(unit=a, item=item)
+        b_definition = self.lookup(unit=b, item=item)
+
+        return (
+            a_definition is not None
+            and b_definition is not None
+            and a_definition.dimension == b_definition.dimension
+        )
+
+    def conversion_ratio(self, from_unit, to_unit, item: str | None = None):
+        if not self.is_same_measurement_type(from_unit, to_unit, item=item):
+            raise ValueError(f"can not convert [{from_unit}] to [{to_unit}]")
+
+        return self.factor(unit=from_unit, item=item) / self.factor(
+            unit=to_unit, item=item
+        )
+
+
+unit_registry = UnitRegistry()
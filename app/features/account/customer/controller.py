@@ -1,7 +1,16 @@
 from datetime import datetime
 from bson.objectid import ObjectId
+from pymongo import ASCENDING
 from ....core.utilities.database import db, default_find_limit
+from ....core.utilities.conditional import collection_version
 from ....core.utilities.converter import str_to_match_all_regex
+from ...auth import controller as session_controller
+
+
+async def create_indexes():
+    await db["customers"].create_index(
+        [("phone_number", ASCENDING)], unique=True
+    )
 
 
 def get_processed_filter(
@@ -59,6 +68,7 @@ async def find_many_customers(
     limit: int = 0,
     skip: int = 0,
     sort_by: list[str] = [],
+    projection: dict | None = None,
 ) -> list[dict]:
     filter = get_processed_filter(
         name=name, phone_number=phone_number, is_active=is_active, roles=roles
@@ -69,6 +79,7 @@ async def find_many_customers(
         customer
         async for customer in db["customers"].find(
             filter=filter,
+            projection=projection,
             skip=skip,
             limit=limit if limit > 0 else default_find_limit,
             sort=sort,
@@ -78,6 +89,19 @@ async def find_many_customers(
     return list(customers) if customers else []
 
 
+async def find_customers_version(
+    roles: list[str] = [],
+    name: str | None = None,
+    phone_number: str | None = None,
+    is_active: bool | None = None,
+) -> dict:
+    filter = get_processed_filter(
+        name=name, phone_number=phone_number, is_active=is_active, roles=roles
+    )
+
+    return await collection_version(collection=db["customers"], filter=filter)
+
+
 async def find_one_customer(
     name: str | None = None,
     phone_number: str | None = None,
@@ -94,8 +118,10 @@ async def find_one_customer(
     return dict(customer) if customer else {}
 
 
-async def find_customer_by_id(id: str) -> dict:
-    customer = await db["customers"].find_one(filter={"_id": ObjectId(id)})
+async def find_customer_by_id(id: str, projection: dict | None = None) -> dict:
+    customer = await db["customers"].find_one(
+        filter={"_id": ObjectId(id)}, projection=projection
+    )
 
     return dict(customer) if customer else {}
 
@@ -122,6 +148,23 @@ async def update_customer_password(
         },
     )
 
+    # a new password signs every device out
+    if result.modified_count > 0:
+        await session_controller.revoke_subject_sessions(subject=id)
+
+    return True if result.modified_count > 0 else False
+
+
+async def rehash_customer_password(
+    id: str, hashed_password: str, new_hashed_password: str
+) -> bool:
+    # only replaces the hash it was computed from, a password changed in the
+    # meantime wins
+    result = await db["customers"].update_one(
+        filter={"_id": ObjectId(id), "password": hashed_password},
+        update={"$set": {"password": new_hashed_password}},
+    )
+
     return True if result.modified_count > 0 else False
 
 
@@ -137,6 +180,10 @@ async def deactivate_customer(id: str, updated_by: str) -> bool:
         },
     )
 
+    await session_controller.update_subject_sessions(
+        subject=id, update={"$set": {"is_active": False}}
+    )
+
     return True if result.modified_count > 0 else False
 
 
@@ -152,6 +199,10 @@ async def activate_customer(id: str, updated_by: str) -> bool:
         },
     )
 
+    await session_controller.update_subject_sessions(
+        subject=id, update={"$set": {"is_active": True}}
+    )
+
     return True if result.modified_count > 0 else False
 
 
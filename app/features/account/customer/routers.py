@@ -1,5 +1,6 @@
 from bson.objectid import ObjectId
-from fastapi import APIRouter, Depends, Query
+from pymongo.errors import DuplicateKeyError
+from fastapi import APIRouter, Depends, Query, Request
 from ....core.models.common_responses import UpdateResponseModel
 from ....core.constants.regex import pin_code
 from ....core.constants.employee_roles import EmployeeRole
@@ -13,6 +14,9 @@ from ....core.utilities.jwt_config import (
     EmployeeRoleChecker,
     require_user,
 )
+from ....core.utilities.responses import model_response
+from ....core.utilities.fields import FieldSelector, FieldSet
+from ....core.utilities.conditional import ResourceVersion
 from ....core.error.exceptions import (
     raise_duplicated_entry_exception,
     raise_not_found_exception,
@@ -29,19 +33,25 @@ customer_router.tags = ["Account - Customers"]
 
 
 @customer_router.get("/me", response_model=models.SingleCustomerResponseModel)
-async def get_me(current_user_id: AuthJWT = Depends(require_user)):
-    customer = await controller.find_customer_by_id(id=current_user_id)
+async def get_me(
+    current_user_id: AuthJWT = Depends(require_user),
+    fields: FieldSet = Depends(FieldSelector(models.CustomerReadModel)),
+):
+    customer = await controller.find_customer_by_id(
+        id=current_user_id, projection=fields.projection
+    )
 
     if not customer:
         raise_unknown_error_exception(
             message="problem while getting customer details"
         )
 
-    return models.SingleCustomerResponseModel(
-        success=True,
-        customer=dict_to_model(
-            model=models.CustomerReadModel, dict_model=customer
+    return model_response(
+        models.SingleCustomerResponseModel(
+            success=True,
+            customer=dict_to_model(model=fields.model, dict_model=customer),
         ),
+        exclude=fields.exclude("customer"),
     )
 
 
@@ -78,6 +88,7 @@ async def change_my_password(
 
 @customer_router.get("/", response_model=models.MultipleCustomerResponseModel)
 async def get_customers(
+    request: Request,
     roles: list[EmployeeRole] = Query(default=[]),
     name: str | None = None,
     phone_number: str | None = None,
@@ -88,7 +99,21 @@ async def get_customers(
     current_user_id: AuthJWT = Depends(
         EmployeeRoleChecker(EmployeeRole.VIEW_EMPLOYEES)
     ),
+    fields: FieldSet = Depends(FieldSelector(models.CustomerReadModel)),
 ):
+    version = ResourceVersion(
+        request=request,
+        **await controller.find_customers_version(
+            name=name,
+            phone_number=phone_number,
+            roles=[role.value for role in roles],
+            is_active=is_active,
+        ),
+    )
+
+    if version.is_not_modified():
+        return version.not_modified_response()
+
     customers = await controller.find_many_customers(
         name=name,
         phone_number=phone_number,
@@ -97,14 +122,20 @@ async def get_customers(
         limit=limit,
         skip=skip,
         sort_by=sort_by,
+        projection=fields.projection,
     )
 
-    return models.MultipleCustomerResponseModel(
-        success=True,
-        customers=[
-            dict_to_model(model=models.CustomerReadModel, dict_model=customer)
-            for customer in customers
-        ],
+    return version.apply(
+        model_response(
+            models.MultipleCustomerResponseModel(
+                success=True,
+                customers=[
+                    dict_to_model(model=fields.model, dict_model=customer)
+                    for customer in customers
+                ],
+            ),
+            exclude=fields.exclude("customers", many=True),
+        )
     )
 
 
@@ -112,10 +143,12 @@ async def get_customers(
     "/{customer_id}", response_model=models.SingleCustomerResponseModel
 )
 async def get_customer(
+    request: Request,
     customer_id: str,
     current_user_id: AuthJWT = Depends(
         EmployeeRoleChecker(required_role=EmployeeRole.VIEW_EMPLOYEES)
     ),
+    fields: FieldSet = Depends(FieldSelector(models.CustomerReadModel)),
 ):
     if not ObjectId.is_valid(customer_id):
         raise_unprocessable_value_exception(
@@ -123,7 +156,9 @@ async def get_customer(
             location=["path parameter", "customer_id"],
         )
 
-    customer = await controller.find_customer_by_id(id=customer_id)
+    customer = await controller.find_customer_by_id(
+        id=customer_id, projection=fields.projection
+    )
 
     if not customer:
         raise_not_found_exception(
@@ -131,11 +166,23 @@ async def get_customer(
             location=["path parameter", "customer_id"],
         )
 
-    return models.SingleCustomerResponseModel(
-        success=True,
-        customer=dict_to_model(
-            model=models.CustomerReadModel, dict_model=customer
-        ),
+    version = ResourceVersion(
+        request=request, updated_at=customer.get("updated_at")
+    )
+
+    if version.is_not_modified():
+        return version.not_modified_response()
+
+    return version.apply(
+        model_response(
+            models.SingleCustomerResponseModel(
+                success=True,
+                customer=dict_to_model(
+                    model=fields.model, dict_model=customer
+                ),
+            ),
+            exclude=fields.exclude("customer"),
+        )
     )
 
 
@@ -249,15 +296,6 @@ async def update_customer_info(
             location=["path parameter", "customer_id"],
         )
 
-    if updated_customer.phone_number:
-        if await controller.find_customer_by_phone_number(
-            phone_number=updated_customer.phone_number
-        ):
-            raise_duplicated_entry_exception(
-                message="customer with this phone number={updated_customer.phone_number} already exists",
-                location=["request body", "phone_number"],
-            )
-
     if updated_customer.first_name:
         updated_customer.first_name = updated_customer.first_name.lower()
     if updated_customer.last_name:
@@ -269,11 +307,19 @@ async def update_customer_info(
             updated_customer.passport_number.lower()
         )
 
-    result = await controller.update_customer_info(
-        id=customer_id,
-        updated_customer=model_to_dict_without_None(model=updated_customer),
-        updated_by=current_user_id,
-    )
+    try:
+        result = await controller.update_customer_info(
+            id=customer_id,
+            updated_customer=model_to_dict_without_None(
+                model=updated_customer
+            ),
+            updated_by=current_user_id,
+        )
+    except DuplicateKeyError:
+        raise_duplicated_entry_exception(
+            message=f"customer with this phone number={updated_customer.phone_number} already exists",
+            location=["request body", "phone_number"],
+        )
 
     if not result:
         raise_operation_failed_exception(
@@ -1,7 +1,16 @@
 from datetime import datetime
 from bson.objectid import ObjectId
+from pymongo import ASCENDING
 from ....core.utilities.database import db, default_find_limit
+from ....core.utilities.conditional import collection_version
 from ....core.utilities.converter import str_to_match_all_regex
+from ...auth import controller as session_controller
+
+
+async def create_indexes():
+    await db["employees"].create_index(
+        [("phone_number", ASCENDING)], unique=True
+    )
 
 
 def get_processed_filter(
@@ -59,6 +68,7 @@ async def find_many_employees(
     limit: int = 0,
     skip: int = 0,
     sort_by: list[str] = str,
+    projection: dict | None = None,
 ) -> list[dict]:
     filter = get_processed_filter(
         name=name, phone_number=phone_number, is_active=is_active, roles=roles
@@ -69,6 +79,7 @@ async def find_many_employees(
         employee
         async for employee in db["employees"].find(
             filter=filter,
+            projection=projection,
             skip=skip,
             limit=limit if limit > 0 else default_find_limit,
             sort=sort,
@@ -78,6 +89,19 @@ async def find_many_employees(
     return list(employees) if employees else []
 
 
+async def find_employees_version(
+    roles: list[str] = [],
+    name: str | None = None,
+    phone_number: str | None = None,
+    is_active: bool | None = None,
+) -> dict:
+    filter = get_processed_filter(
+        name=name, phone_number=phone_number, is_active=is_active, roles=roles
+    )
+
+    return await collection_version(collection=db["employees"], filter=filter)
+
+
 async def find_one_employee(
     name: str | None = None,
     phone_number: str | None = None,
@@ -94,8 +118,10 @@ async def find_one_employee(
     return dict(employee) if employee else {}
 
 
-async def find_employee_by_id(id: str) -> dict:
-    employee = await db["employees"].find_one(filter={"_id": ObjectId(id)})
+async def find_employee_by_id(id: str, projection: dict | None = None) -> dict:
+    employee = await db["employees"].find_one(
+        filter={"_id": ObjectId(id)}, projection=projection
+    )
 
     return dict(employee) if employee else {}
 
@@ -122,6 +148,23 @@ async def update_employee_password(
         },
     )
 
+    # a new password signs every device out
+    if result.modified_count > 0:
+        await session_controller.revoke_subject_sessions(subject=id)
+
+    return True if result.modified_count > 0 else False
+
+
+async def rehash_employee_password(
+    id: str, hashed_password: str, new_hashed_password: str
+) -> bool:
+    # only replaces the hash it was computed from, a password changed in the
+    # meantime wins
+    result = await db["employees"].update_one(
+        filter={"_id": ObjectId(id), "password": hashed_password},
+        update={"$set": {"password": new_hashed_password}},
+    )
+
     return True if result.modified_count > 0 else False
 
 
@@ -139,6 +182,11 @@ async def add_employee_roles(
         },
     )
 
+    await session_controller.update_subject_sessions(
+        subject=id,
+        update={"$addToSet": {"roles": {"$each": list(roles)}}},
+    )
+
     return True if result.modified_count > 0 else False
 
 
@@ -156,6 +204,10 @@ async def remove_employee_roles(
         },
     )
 
+    await session_controller.update_subject_sessions(
+        subject=id, update={"$pull": {"roles": {"$in": list(roles)}}}
+    )
+
     return True if result.modified_count > 0 else False
 
 
@@ -171,6 +223,10 @@ async def deactivate_employee(id: str, updated_by: str) -> bool:
         },
     )
 
+    await session_controller.update_subject_sessions(
+        subject=id, update={"$set": {"is_active": False}}
+    )
+
     return True if result.modified_count > 0 else False
 
 
@@ -186,6 +242,10 @@ async def activate_employee(id: str, updated_by: str) -> bool:
         },
     )
 
+    await session_controller.update_subject_sessions(
+        subject=id, update={"$set": {"is_active": True}}
+    )
+
     return True if result.modified_count > 0 else False
 
 
@@ -1,5 +1,6 @@
 from bson.objectid import ObjectId
-from fastapi import APIRouter, Depends, Query
+from pymongo.errors import DuplicateKeyError
+from fastapi import APIRouter, Depends, Query, Request
 from ....core.constants.employee_roles import EmployeeRole
 from ....core.models.common_responses import UpdateResponseModel
 from ....core.constants.regex import pin_code
@@ -13,6 +14,9 @@ from ....core.utilities.jwt_config import (
     EmployeeRoleChecker,
     require_user,
 )
+from ....core.utilities.responses import model_response
+from ....core.utilities.fields import FieldSelector, FieldSet
+from ....core.utilities.conditional import ResourceVersion
 from ....core.error.exceptions import (
     raise_duplicated_entry_exception,
     raise_not_found_exception,
@@ -29,19 +33,25 @@ employee_router.tags = ["Account - Employees"]
 
 
 @employee_router.get("/me", response_model=models.SingleEmployeeResponseModel)
-async def get_me(current_user_id: AuthJWT = Depends(require_user)):
-    employee = await controller.find_employee_by_id(id=current_user_id)
+async def get_me(
+    current_user_id: AuthJWT = Depends(require_user),
+    fields: FieldSet = Depends(FieldSelector(models.EmployeeReadModel)),
+):
+    employee = await controller.find_employee_by_id(
+        id=current_user_id, projection=fields.projection
+    )
 
     if not employee:
         raise_unknown_error_exception(
             message="problem while getting employee details"
         )
 
-    return models.SingleEmployeeResponseModel(
-        success=True,
-        employee=dict_to_model(
-            model=models.EmployeeReadModel, dict_model=employee
+    return model_response(
+        models.SingleEmployeeResponseModel(
+            success=True,
+            employee=dict_to_model(model=fields.model, dict_model=employee),
         ),
+        exclude=fields.exclude("employee"),
     )
 
 
@@ -78,6 +88,7 @@ async def change_my_password(
 
 @employee_router.get("/", response_model=models.MultipleEmployeeResponseModel)
 async def get_employees(
+    request: Request,
     roles: list[EmployeeRole] = Query(default=[]),
     name: str | None = None,
     phone_number: str | None = None,
@@ -90,7 +101,21 @@ async def get_employees(
     current_user_id: AuthJWT = Depends(
         EmployeeRoleChecker(EmployeeRole.VIEW_EMPLOYEES)
     ),
+    fields: FieldSet = Depends(FieldSelector(models.EmployeeReadModel)),
 ):
+    version = ResourceVersion(
+        request=request,
+        **await controller.find_employees_version(
+            name=name,
+            phone_number=phone_number,
+            roles=[role.value for role in roles],
+            is_active=is_active,
+        ),
+    )
+
+    if version.is_not_modified():
+        return version.not_modified_response()
+
     employees = await controller.find_many_employees(
         name=name,
         phone_number=phone_number,
@@ -99,14 +124,20 @@ async def get_employees(
         limit=limit,
         skip=skip,
         sort_by=sort_by,
+        projection=fields.projection,
     )
 
-    return models.MultipleEmployeeResponseModel(
-        success=True,
-        employees=[
-            dict_to_model(model=models.EmployeeReadModel, dict_model=employee)
-            for employee in employees
-        ],
+    return version.apply(
+        model_response(
+            models.MultipleEmployeeResponseModel(
+                success=True,
+                employees=[
+                    dict_to_model(model=fields.model, dict_model=employee)
+                    for employee in employees
+                ],
+            ),
+            exclude=fields.exclude("employees", many=True),
+        )
     )
 
 
@@ -114,10 +145,12 @@ async def get_employees(
     "/{employee_id}", response_model=models.SingleEmployeeResponseModel
 )
 async def get_employee(
+    request: Request,
     employee_id: str,
     current_user_id: AuthJWT = Depends(
         EmployeeRoleChecker(required_role=EmployeeRole.VIEW_EMPLOYEES)
     ),
+    fields: FieldSet = Depends(FieldSelector(models.EmployeeReadModel)),
 ):
     if not ObjectId.is_valid(employee_id):
         raise_unprocessable_value_exception(
@@ -125,7 +158,9 @@ async def get_employee(
             location=["path parameter", "employee_id"],
         )
 
-    employee = await controller.find_employee_by_id(id=employee_id)
+    employee = await controller.find_employee_by_id(
+        id=employee_id, projection=fields.projection
+    )
 
     if not employee:
         raise_not_found_exception(
@@ -133,11 +168,23 @@ async def get_employee(
             location=["path parameter", "employee_id"],
         )
 
-    return models.SingleEmployeeResponseModel(
-        success=True,
-        employee=dict_to_model(
-            model=models.EmployeeReadModel, dict_model=employee
-        ),
+    version = ResourceVersion(
+        request=request, updated_at=employee.get("updated_at")
+    )
+
+    if version.is_not_modified():
+        return version.not_modified_response()
+
+    return version.apply(
+        model_response(
+            models.SingleEmployeeResponseModel(
+                success=True,
+                employee=dict_to_model(
+                    model=fields.model, dict_model=employee
+                ),
+            ),
+            exclude=fields.exclude("employee"),
+        )
     )
 
 
@@ -331,25 +378,24 @@ async def update_employee_info(
             location=["path parameter", "employee_id"],
         )
 
-    if updated_employee.phone_number:
-        if await controller.find_employee_by_phone_number(
-            phone_number=updated_employee.phone_number
-        ):
-            raise_duplicated_entry_exception(
-                message="employee with this phone number={updated_employee.phone_number} already exists",
-                location=["request body", "phone_number"],
-            )
-
     if updated_employee.first_name:
         updated_employee.first_name = updated_employee.first_name.lower()
     if updated_employee.last_name:
         updated_employee.last_name = updated_employee.last_name.lower()
 
-    result = await controller.update_employee_info(
-        id=employee_id,
-        updated_employee=model_to_dict_without_None(model=updated_employee),
-        updated_by=current_user_id,
-    )
+    try:
+        result = await controller.update_employee_info(
+            id=employee_id,
+            updated_employee=model_to_dict_without_None(
+                model=updated_employee
+            ),
+            updated_by=current_user_id,
+        )
+    except DuplicateKeyError:
+        raise_duplicated_entry_exception(
+            message=f"employee with this phone number={updated_employee.phone_number} already exists",
+            location=["request body", "phone_number"],
+        )
 
     if not result:
         raise_operation_failed_exception(
@@ -1,13 +1,9 @@
+from datetime import datetime
 from bson.objectid import ObjectId
+from pymongo import ASCENDING
 from ...core.utilities.database import db
 
 
-async def employee_exist(phone_number: str) -> bool:
-    if await db["employees"].count_documents({"phone_number": phone_number}) > 0:
-        return True
-    return False
-
-
 async def insert_employee(employee: dict) -> str | None:
     return await db["employees"].insert_one(employee)
 
@@ -32,3 +28,78 @@ async def update_employee_password(id: str, new_password: str) -> bool:
         return True
 
     return False
+
+
+async def create_indexes():
+    await db["refresh_sessions"].create_index(
+        [("expires_at", ASCENDING)], expireAfterSeconds=0
+    )
+    await db["refresh_sessions"].create_index([("subject", ASCENDING)])
+    await db["refresh_sessions"].create_index([("family", ASCENDING)])
+
+
+async def create_session(
+    id: str,
+    family: str,
+    subject: str,
+    account: str,
+    roles: list[str],
+    is_active: bool,
+    expires_at: datetime,
+) -> bool:
+    inserted_id = await db["refresh_sessions"].insert_one(
+        {
+            "_id": id,
+            "family": family,
+            "subject": subject,
+            "account": account,
+            "roles": roles,
+            "is_active": is_active,
+            "created_at": datetime.utcnow(),
+            "expires_at": expires_at,
+            "used_at": None,
+        }
+    )
+
+    return bool(inserted_id)
+
+
+async def use_session(id: str, account: str) -> dict:
+    # claiming the session and checking it was unused is one atomic write,
+    # so a refresh token can be exchanged only once
+    session = await db["refresh_sessions"].find_one_and_update(
+        filter={"_id": id, "account": account, "used_at": None},
+        update={"$set": {"used_at": datetime.utcnow()}},
+    )
+
+    return dict(session) if session else {}
+
+
+async def find_session_by_id(id: str) -> dict:
+    session = await db["refresh_sessions"].find_one(filter={"_id": id})
+
+    return dict(session) if session else {}
+
+
+async def revoke_session_family(family: str) -> int:
+    result = await db["refresh_sessions"].delete_many(
+        filter={"family": family}
+    )
+
+    return result.deleted_count
+
+
+async def revoke_subject_sessions(subject: str) -> int:
+    result = await db["refresh_sessions"].delete_many(
+        filter={"subject": subject}
+    )
+
+    return result.deleted_count
+
+
+async def update_subject_sessions(subject: str, update: dict) -> int:
+    result = await db["refresh_sessions"].update_many(
+        filter={"subject": subject}, update=update
+    )
+
+    return result.modified_count
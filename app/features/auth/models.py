@@ -20,6 +20,7 @@ class CustomerLoginResponseModel(BaseModel):
 class RefreshTokenResponseModel(BaseModel):
     success: bool
     access_token: str
+    refresh_token: str
 
 
 class LogoutResponseModel(BaseModel):
@@ -1,12 +1,19 @@
 from os import environ
-from datetime import timedelta
-from bson.objectid import ObjectId
+from datetime import datetime, timedelta
+from pymongo.errors import DuplicateKeyError
 from dotenv import load_dotenv
-from fastapi import APIRouter, Response, status, Depends, Query
+from fastapi import APIRouter, Request, Response, status, Depends, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi_jwt_auth.exceptions import AuthJWTException
 from ...core.constants.employee_roles import EmployeeRole
 from ...core.constants import regex
 from ...core.utilities.converter import dict_to_model
-from ...core.utilities.password import hash_password, verify_password
+from ...core.utilities.password import (
+    hash_password,
+    verify_and_update_password,
+)
+from ...core.utilities.metrics import metrics
+from ...core.utilities.rate_limit import RateLimiter
 from ...core.utilities.jwt_config import (
     AuthJWT,
     EmployeeRoleChecker,
@@ -17,12 +24,12 @@ from ...core.error.exceptions import (
     raise_not_found_exception,
     raise_operation_failed_exception,
     raise_unauthorized_exception,
-    raise_unprocessable_value_exception,
 )
 from ..account.employee import models as employee_model
 from ..account.employee import controller as employee_controller
 from ..account.customer import models as customer_model
 from ..account.customer import controller as customer_controller
+from . import controller as session_controller
 from . import models
 
 load_dotenv()
@@ -34,12 +41,115 @@ auth_router.tags = ["Auth"]
 
 ACCESS_TOKEN_EXPIRES_IN = int(environ.get("ACCESS_TOKEN_EXPIRES_IN", "120"))
 REFRESH_TOKEN_EXPIRES_IN = int(environ.get("REFRESH_TOKEN_EXPIRES_IN", "600"))
+# a used refresh token replayed within this window is rejected without
+# revoking its session, so two tabs refreshing at once do not log out
+REFRESH_TOKEN_REUSE_GRACE_SECONDS = int(
+    environ.get("REFRESH_TOKEN_REUSE_GRACE_SECONDS", "10")
+)
+# "<attempts>/<seconds>" sliding windows
+LOGIN_RATE_PER_IP = environ.get("LOGIN_RATE_PER_IP", "20/60")
+LOGIN_RATE_PER_PHONE_NUMBER = environ.get(
+    "LOGIN_RATE_PER_PHONE_NUMBER", "5/300"
+)
+REGISTER_RATE_PER_IP = environ.get("REGISTER_RATE_PER_IP", "30/60")
+
+employee_login_rate_limiter = RateLimiter(
+    scope="employee_login",
+    per_ip=LOGIN_RATE_PER_IP,
+    per_phone_number=LOGIN_RATE_PER_PHONE_NUMBER,
+)
+customer_login_rate_limiter = RateLimiter(
+    scope="customer_login",
+    per_ip=LOGIN_RATE_PER_IP,
+    per_phone_number=LOGIN_RATE_PER_PHONE_NUMBER,
+)
+register_rate_limiter = RateLimiter(
+    scope="register", per_ip=REGISTER_RATE_PER_IP
+)
+
+
+async def issue_refresh_token(
+    Authorize: AuthJWT,
+    subject: str,
+    account: str,
+    roles: list[str],
+    family: str | None = None,
+) -> str:
+    refresh_token = Authorize.create_refresh_token(
+        subject=subject,
+        expires_time=timedelta(minutes=REFRESH_TOKEN_EXPIRES_IN),
+    )
+    claims = Authorize.get_raw_jwt(refresh_token)
+    await session_controller.create_session(
+        id=claims["jti"],
+        family=family or claims["jti"],
+        subject=subject,
+        account=account,
+        roles=roles,
+        is_active=True,
+        expires_at=datetime.utcfromtimestamp(claims["exp"]),
+    )
+
+    return refresh_token
+
+
+async def use_refresh_session(Authorize: AuthJWT, account: str) -> dict:
+    Authorize.jwt_refresh_token_required()
+    jti = Authorize.get_raw_jwt()["jti"]
+    session = await session_controller.use_session(id=jti, account=account)
+
+    if not session:
+        used_session = await session_controller.find_session_by_id(id=jti)
+        used_at = used_session.get("used_at")
+
+        # a rotated token coming back means it leaked, so every token issued
+        # from the same login is revoked
+        if used_at and used_at < datetime.utcnow() - timedelta(
+            seconds=REFRESH_TOKEN_REUSE_GRACE_SECONDS
+        ):
+            await session_controller.revoke_session_family(
+                family=used_session["family"]
+            )
+            metrics.increment("refresh_token_reuse", account=account)
+
+        raise_unauthorized_exception(
+            message="this refresh token was already used or revoked, log in again.",
+            location=["cookies", "refresh_token"],
+        )
+
+    if not session["is_active"]:
+        raise_unauthorized_exception(
+            message=f"this {account} is deactivated",
+            location=["cookies", "refresh_token"],
+        )
+
+    return session
+
+
+async def revoke_refresh_session(
+    Authorize: AuthJWT, refresh_token: str | None
+):
+    if not refresh_token:
+        return
+
+    try:
+        jti = Authorize.get_raw_jwt(refresh_token)["jti"]
+    except AuthJWTException:
+        return
+
+    session = await session_controller.find_session_by_id(id=jti)
+
+    if session:
+        await session_controller.revoke_session_family(
+            family=session["family"]
+        )
 
 
 @employee_auth_router.post(
     "/register",
     status_code=status.HTTP_201_CREATED,
     response_model=employee_model.SingleEmployeeResponseModel,
+    dependencies=[Depends(register_rate_limiter)],
 )
 async def register_employee(
     new_employee: employee_model.EmployeeBaseModel,
@@ -47,23 +157,23 @@ async def register_employee(
         EmployeeRoleChecker(EmployeeRole.MANAGE_EMPLOYEES)
     ),
 ):
-    if await employee_controller.find_employee_by_phone_number(
-        phone_number=new_employee.phone_number
-    ):
-        raise_duplicated_entry_exception(
-            message=f"employee with this phone number={new_employee.phone_number} already exists. try logging in.",
-            location=["request body", "phone_number"],
-        )
-
     new_employee.first_name = new_employee.first_name.lower()
     new_employee.last_name = (
         new_employee.last_name.lower() if new_employee.last_name else None
     )
     new_employee.password = hash_password(new_employee.password)
 
-    if await employee_controller.create_employee(
-        new_employee={**new_employee.dict()}, create_by=current_user_id
-    ):
+    try:
+        created = await employee_controller.create_employee(
+            new_employee={**new_employee.dict()}, create_by=current_user_id
+        )
+    except DuplicateKeyError:
+        raise_duplicated_entry_exception(
+            message=f"employee with this phone number={new_employee.phone_number} already exists. try logging in.",
+            location=["request body", "phone_number"],
+        )
+
+    if created:
         inserted_employee = (
             await employee_controller.find_employee_by_phone_number(
                 phone_number=new_employee.phone_number
@@ -87,6 +197,7 @@ async def register_employee(
     "/login",
     status_code=status.HTTP_201_CREATED,
     response_model=models.EmployeeLoginResponseModel,
+    dependencies=[Depends(employee_login_rate_limiter)],
 )
 async def login_employee(
     response: Response,
@@ -111,21 +222,35 @@ async def login_employee(
             location=["request body", "phone_number"],
         )
 
-    if not verify_password(
-        password=password, hashed_password=employee["password"]
-    ):
+    # hashing is deliberately slow, keep it off the event loop
+    verified, new_hashed_password = await run_in_threadpool(
+        verify_and_update_password,
+        password=password,
+        hashed_password=employee["password"],
+    )
+
+    if not verified:
         raise_not_found_exception(
             message="invalid/incorrect phone number or password",
             location=["request body", "password/phone_number"],
         )
 
+    if new_hashed_password:
+        await employee_controller.rehash_employee_password(
+            id=str(employee["id"]),
+            hashed_password=employee["password"],
+            new_hashed_password=new_hashed_password,
+        )
+
     access_token = Authorize.create_access_token(
         subject=str(employee["id"]),
         expires_time=timedelta(minutes=ACCESS_TOKEN_EXPIRES_IN),
     )
-    refresh_token = Authorize.create_refresh_token(
+    refresh_token = await issue_refresh_token(
+        Authorize=Authorize,
         subject=str(employee["id"]),
-        expires_time=timedelta(minutes=REFRESH_TOKEN_EXPIRES_IN),
+        account="employee",
+        roles=employee.get("roles", []),
     )
     response.set_cookie(
         "access_token",
@@ -177,39 +302,20 @@ async def login_employee(
 async def refresh_employee_token(
     response: Response, Authorize: AuthJWT = Depends()
 ):
-    Authorize.jwt_refresh_token_required()
-    employee_id = Authorize.get_jwt_subject()
-
-    if not employee_id:
-        raise_unauthorized_exception(
-            message="invalid/incorrect access token.",
-            location=["cookies", "refresh_token"],
-        )
-
-    if not ObjectId.is_valid(employee_id):
-        raise_unprocessable_value_exception(
-            message="invalid/incorrect access token content",
-            location=["cookies", "refresh_token"],
-        )
-
-    employee = await employee_controller.find_employee_by_id(id=employee_id)
-
-    if not employee:
-        raise_not_found_exception(
-            message="this employee no longer exists",
-            location=["cookies", "access_token"],
-        )
-
-    if not employee["is_active"]:
-        raise_unauthorized_exception(
-            message="this employee is deactivated",
-            location=["cookies", "access_token"],
-        ),
-
+    session = await use_refresh_session(
+        Authorize=Authorize, account="employee"
+    )
     access_token = Authorize.create_access_token(
-        subject=str(employee["_id"]),
+        subject=session["subject"],
         expires_time=timedelta(minutes=ACCESS_TOKEN_EXPIRES_IN),
     )
+    refresh_token = await issue_refresh_token(
+        Authorize=Authorize,
+        subject=session["subject"],
+        account="employee",
+        roles=session["roles"],
+        family=session["family"],
+    )
 
     response.set_cookie(
         "access_token",
@@ -222,6 +328,17 @@ async def refresh_employee_token(
         True,
         "lax",
     )
+    response.set_cookie(
+        "refresh_token",
+        refresh_token,
+        REFRESH_TOKEN_EXPIRES_IN * 60,
+        REFRESH_TOKEN_EXPIRES_IN * 60,
+        "/",
+        None,
+        False,
+        True,
+        "lax",
+    )
     response.set_cookie(
         "logged_in",
         "True",
@@ -237,6 +354,7 @@ async def refresh_employee_token(
     return models.RefreshTokenResponseModel(
         success=True,
         access_token=access_token,
+        refresh_token=refresh_token,
     )
 
 
@@ -245,11 +363,16 @@ async def refresh_employee_token(
     status_code=status.HTTP_200_OK,
     response_model=models.LogoutResponseModel,
 )
-def logout(
+async def logout(
+    request: Request,
     response: Response,
     Authorize: AuthJWT = Depends(),
     employee_id: str = Depends(require_user),
 ):
+    await revoke_refresh_session(
+        Authorize=Authorize,
+        refresh_token=request.cookies.get("refresh_token"),
+    )
     Authorize.unset_jwt_cookies()
     response.set_cookie("logged_in", "", -1)
 
@@ -260,6 +383,7 @@ def logout(
     "/register",
     status_code=status.HTTP_201_CREATED,
     response_model=customer_model.SingleCustomerResponseModel,
+    dependencies=[Depends(register_rate_limiter)],
 )
 async def register_customer(
     new_customer: customer_model.CustomerBaseModel,
@@ -267,14 +391,6 @@ async def register_customer(
         EmployeeRoleChecker(EmployeeRole.MANAGE_EMPLOYEES)
     ),
 ):
-    if await customer_controller.find_customer_by_phone_number(
-        phone_number=new_customer.phone_number
-    ):
-        raise_duplicated_entry_exception(
-            message=f"customer with this phone number={new_customer.phone_number} already exists. try logging in.",
-            location=["request body", "phone_number"],
-        )
-
     new_customer.first_name = new_customer.first_name.lower()
     new_customer.last_name = (
         new_customer.last_name.lower() if new_customer.last_name else None
@@ -283,9 +399,17 @@ async def register_customer(
     new_customer.passport_number = new_customer.passport_number.lower()
     new_customer.password = hash_password(new_customer.password)
 
-    if await customer_controller.create_customer(
-        new_customer={**new_customer.dict()}, create_by=current_user_id
-    ):
+    try:
+        created = await customer_controller.create_customer(
+            new_customer={**new_customer.dict()}, create_by=current_user_id
+        )
+    except DuplicateKeyError:
+        raise_duplicated_entry_exception(
+            message=f"customer with this phone number={new_customer.phone_number} already exists. try logging in.",
+            location=["request body", "phone_number"],
+        )
+
+    if created:
         inserted_customer = (
             await customer_controller.find_customer_by_phone_number(
                 phone_number=new_customer.phone_number
@@ -309,6 +433,7 @@ async def register_customer(
     "/login",
     status_code=status.HTTP_201_CREATED,
     response_model=models.CustomerLoginResponseModel,
+    dependencies=[Depends(customer_login_rate_limiter)],
 )
 async def login_customer(
     response: Response,
@@ -333,21 +458,35 @@ async def login_customer(
             location=["request body", "phone_number"],
         )
 
-    if not verify_password(
-        password=password, hashed_password=customer["password"]
-    ):
+    # hashing is deliberately slow, keep it off the event loop
+    verified, new_hashed_password = await run_in_threadpool(
+        verify_and_update_password,
+        password=password,
+        hashed_password=customer["password"],
+    )
+
+    if not verified:
         raise_not_found_exception(
             message="invalid/incorrect phone number or password",
             location=["request body", "password/phone_number"],
         )
 
+    if new_hashed_password:
+        await customer_controller.rehash_customer_password(
+            id=str(customer["id"]),
+            hashed_password=customer["password"],
+            new_hashed_password=new_hashed_password,
+        )
+
     access_token = Authorize.create_access_token(
         subject=str(customer["id"]),
         expires_time=timedelta(minutes=ACCESS_TOKEN_EXPIRES_IN),
     )
-    refresh_token = Authorize.create_refresh_token(
+    refresh_token = await issue_refresh_token(
+        Authorize=Authorize,
         subject=str(customer["id"]),
-        expires_time=timedelta(minutes=REFRESH_TOKEN_EXPIRES_IN),
+        account="customer",
+        roles=[],
     )
     response.set_cookie(
         "access_token",
@@ -399,39 +538,20 @@ async def login_customer(
 async def refresh_customer_token(
     response: Response, Authorize: AuthJWT = Depends()
 ):
-    Authorize.jwt_refresh_token_required()
-    customer_id = Authorize.get_jwt_subject()
-
-    if not customer_id:
-        raise_unauthorized_exception(
-            message="invalid/incorrect access token.",
-            location=["cookies", "refresh_token"],
-        )
-
-    if not ObjectId.is_valid(customer_id):
-        raise_unprocessable_value_exception(
-            message="invalid/incorrect access token content",
-            location=["cookies", "refresh_token"],
-        )
-
-    customer = await customer_controller.find_customer_by_id(id=customer_id)
-
-    if not customer:
-        raise_not_found_exception(
-            message="this customer no longer exists",
-            location=["cookies", "access_token"],
-        )
-
-    if not customer["is_active"]:
-        raise_unauthorized_exception(
-            message="this customer is deactivated",
-            location=["cookies", "access_token"],
-        ),
-
+    session = await use_refresh_session(
+        Authorize=Authorize, account="customer"
+    )
     access_token = Authorize.create_access_token(
-        subject=str(customer["_id"]),
+        subject=session["subject"],
         expires_time=timedelta(minutes=ACCESS_TOKEN_EXPIRES_IN),
     )
+    refresh_token = await issue_refresh_token(
+        Authorize=Authorize,
+        subject=session["subject"],
+        account="customer",
+        roles=session["roles"],
+        family=session["family"],
+    )
 
     response.set_cookie(
         "access_token",
@@ -444,6 +564,17 @@ async def refresh_customer_token(
         True,
         "lax",
     )
+    response.set_cookie(
+        "refresh_token",
+        refresh_token,
+        REFRESH_TOKEN_EXPIRES_IN * 60,
+        REFRESH_TOKEN_EXPIRES_IN * 60,
+        "/",
+        None,
+        False,
+        True,
+        "lax",
+    )
     response.set_cookie(
         "logged_in",
         "True",
@@ -459,6 +590,7 @@ async def refresh_customer_token(
     return models.RefreshTokenResponseModel(
         success=True,
         access_token=access_token,
+        refresh_token=refresh_token,
     )
 
 
@@ -467,11 +599,16 @@ async def refresh_customer_token(
     status_code=status.HTTP_200_OK,
     response_model=models.LogoutResponseModel,
 )
-def logout(
+async def logout(
+    request: Request,
     response: Response,
     Authorize: AuthJWT = Depends(),
     customer_id: str = Depends(require_user),
 ):
+    await revoke_refresh_session(
+        Authorize=Authorize,
+        refresh_token=request.cookies.get("refresh_token"),
+    )
     Authorize.unset_jwt_cookies()
     response.set_cookie("logged_in", "", -1)
 
@@ -1,3 +1,6 @@
 from .item.routers import inventory_item_router
 from .issue.routers import inventory_issue_router
 from .purchase.routers import inventory_purchase_router
+from .forecast.routers import inventory_forecast_router
+from .report.routers import inventory_report_router
+from .unit.routers import inventory_unit_router
@@ -0,0 +1,197 @@
+from asyncio import get_running_loop
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from os import environ
+import numpy as np
+from dotenv import load_dotenv
+from pymongo import ASCENDING, UpdateOne
+from ....core.utilities.database import (
+    db,
+    default_find_limit,
+    issues_collection,
+)
+from ....core.utilities.unit_registry import unit_registry
+from .forecasting import compute_reorder_points
+
+load_dotenv()
+
+FORECAST_WINDOW_DAYS = int(environ.get("FORECAST_WINDOW_DAYS", "90"))
+FORECAST_LEAD_TIME_DAYS = float(environ.get("FORECAST_LEAD_TIME_DAYS", "3"))
+FORECAST_COVER_DAYS = float(environ.get("FORECAST_COVER_DAYS", "14"))
+FORECAST_SERVICE_LEVEL_Z = float(
+    environ.get("FORECAST_SERVICE_LEVEL_Z", "1.65")
+)
+FORECAST_MAX_WORKERS = int(environ.get("FORECAST_MAX_WORKERS", "1"))
+
+forecast_executor: ProcessPoolExecutor | None = None
+
+
+def get_forecast_executor() -> ProcessPoolExecutor:
+    global forecast_executor
+
+    if forecast_executor is None:
+        forecast_executor = ProcessPoolExecutor(
+            max_workers=FORECAST_MAX_WORKERS
+        )
+
+    return forecast_executor
+
+
+def shutdown_forecast_executor():
+    global forecast_executor
+
+    if forecast_executor is not None:
+        forecast_executor.shutdown()
+        forecast_executor = None
+
+
+async def create_indexes():
+    await db["inventory_forecasts"].create_index(
+        [("item", ASCENDING)], unique=True
+    )
+
+
+async def load_forecast_input(window_start: datetime) -> dict:
+    items = [
+        item
+        async for item in db["inventory_items"].find(
+            filter={},
+            projection={"unit": 1, "average_life_expectancy": 1},
+        )
+    ]
+    item_positions = {str(item["_id"]): i for i, item in enumerate(items)}
+    item_unit_values = np.array(
+        [
+            unit_registry.factor(unit=item["unit"], item=str(item["_id"]))
+            or np.nan
+            for item in items
+        ],
+        dtype=float,
+    )
+
+    item_index, day_index, amounts, unit_values = [], [], [], []
+
+    async for issue in db[issues_collection].find(
+        filter={"issued_at": {"$gte": window_start}},
+        projection={
+            "_id": 0,
+            "item": 1,
+            "amount": 1,
+            "unit": 1,
+            "issued_at": 1,
+        },
+    ):
+        position = item_positions.get(issue["item"])
+
+        if position is None:
+            continue
+
+        item_index.append(position)
+        day_index.append((issue["issued_at"] - window_start).days)
+        amounts.append(issue["amount"])
+        unit_values.append(
+            unit_registry.factor(unit=issue["unit"], item=issue["item"])
+            or np.nan
+        )
+
+    item_index = np.array(item_index, dtype=np.int64)
+    # normalize every issue to the unit the item itself is measured in
+    normalized_amounts = (
+        np.array(amounts, dtype=float)
+        * np.array(unit_values, dtype=float)
+        / item_unit_values[item_index]
+    )
+    valid = np.isfinite(normalized_amounts)
+
+    return {
+        "items": items,
+        "item_index": item_index[valid],
+        "day_index": np.clip(
+            np.array(day_index, dtype=np.int64)[valid],
+            0,
+            FORECAST_WINDOW_DAYS - 1,
+        ),
+        "amounts": normalized_amounts[valid],
+        "average_life_expectancy": np.array(
+            [item.get("average_life_expectancy") or 0 for item in items],
+            dtype=float,
+        ),
+    }
+
+
+async def run_forecast() -> int:
+    generated_at = datetime.utcnow()
+    window_start = generated_at - timedelta(days=FORECAST_WINDOW_DAYS)
+    forecast_input = await load_forecast_input(window_start=window_start)
+    items = forecast_input["items"]
+
+    if not items:
+        return 0
+
+    result = await get_running_loop().run_in_executor(
+        get_forecast_executor(),
+        compute_reorder_points,
+        len(items),
+        forecast_input["item_index"],
+        forecast_input["day_index"],
+        forecast_input["amounts"],
+        FORECAST_WINDOW_DAYS,
+        FORECAST_LEAD_TIME_DAYS,
+        FORECAST_COVER_DAYS,
+        FORECAST_SERVICE_LEVEL_Z,
+        forecast_input["average_life_expectancy"],
+    )
+
+    await db["inventory_forecasts"].bulk_write(
+        [
+            UpdateOne(
+                filter={"item": str(item["_id"])},
+                update={
+                    "$set": {
+                        "item": str(item["_id"]),
+                        "unit": item["unit"],
+                        **{
+                            key: float(values[i])
+                            for key, values in result.items()
+                        },
+                        "window_days": FORECAST_WINDOW_DAYS,
+                        "lead_time_days": FORECAST_LEAD_TIME_DAYS,
+                        "generated_at": generated_at,
+                    }
+                },
+                upsert=True,
+            )
+            for i, item in enumerate(items)
+        ],
+        ordered=False,
+    )
+
+    return len(items)
+
+
+async def find_many_forecasts(
+    limit: int = 0,
+    skip: int = 0,
+    projection: dict | None = None,
+) -> list[dict]:
+    forecasts = [
+        forecast
+        async for forecast in db["inventory_forecasts"].find(
+            filter={},
+            projection=projection,
+            skip=skip,
+            limit=limit if limit > 0 else default_find_limit,
+        )
+    ]
+
+    return list(forecasts) if forecasts else []
+
+
+async def find_forecast_by_item(
+    item: str, projection: dict | None = None
+) -> dict:
+    forecast = await db["inventory_forecasts"].find_one(
+        filter={"item": item}, projection=projection
+    )
+
+    return dict(forecast) if forecast else {}
@@ -0,0 +1,42 @@
+import numpy as np
+
+
+def compute_reorder_points(
+    item_count: int,
+    item_index: np.ndarray,
+    day_index: np.ndarray,
+    amounts: np.ndarray,
+    window_days: int,
+    lead_time_days: float,
+    cover_days: float,
+    service_level_z: float,
+    average_life_expectancy: np.ndarray,
+) -> dict[str, np.ndarray]:
+    daily_consumption = np.zeros((item_count, window_days))
+    np.add.at(daily_consumption, (item_index, day_index), amounts)
+
+    rate = daily_consumption.mean(axis=1)
+    variance = (
+        daily_consumption.var(axis=1, ddof=1)
+        if window_days > 1
+        else np.zeros(item_count)
+    )
+
+    safety_stock = service_level_z * np.sqrt(variance * lead_time_days)
+    reorder_point = rate * lead_time_days + safety_stock
+
+    # never suggest buying more than will be used before it expires
+    item_cover_days = np.where(
+        average_life_expectancy > 0,
+        np.minimum(average_life_expectancy, cover_days),
+        cover_days,
+    )
+    reorder_quantity = rate * item_cover_days + safety_stock
+
+    return {
+        "daily_consumption_rate": rate,
+        "consumption_variance": variance,
+        "safety_stock": safety_stock,
+        "suggested_reorder_point": reorder_point,
+        "suggested_reorder_quantity": reorder_quantity,
+    }
@@ -0,0 +1,26 @@
+from datetime import datetime
+from pydantic import BaseModel, Field
+
+
+class ForecastReadModel(BaseModel):
+    id: str = Field(..., alias="_id")
+    item: str
+    unit: str
+    daily_consumption_rate: float
+    consumption_variance: float
+    safety_stock: float
+    suggested_reorder_point: float
+    suggested_reorder_quantity: float
+    window_days: int
+    lead_time_days: float
+    generated_at: datetime
+
+
+class SingleForecastResponseModel(BaseModel):
+    success: bool
+    forecast: ForecastReadModel
+
+
+class MultipleForecastsResponseModel(BaseModel):
+    success: bool
+    forecasts: list[ForecastReadModel]
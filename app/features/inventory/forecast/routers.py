@@ -0,0 +1,98 @@
+from bson.objectid import ObjectId
+from fastapi import APIRouter, BackgroundTasks, Depends
+from ....core.constants.employee_roles import EmployeeRole
+from ....core.models.common_responses import UpdateResponseModel
+from ....core.utilities.converter import dict_to_model
+from ....core.utilities.jwt_config import AuthJWT, EmployeeRoleChecker
+from ....core.utilities.responses import model_response
+from ....core.utilities.fields import FieldSelector, FieldSet
+from ....core.error.exceptions import (
+    raise_not_found_exception,
+    raise_operation_failed_exception,
+    raise_unprocessable_value_exception,
+)
+from . import models
+from . import controller
+
+inventory_forecast_router = APIRouter()
+
+inventory_forecast_router.tags = ["Inventory - Forecasts"]
+
+
+@inventory_forecast_router.post("/", response_model=UpdateResponseModel)
+async def run_forecast(
+    background_tasks: BackgroundTasks,
+    current_user_id: AuthJWT = Depends(
+        EmployeeRoleChecker(required_role=EmployeeRole.MANAGE_INVENTORY_ITEMS)
+    ),
+):
+    background_tasks.add_task(controller.run_forecast)
+
+    return UpdateResponseModel(success=True)
+
+
+@inventory_forecast_router.get(
+    "/", response_model=models.MultipleForecastsResponseModel
+)
+async def get_forecasts(
+    limit: int = 0,
+    skip: int = 0,
+    current_user_id: AuthJWT = Depends(
+        EmployeeRoleChecker(required_role=EmployeeRole.VIEW_INVENTORY_ITEMS)
+    ),
+    fields: FieldSet = Depends(FieldSelector(models.ForecastReadModel)),
+):
+    forecasts = await controller.find_many_forecasts(
+        limit=limit, skip=skip, projection=fields.projection
+    )
+
+    if not type(forecasts) == list:
+        raise_operation_failed_exception(
+            message="problem while getting inventory forecasts"
+        )
+
+    return model_response(
+        models.MultipleForecastsResponseModel(
+            success=True,
+            forecasts=[
+                dict_to_model(model=fields.model, dict_model=forecast)
+                for forecast in forecasts
+            ],
+        ),
+        exclude=fields.exclude("forecasts", many=True),
+    )
+
+
+@inventory_forecast_router.get(
+    "/{item_id}", response_model=models.SingleForecastResponseModel
+)
+async def get_item_forecast(
+    item_id: str,
+    current_user_id: AuthJWT = Depends(
+        EmployeeRoleChecker(required_role=EmployeeRole.VIEW_INVENTORY_ITEMS)
+    ),
+    fields: FieldSet = Depends(FieldSelector(models.ForecastReadModel)),
+):
+    if not ObjectId.is_valid(item_id):
+        raise_unprocessable_value_exception(
+            message=f"invalid item_id={item_id}",
+            location=["path parameter", "item_id"],
+        )
+
+    forecast = await controller.find_forecast_by_item(
+        item=item_id, projection=fields.projection
+    )
+
+    if not forecast:
+        raise_not_found_exception(
+            message=f"no forecast found for item with an id={item_id}",
+            location=["path parameter", "item_id"],
+        )
+
+    return model_response(
+        models.SingleForecastResponseModel(
+            success=True,
+            forecast=dict_to_model(model=fields.model, dict_model=forecast),
+        ),
+        exclude=fields.exclude("forecast"),
+    )
@@ -1,46 +1,82 @@
 from datetime import datetime
 from bson.objectid import ObjectId
+from typing import AsyncIterator
+from pymongo import ASCENDING, IndexModel
 from ....core.utilities.database import default_find_limit
-from ....core.utilities.database import db
+from ....core.utilities.database import (
+    db,
+    ensure_ledger_collection,
+    issues_collection,
+)
+from ....core.utilities.archive import (
+    find_archived_by_id,
+    find_with_archive,
+    stream_with_archive,
+)
+from ....core.utilities.export import default_export_batch_size
+from ....core.utilities.filters import get_processed_sort, time_range_filter
+from ....core.utilities.unit_registry import unit_registry
+
+
+export_fields = [
+    "_id",
+    "item",
+    "amount",
+    "unit",
+    "cost",
+    "base_amount",
+    "base_unit_cost",
+    "issued_at",
+    "issued_by",
+    "updated_at",
+    "updated_by",
+]
+
+
+async def create_indexes():
+    await ensure_ledger_collection(name="inventory_issues")
+    await db[issues_collection].create_indexes(
+        [
+            IndexModel([("item", ASCENDING), ("issued_at", ASCENDING)]),
+            IndexModel([("issued_by", ASCENDING), ("issued_at", ASCENDING)]),
+            IndexModel([("issued_at", ASCENDING)]),
+        ]
+    )
 
 
 def get_processed_filter(
-    item: str,
-    issued_by: str,
-    issued_at_from: datetime,
-    issued_at_to: datetime,
-):
-    filter = {}
+    item: str | None = None,
+    issued_by: str | None = None,
+    issued_at_from: datetime | None = None,
+    issued_at_to: datetime | None = None,
+) -> dict:
+    filter = time_range_filter(
+        field="issued_at", start=issued_at_from, end=issued_at_to
+    )
+
     if item:
-        filter["item"] = (item,)
+        filter["item"] = item
 
     if issued_by:
         filter["issued_by"] = issued_by
 
-    if issued_at_from or issued_at_from:
-        filter["issued_at"] = {}
-
-        if issued_at_from:
-            filter["issued_at"]["$gte"] = issued_at_from
-
-        if issued_at_to:
-            filter["issued_at"]["$lte"] = issued_at_to
-
     return filter
 
 
-def get_processed_sort(sort_by: list[str]) -> dict:
-    sort_dict = {}
-
-    for sort_item in sort_by:
-        if sort_item[0] in "+-":
-            sort_dict[sort_item[1:]] = 1 if sort_item[0] == "+" else "-"
+def get_base_values(issue: dict) -> dict:
+    return unit_registry.base_values(
+        amount=issue.get("amount"),
+        unit=issue.get("unit"),
+        money=issue.get("cost"),
+        item=issue.get("item"),
+    )
 
 
 async def issue_item(new_issue: dict, issued_by: str) -> str | None:
-    inserted_issue = await db["inventory_issues"].insert_one(
+    inserted_issue = await db[issues_collection].insert_one(
         {
             **new_issue,
+            **get_base_values(new_issue),
             "issued_by": issued_by,
             "updated_at": datetime.utcnow(),
             "updated_by": issued_by,
@@ -58,6 +94,7 @@ async def find_many_issues(
     limit: int = 0,
     skip: int = 0,
     sort_by: list[str] = [],
+    projection: dict | None = None,
 ) -> list[dict]:
     filter = get_processed_filter(
         item=item,
@@ -67,19 +104,52 @@ async def find_many_issues(
     )
     sort = get_processed_sort(sort_by=sort_by)
 
-    issues = [
-        issue
-        async for issue in db["inventory_issues"].find(
-            filter=filter,
-            skip=skip,
-            limit=limit if limit > 0 else default_find_limit,
-            sort=sort,
-        )
-    ]
+    issues = await find_with_archive(
+        ledger="inventory_issues",
+        collection=db[issues_collection],
+        filter=filter,
+        equals={"item": item, "issued_by": issued_by},
+        start=issued_at_from,
+        end=issued_at_to,
+        skip=skip,
+        limit=limit if limit > 0 else default_find_limit,
+        sort=sort,
+        projection=projection,
+    )
 
     return issues
 
 
+def export_issues(
+    item: str | None = None,
+    issued_by: str | None = None,
+    issued_at_from: datetime | None = None,
+    issued_at_to: datetime | None = None,
+    batch_size: int = default_export_batch_size,
+) -> AsyncIterator[dict]:
+    filter = get_processed_filter(
+        item=item,
+        issued_by=issued_by,
+        issued_at_from=issued_at_from,
+        issued_at_to=issued_at_to,
+    )
+
+    return stream_with_archive(
+        ledger="inventory_issues",
+        cursor=db[issues_collection]
+        .find(
+            filter=filter,
+            projection=export_fields,
+            sort=[("issued_at", 1)],
+        )
+        .batch_size(batch_size),
+        equals={"item": item, "issued_by": issued_by},
+        start=issued_at_from,
+        end=issued_at_to,
+        batch_size=batch_size,
+    )
+
+
 async def find_one_issue(
     item: str,
     received_by: str,
@@ -98,25 +168,40 @@ async def find_one_issue(
         issued_at_to=issued_at_to,
     )
 
-    issue = await db["inventory_issues"].find_one(filter=filter, skip=skip)
+    issue = await db[issues_collection].find_one(filter=filter, skip=skip)
 
     return dict(issue) if issue else {}
 
 
-async def find_issue_by_id(id: str) -> dict:
-    issue = await db["inventory_issues"].find_one(
-        filter={"_id": ObjectId(id)}
+async def find_issue_by_id(
+    id: str, projection: dict | None = None, include_archived: bool = False
+) -> dict:
+    issue = await db[issues_collection].find_one(
+        filter={"_id": ObjectId(id)}, projection=projection
     )
 
+    if not issue and include_archived:
+        # archived rows can be read but no longer updated
+        return await find_archived_by_id(
+            ledger="inventory_issues", id=ObjectId(id), projection=projection
+        )
+
     return dict(issue) if issue else {}
 
 
 async def update_issue(id: str, updated_issue: dict, updated_by: str) -> bool:
-    result = await db["inventory_issues"].update_one(
+    base_values = {}
+
+    if {"item", "amount", "unit", "cost"} & updated_issue.keys():
+        old_issue = await find_issue_by_id(id=id)
+        base_values = get_base_values({**old_issue, **updated_issue})
+
+    result = await db[issues_collection].update_one(
         filter={"_id": ObjectId(id)},
         update={
             "$set": {
                 **updated_issue,
+                **base_values,
                 "updated_by": updated_by,
                 "updated_at": datetime.utcnow(),
             }
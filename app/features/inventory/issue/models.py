@@ -1,12 +1,11 @@
 from datetime import datetime
 from pydantic import BaseModel, Field
-from app.core.constants.measurement_units import MeasurementUnit
 
 
 class IssueBaseModel(BaseModel):
     item: str
     amount: float = Field(gt=0)
-    unit: MeasurementUnit
+    unit: str
     issued_at: datetime = datetime.utcnow()
 
     class Config:
@@ -24,7 +23,7 @@ class IssueReadModel(IssueBaseModel):
 class IssueUpdateModel(BaseModel):
     item: str | None = None
     amount: float | None = Field(gt=0, default=None)
-    unit: MeasurementUnit | None = None
+    unit: str | None = None
     cost: float | None = None
     issued_by: str | None = None
     issued_at: datetime | None = None
@@ -1,10 +1,6 @@
 from datetime import datetime
 from bson.objectid import ObjectId
-from fastapi import APIRouter, Depends, Query
-from ....core.constants.measurement_units import (
-    is_same_measurement_type,
-    measurement_unit_value,
-)
+from fastapi import APIRouter, Depends, Query, Request
 from ....core.error.exceptions import (
     raise_not_found_exception,
     raise_operation_failed_exception,
@@ -15,8 +11,18 @@ from ....core.utilities.converter import (
     model_to_dict_without_None,
 )
 from ....core.utilities.jwt_config import AuthJWT, EmployeeRoleChecker
+from ....core.utilities.responses import model_response
+from ....core.utilities.fields import FieldSelector, FieldSet
+from ....core.utilities.conditional import ResourceVersion
+from ....core.utilities.unit_registry import unit_registry
+from ....core.utilities.export import (
+    ExportFormat,
+    default_export_batch_size,
+    export_response,
+)
 from ....core.constants.employee_roles import EmployeeRole
 from ..item import controller as item_controller
+from ..unit import controller as unit_controller
 from . import models
 from . import controller
 
@@ -49,7 +55,19 @@ async def issue_item(
             location=["request body", "item"],
         )
 
-    if not is_same_measurement_type(item["unit"], new_issue.unit):
+    await unit_controller.sync_unit_registry(
+        new_issue.unit, item["unit"], item=new_issue.item
+    )
+
+    if not unit_registry.lookup(unit=new_issue.unit, item=new_issue.item):
+        raise_unprocessable_value_exception(
+            message=f"unknown unit [{new_issue.unit}]",
+            location=["request body", "unit"],
+        )
+
+    if not unit_registry.is_same_measurement_type(
+        item["unit"], new_issue.unit, item=new_issue.item
+    ):
         raise_unprocessable_value_exception(
             message="the item is not measured with the same type of measurement.",
             location=["request body", "unit"],
@@ -58,9 +76,8 @@ async def issue_item(
     issue_cost = (
         item["cost"]
         * new_issue.amount
-        * (
-            measurement_unit_value[new_issue.unit]
-            / measurement_unit_value[item["unit"]]
+        * unit_registry.conversion_ratio(
+            new_issue.unit, item["unit"], item=new_issue.item
         )
     )
 
@@ -80,14 +97,54 @@ async def issue_item(
     )
 
 
+@inventory_issue_router.get("/export")
+async def export_issues(
+    format: ExportFormat = ExportFormat.NDJSON,
+    item: str | None = None,
+    issued_by: str | None = None,
+    issued_at_from: datetime | None = None,
+    issued_at_to: datetime | None = None,
+    batch_size: int = Query(default=default_export_batch_size, ge=1, le=10000),
+    current_user_id: AuthJWT = Depends(
+        EmployeeRoleChecker(required_role=EmployeeRole.VIEW_ISSUE)
+    ),
+):
+    if item and not ObjectId.is_valid(item):
+        raise_unprocessable_value_exception(
+            message="invalid item id",
+            location=["query parameter", "item"],
+        )
+
+    if issued_by and not ObjectId.is_valid(issued_by):
+        raise_unprocessable_value_exception(
+            message="invalid employee id",
+            location=["query parameter", "issued_by"],
+        )
+
+    return export_response(
+        cursor=controller.export_issues(
+            item=item,
+            issued_by=issued_by,
+            issued_at_from=issued_at_from,
+            issued_at_to=issued_at_to,
+            batch_size=batch_size,
+        ),
+        fields=controller.export_fields,
+        format=format,
+        filename="inventory_issues",
+    )
+
+
 @inventory_issue_router.get(
     "/{issue_id}", response_model=models.SingleIssueResponseModel
 )
 async def get_issue_by_id(
+    request: Request,
     issue_id: str,
     current_user_id: AuthJWT = Depends(
         EmployeeRoleChecker(required_role=EmployeeRole.VIEW_ISSUE)
     ),
+    fields: FieldSet = Depends(FieldSelector(models.IssueReadModel)),
 ):
     if not ObjectId.is_valid(issue_id):
         raise_unprocessable_value_exception(
@@ -95,7 +152,9 @@ async def get_issue_by_id(
             location=["path parameter", "issue_id"],
         )
 
-    issue = await controller.find_issue_by_id(id=issue_id)
+    issue = await controller.find_issue_by_id(
+        id=issue_id, projection=fields.projection, include_archived=True
+    )
 
     if not issue:
         raise_not_found_exception(
@@ -103,12 +162,24 @@ async def get_issue_by_id(
             location=["path parameter", "issue_id"],
         )
 
-    return models.SingleIssueResponseModel(
-        success=True,
-        issue=dict_to_model(
-            model=models.IssueReadModel,
-            dict_model=issue,
-        ),
+    version = ResourceVersion(
+        request=request, updated_at=issue.get("updated_at")
+    )
+
+    if version.is_not_modified():
+        return version.not_modified_response()
+
+    return version.apply(
+        model_response(
+            models.SingleIssueResponseModel(
+                success=True,
+                issue=dict_to_model(
+                    model=fields.model,
+                    dict_model=issue,
+                ),
+            ),
+            exclude=fields.exclude("issue"),
+        )
     )
 
 
@@ -128,6 +199,7 @@ async def get_issues(
     current_user_id: AuthJWT = Depends(
         EmployeeRoleChecker(required_role=EmployeeRole.VIEW_ISSUE)
     ),
+    fields: FieldSet = Depends(FieldSelector(models.IssueReadModel)),
 ):
     if item and not ObjectId.is_valid(item):
         raise_unprocessable_value_exception(
@@ -141,6 +213,8 @@ async def get_issues(
             location=["query parameter", "issued_by"],
         )
 
+    # no conditional handling here, versioning a ledger filter would scan
+    # every matching row on each poll
     issues = await controller.find_many_issues(
         item=item,
         issued_by=issued_by,
@@ -149,22 +223,24 @@ async def get_issues(
         limit=limit,
         skip=skip,
         sort_by=sort_by,
+        projection=fields.projection,
     )
 
     if not type(issues) == list:
-        raise_operation_failed_exception(
-            message="problem while getting issue"
-        )
-
-    return models.MultipleIssuesResponseModel(
-        success=True,
-        issues=[
-            dict_to_model(
-                model=models.IssueReadModel,
-                dict_model=issue,
-            )
-            for issue in issues
-        ],
+        raise_operation_failed_exception(message="problem while getting issue")
+
+    return model_response(
+        models.MultipleIssuesResponseModel(
+            success=True,
+            issues=[
+                dict_to_model(
+                    model=fields.model,
+                    dict_model=issue,
+                )
+                for issue in issues
+            ],
+        ),
+        exclude=fields.exclude("issues", many=True),
     )
 
 
@@ -215,20 +291,39 @@ async def update_issue(
             item = await item_controller.find_item_by_id(
                 id=str(issue.get("item"))
             )
-        if type(updated_issue.amount) == None:
+        if updated_issue.amount is None:
             issue = dict(await controller.find_issue_by_id(id=issue_id))
             updated_issue.amount = issue.get("amount")
 
         if not updated_issue.unit:
             issue = dict(await controller.find_issue_by_id(id=issue_id))
-            updated_issue.amount = issue.get("unit")
+            updated_issue.unit = issue.get("unit")
+
+        await unit_controller.sync_unit_registry(
+            updated_issue.unit, item["unit"], item=str(item["_id"])
+        )
+
+        if not unit_registry.lookup(
+            unit=updated_issue.unit, item=str(item["_id"])
+        ):
+            raise_unprocessable_value_exception(
+                message=f"unknown unit [{updated_issue.unit}]",
+                location=["request body", "unit"],
+            )
+
+        if not unit_registry.is_same_measurement_type(
+            item["unit"], updated_issue.unit, item=str(item["_id"])
+        ):
+            raise_unprocessable_value_exception(
+                message="the item is not measured with the same type of measurement.",
+                location=["request body", "unit"],
+            )
 
         updated_issue.cost = (
             item["cost"]
             * updated_issue.amount
-            * (
-                measurement_unit_value[updated_issue.unit]
-                / measurement_unit_value[item["unit"]]
+            * unit_registry.conversion_ratio(
+                updated_issue.unit, item["unit"], item=str(item["_id"])
             )
         )
 
@@ -1,11 +1,83 @@
 from datetime import datetime
 from bson.objectid import ObjectId
+from pymongo import ASCENDING
 from ....core.utilities.database import db, default_find_limit
+from ....core.utilities.cache import Cache, cached
+from ....core.utilities.conditional import collection_version
 from ....core.utilities.converter import str_to_match_all_regex
+from ....core.utilities.fields import project_document
+from ....core.utilities.invalidation import invalidation_bus
+from ....core.utilities.reference_cache import ReferenceCache
 
 
-async def category_exists(name: str):
-    return bool(await db["inventory_categories"].find_one({"name": name}))
+category_cache = ReferenceCache(collection="inventory_categories")
+group_cache = ReferenceCache(collection="inventory_groups")
+
+invalidation_bus.subscribe(
+    collection="inventory_categories", listener=category_cache.invalidate
+)
+invalidation_bus.subscribe(
+    collection="inventory_groups", listener=group_cache.invalidate
+)
+
+item_document_cache = Cache(namespace="inventory_items")
+category_list_cache = Cache(namespace="inventory_category_lists")
+
+
+async def invalidate_item_document_cache(event: dict):
+    key = event.get("documentKey", {}).get("_id")
+
+    if key is None:
+        await item_document_cache.clear()
+    else:
+        await item_document_cache.delete(str(key))
+
+
+async def invalidate_category_list_cache(event: dict):
+    await category_list_cache.clear()
+
+
+invalidation_bus.subscribe(
+    collection="inventory_items", listener=invalidate_item_document_cache
+)
+invalidation_bus.subscribe(
+    collection="inventory_categories", listener=invalidate_category_list_cache
+)
+
+
+async def refresh_reference_caches():
+    await category_cache.refresh()
+    await category_list_cache.clear()
+    await group_cache.refresh()
+
+
+async def find_cached_category_by_id(id: str) -> dict:
+    return await category_cache.get(id)
+
+
+async def find_cached_group_by_id(id: str) -> dict:
+    return await group_cache.get(id)
+
+
+running_low_expression = {"$gte": ["$minimum_quantity", "$quantity"]}
+
+
+async def create_indexes():
+    await db["inventory_items"].create_index(
+        [("is_running_low", ASCENDING)],
+        name="is_running_low_partial",
+        partialFilterExpression={"is_running_low": True},
+    )
+    await db["inventory_categories"].create_index(
+        [("name", ASCENDING)], unique=True
+    )
+    await db["inventory_groups"].create_index(
+        [("category", ASCENDING), ("name", ASCENDING)], unique=True
+    )
+    await db["inventory_items"].create_index(
+        [("group", ASCENDING), ("name", ASCENDING), ("unit", ASCENDING)],
+        unique=True,
+    )
 
 
 async def create_category(new_category: dict, create_by: str) -> bool:
@@ -19,13 +91,18 @@ async def create_category(new_category: dict, create_by: str) -> bool:
         }
     )
 
+    await category_cache.refresh()
+    await category_list_cache.clear()
+
     return bool(inserted_id)
 
 
+@cached(cache=category_list_cache)
 async def find_many_categories(
     name: str | None = None,
     limit: int = 0,
     skip: int = 0,
+    projection: dict | None = None,
 ) -> list[dict]:
     filter = {}
 
@@ -36,6 +113,7 @@ async def find_many_categories(
         category
         async for category in db["inventory_categories"].find(
             filter=filter,
+            projection=projection,
             skip=skip,
             limit=limit if limit > 0 else default_find_limit,
         )
@@ -59,9 +137,9 @@ async def find_one_category(
     return dict(category) if category else {}
 
 
-async def find_category_by_id(id: str) -> dict:
+async def find_category_by_id(id: str, projection: dict | None = None) -> dict:
     category = await db["inventory_categories"].find_one(
-        filter={"_id": ObjectId(id)}
+        filter={"_id": ObjectId(id)}, projection=projection
     )
 
     return dict(category) if category else {}
@@ -81,15 +159,10 @@ async def update_category_info(
         },
     )
 
-    return True if result.modified_count > 0 else False
-
+    await category_cache.refresh()
+    await category_list_cache.clear()
 
-async def group_exists(name: str, category: str):
-    return bool(
-        await db["inventory_groups"].find_one(
-            {"name": name, "category": category}
-        )
-    )
+    return True if result.modified_count > 0 else False
 
 
 async def create_group(new_group: dict, create_by: str) -> bool:
@@ -103,6 +176,8 @@ async def create_group(new_group: dict, create_by: str) -> bool:
         }
     )
 
+    await group_cache.refresh()
+
     return bool(inserted_id)
 
 
@@ -110,6 +185,7 @@ async def find_many_groups(
     name: str | None = None,
     limit: int = 0,
     skip: int = 0,
+    projection: dict | None = None,
 ) -> list[dict]:
     filter = {}
     if name:
@@ -119,6 +195,7 @@ async def find_many_groups(
         group
         async for group in db["inventory_groups"].find(
             filter=filter,
+            projection=projection,
             skip=skip,
             limit=limit if limit > 0 else default_find_limit,
         )
@@ -140,9 +217,9 @@ async def find_one_group(
     return dict(group) if group else {}
 
 
-async def find_group_by_id(id: str) -> dict:
+async def find_group_by_id(id: str, projection: dict | None = None) -> dict:
     group = await db["inventory_groups"].find_one(
-        filter={"_id": ObjectId(id)}
+        filter={"_id": ObjectId(id)}, projection=projection
     )
 
     return dict(group) if group else {}
@@ -162,6 +239,8 @@ async def update_group_info(
         },
     )
 
+    await group_cache.refresh()
+
     return True if result.modified_count > 0 else False
 
 
@@ -177,7 +256,7 @@ def get_processed_filter(
     if group:
         filter["group"] = group
     if type(running_low) == bool:
-        filter["$expr"] = {"$gte": ["$minimum_quantity", "$quantity"]}
+        filter["is_running_low"] = running_low
 
     return filter
 
@@ -190,18 +269,12 @@ def get_processed_sort(sort_by: list[str]) -> dict:
             sort_dict[sort_item[1:]] = 1 if sort_item[0] == "+" else "-"
 
 
-async def item_exists(name: str, group: str, unit: str):
-    return bool(
-        await db["inventory_items"].find_one(
-            {"name": name, "group": group, "unit": unit}
-        )
-    )
-
-
 async def create_item(new_item: dict, create_by: str) -> bool:
     inserted_id = await db["inventory_items"].insert_one(
         {
             **new_item,
+            "is_running_low": new_item["minimum_quantity"]
+            >= new_item["quantity"],
             "created_at": datetime.utcnow(),
             "created_by": create_by,
             "updated_at": datetime.utcnow(),
@@ -219,6 +292,7 @@ async def find_many_items(
     limit: int = 0,
     skip: int = 0,
     sort_by: list[str] = [],
+    projection: dict | None = None,
 ) -> list[dict]:
     filter = get_processed_filter(
         name=name, running_low=running_low, group=group
@@ -229,6 +303,7 @@ async def find_many_items(
         item
         async for item in db["inventory_items"].find(
             filter=filter,
+            projection=projection,
             skip=skip,
             limit=limit if limit > 0 else default_find_limit,
             sort=sort,
@@ -238,6 +313,38 @@ async def find_many_items(
     return list(items) if items else []
 
 
+async def find_items_version(
+    name: str | None = None,
+    group: str | None = None,
+    running_low: bool | None = None,
+) -> dict:
+    filter = get_processed_filter(
+        name=name, running_low=running_low, group=group
+    )
+
+    return await collection_version(
+        collection=db["inventory_items"], filter=filter
+    )
+
+
+async def find_running_low_items(
+    limit: int = 0,
+    skip: int = 0,
+    projection: dict | None = None,
+) -> list[dict]:
+    items = [
+        item
+        async for item in db["inventory_items"].find(
+            filter={"is_running_low": True},
+            projection=projection,
+            skip=skip,
+            limit=limit if limit > 0 else default_find_limit,
+        )
+    ]
+
+    return list(items) if items else []
+
+
 async def find_one_item(
     name: str | None = None,
     group: str | None = None,
@@ -253,12 +360,19 @@ async def find_one_item(
     return dict(item) if item else {}
 
 
-async def find_item_by_id(id: str) -> dict:
+@cached(cache=item_document_cache, key=lambda id: id)
+async def find_item_document(id: str) -> dict:
     item = await db["inventory_items"].find_one(filter={"_id": ObjectId(id)})
 
     return dict(item) if item else {}
 
 
+async def find_item_by_id(id: str, projection: dict | None = None) -> dict:
+    item = await find_item_document(id=id)
+
+    return project_document(document=item, projection=projection)
+
+
 async def update_item_cost(id: str, new_cost: float, updated_by: str) -> bool:
     result = await db["inventory_items"].update_one(
         filter={"_id": ObjectId(id)},
@@ -271,6 +385,8 @@ async def update_item_cost(id: str, new_cost: float, updated_by: str) -> bool:
         },
     )
 
+    await item_document_cache.delete(id)
+
     return True if result.modified_count > 0 else False
 
 
@@ -279,13 +395,28 @@ async def update_item_info(
 ) -> bool:
     result = await db["inventory_items"].update_one(
         filter={"_id": ObjectId(id)},
-        update={
-            "$set": {
-                **updated_item,
-                "updated_at": datetime.utcnow(),
-                "updated_by": updated_by,
-            }
-        },
+        update=[
+            {
+                "$set": {
+                    **{k: {"$literal": v} for k, v in updated_item.items()},
+                    "updated_at": datetime.utcnow(),
+                    "updated_by": updated_by,
+                }
+            },
+            {"$set": {"is_running_low": running_low_expression}},
+        ],
     )
 
+    await item_document_cache.delete(id)
+
     return True if result.modified_count > 0 else False
+
+
+async def backfill_running_low() -> int:
+    result = await db["inventory_items"].update_many(
+        filter={},
+        update=[{"$set": {"is_running_low": running_low_expression}}],
+    )
+    await item_document_cache.clear()
+
+    return result.modified_count
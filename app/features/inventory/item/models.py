@@ -69,6 +69,7 @@ class ItemBaseModel(BaseModel):
 
 class ItemReadModel(ItemBaseModel):
     id: str = Field(..., alias="_id")
+    is_running_low: bool = False
     created_at: datetime | None = None
     created_by: str | None = None
     updated_at: datetime | None = None
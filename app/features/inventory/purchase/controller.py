@@ -1,46 +1,84 @@
 from datetime import datetime
 from bson.objectid import ObjectId
+from typing import AsyncIterator
+from pymongo import ASCENDING, IndexModel
 from ....core.utilities.database import default_find_limit
-from ....core.utilities.database import db
+from ....core.utilities.database import (
+    db,
+    ensure_ledger_collection,
+    purchases_collection,
+)
+from ....core.utilities.archive import (
+    find_archived_by_id,
+    find_with_archive,
+    stream_with_archive,
+)
+from ....core.utilities.export import default_export_batch_size
+from ....core.utilities.filters import get_processed_sort, time_range_filter
+from ....core.utilities.unit_registry import unit_registry
+
+
+export_fields = [
+    "_id",
+    "item",
+    "amount",
+    "unit",
+    "price",
+    "base_amount",
+    "base_unit_cost",
+    "purchased_at",
+    "purchased_by",
+    "updated_at",
+    "updated_by",
+]
+
+
+async def create_indexes():
+    await ensure_ledger_collection(name="inventory_purchases")
+    await db[purchases_collection].create_indexes(
+        [
+            IndexModel([("item", ASCENDING), ("purchased_at", ASCENDING)]),
+            IndexModel(
+                [("purchased_by", ASCENDING), ("purchased_at", ASCENDING)]
+            ),
+            IndexModel([("purchased_at", ASCENDING)]),
+        ]
+    )
 
 
 def get_processed_filter(
-    item: str,
-    purchased_by: str,
-    purchased_at_from: datetime,
-    purchased_at_to: datetime,
-):
-    filter = {}
+    item: str | None = None,
+    purchased_by: str | None = None,
+    purchased_at_from: datetime | None = None,
+    purchased_at_to: datetime | None = None,
+) -> dict:
+    filter = time_range_filter(
+        field="purchased_at", start=purchased_at_from, end=purchased_at_to
+    )
+
     if item:
-        filter["item"] = (item,)
+        filter["item"] = item
 
     if purchased_by:
         filter["purchased_by"] = purchased_by
 
-    if purchased_at_from or purchased_at_from:
-        filter["purchased_at"] = {}
-
-        if purchased_at_from:
-            filter["purchased_at"]["$gte"] = purchased_at_from
-
-        if purchased_at_to:
-            filter["purchased_at"]["$lte"] = purchased_at_to
-
     return filter
 
 
-def get_processed_sort(sort_by: list[str]) -> dict:
-    sort_dict = {}
-
-    for sort_item in sort_by:
-        if sort_item[0] in "+-":
-            sort_dict[sort_item[1:]] = 1 if sort_item[0] == "+" else "-"
+def get_base_values(purchase: dict) -> dict:
+    return unit_registry.base_values(
+        amount=purchase.get("amount"),
+        unit=purchase.get("unit"),
+        money=purchase.get("price"),
+        item=purchase.get("item"),
+    )
 
 
 async def purchase_item(new_purchase: dict, purchased_by: str) -> str | None:
-    inserted_purchase = await db["inventory_purchases"].insert_one(
+    inserted_purchase = await db[purchases_collection].insert_one(
         {
             **new_purchase,
+            **get_base_values(new_purchase),
             "purchased_by": purchased_by,
             "updated_at": datetime.utcnow(),
             "updated_by": purchased_by,
@@ -58,6 +96,7 @@ async def find_many_purchases(
     limit: int = 0,
     skip: int = 0,
     sort_by: list[str] = [],
+    projection: dict | None = None,
 ) -> list[dict]:
     filter = get_processed_filter(
         item=item,
@@ -67,19 +106,52 @@ async def find_many_purchases(
     )
     sort = get_processed_sort(sort_by=sort_by)
 
-    purchases = [
-        purchase
-        async for purchase in db["inventory_purchases"].find(
-            filter=filter,
-            skip=skip,
-            limit=limit if limit > 0 else default_find_limit,
-            sort=sort,
-        )
-    ]
+    purchases = await find_with_archive(
+        ledger="inventory_purchases",
+        collection=db[purchases_collection],
+        filter=filter,
+        equals={"item": item, "purchased_by": purchased_by},
+        start=purchased_at_from,
+        end=purchased_at_to,
+        skip=skip,
+        limit=limit if limit > 0 else default_find_limit,
+        sort=sort,
+        projection=projection,
+    )
 
     return purchases
 
 
+def export_purchases(
+    item: str | None = None,
+    purchased_by: str | None = None,
+    purchased_at_from: datetime | None = None,
+    purchased_at_to: datetime | None = None,
+    batch_size: int = default_export_batch_size,
+) -> AsyncIterator[dict]:
+    filter = get_processed_filter(
+        item=item,
+        purchased_by=purchased_by,
+        purchased_at_from=purchased_at_from,
+        purchased_at_to=purchased_at_to,
+    )
+
+    return stream_with_archive(
+        ledger="inventory_purchases",
+        cursor=db[purchases_collection]
+        .find(
+            filter=filter,
+            projection=export_fields,
+            sort=[("purchased_at", 1)],
+        )
+        .batch_size(batch_size),
+        equals={"item": item, "purchased_by": purchased_by},
+        start=purchased_at_from,
+        end=purchased_at_to,
+        batch_size=batch_size,
+    )
+
+
 async def find_one_purchase(
     item: str,
     received_by: str,
@@ -98,29 +170,46 @@ async def find_one_purchase(
         purchased_at_to=purchased_at_to,
     )
 
-    purchase = await db["inventory_purchases"].find_one(
+    purchase = await db[purchases_collection].find_one(
         filter=filter, skip=skip
     )
 
     return dict(purchase) if purchase else {}
 
 
-async def find_purchase_by_id(id: str) -> dict:
-    purchase = await db["inventory_purchases"].find_one(
-        filter={"_id": ObjectId(id)}
+async def find_purchase_by_id(
+    id: str, projection: dict | None = None, include_archived: bool = False
+) -> dict:
+    purchase = await db[purchases_collection].find_one(
+        filter={"_id": ObjectId(id)}, projection=projection
     )
 
+    if not purchase and include_archived:
+        # archived rows can be read but no longer updated
+        return await find_archived_by_id(
+            ledger="inventory_purchases",
+            id=ObjectId(id),
+            projection=projection,
+        )
+
     return dict(purchase) if purchase else {}
 
 
 async def update_purchase(
     id: str, updated_purchase: dict, updated_by: str
 ) -> bool:
-    result = await db["inventory_purchases"].update_one(
+    base_values = {}
+
+    if {"item", "amount", "unit", "price"} & updated_purchase.keys():
+        old_purchase = await find_purchase_by_id(id=id)
+        base_values = get_base_values({**old_purchase, **updated_purchase})
+
+    result = await db[purchases_collection].update_one(
         filter={"_id": ObjectId(id)},
         update={
             "$set": {
                 **updated_purchase,
+                **base_values,
                 "updated_by": updated_by,
                 "updated_at": datetime.utcnow(),
             }
@@ -1,12 +1,11 @@
 from datetime import datetime
 from pydantic import BaseModel, Field
-from app.core.constants.measurement_units import MeasurementUnit
 
 
 class PurchaseBaseModel(BaseModel):
     item: str
     amount: float = Field(gt=0)
-    unit: MeasurementUnit
+    unit: str
     purchased_at: datetime = datetime.utcnow()
     price: float
 
@@ -24,7 +23,7 @@ class PurchaseReadModel(PurchaseBaseModel):
 class PurchaseUpdateModel(BaseModel):
     item: str | None = None
     amount: float | None = Field(gt=0, default=None)
-    unit: MeasurementUnit | None = None
+    unit: str | None = None
     price: float | None = None
     purchased_by: str | None = None
     purchased_at: datetime | None = None
@@ -1,10 +1,6 @@
 from datetime import datetime
 from bson.objectid import ObjectId
-from fastapi import APIRouter, Depends, Query
-from ....core.constants.measurement_units import (
-    is_same_measurement_type,
-    measurement_unit_value,
-)
+from fastapi import APIRouter, Depends, Query, Request
 from ....core.error.exceptions import (
     raise_not_found_exception,
     raise_operation_failed_exception,
@@ -15,8 +11,18 @@ from ....core.utilities.converter import (
     model_to_dict_without_None,
 )
 from ....core.utilities.jwt_config import AuthJWT, EmployeeRoleChecker
+from ....core.utilities.responses import model_response
+from ....core.utilities.fields import FieldSelector, FieldSet
+from ....core.utilities.conditional import ResourceVersion
+from ....core.utilities.unit_registry import unit_registry
+from ....core.utilities.export import (
+    ExportFormat,
+    default_export_batch_size,
+    export_response,
+)
 from ....core.constants.employee_roles import EmployeeRole
 from ..item import controller as item_controller
+from ..unit import controller as unit_controller
 from . import models
 from . import controller
 
@@ -49,7 +55,21 @@ async def purchase_item(
             location=["request body", "item"],
         )
 
-    if not is_same_measurement_type(item["unit"], new_purchase.unit):
+    await unit_controller.sync_unit_registry(
+        new_purchase.unit, item["unit"], item=new_purchase.item
+    )
+
+    if not unit_registry.lookup(
+        unit=new_purchase.unit, item=new_purchase.item
+    ):
+        raise_unprocessable_value_exception(
+            message=f"unknown unit [{new_purchase.unit}]",
+            location=["request body", "unit"],
+        )
+
+    if not unit_registry.is_same_measurement_type(
+        item["unit"], new_purchase.unit, item=new_purchase.item
+    ):
         raise_unprocessable_value_exception(
             message="the item is not measured with the same type of measurement.",
             location=["request body", "unit"],
@@ -73,14 +93,54 @@ async def purchase_item(
     )
 
 
+@inventory_purchase_router.get("/export")
+async def export_purchases(
+    format: ExportFormat = ExportFormat.NDJSON,
+    item: str | None = None,
+    purchased_by: str | None = None,
+    purchased_at_from: datetime | None = None,
+    purchased_at_to: datetime | None = None,
+    batch_size: int = Query(default=default_export_batch_size, ge=1, le=10000),
+    current_user_id: AuthJWT = Depends(
+        EmployeeRoleChecker(required_role=EmployeeRole.VIEW_PURCHASE)
+    ),
+):
+    if item and not ObjectId.is_valid(item):
+        raise_unprocessable_value_exception(
+            message="invalid item id",
+            location=["query parameter", "item"],
+        )
+
+    if purchased_by and not ObjectId.is_valid(purchased_by):
+        raise_unprocessable_value_exception(
+            message="invalid employee id",
+            location=["query parameter", "purchased_by"],
+        )
+
+    return export_response(
+        cursor=controller.export_purchases(
+            item=item,
+            purchased_by=purchased_by,
+            purchased_at_from=purchased_at_from,
+            purchased_at_to=purchased_at_to,
+            batch_size=batch_size,
+        ),
+        fields=controller.export_fields,
+        format=format,
+        filename="inventory_purchases",
+    )
+
+
 @inventory_purchase_router.get(
     "/{purchase_id}", response_model=models.SinglePurchaseResponseModel
 )
 async def get_purchase_by_id(
+    request: Request,
     purchase_id: str,
     current_user_id: AuthJWT = Depends(
         EmployeeRoleChecker(required_role=EmployeeRole.VIEW_PURCHASE)
     ),
+    fields: FieldSet = Depends(FieldSelector(models.PurchaseReadModel)),
 ):
     if not ObjectId.is_valid(purchase_id):
         raise_unprocessable_value_exception(
@@ -88,7 +148,9 @@ async def get_purchase_by_id(
             location=["path parameter", "purchase_id"],
         )
 
-    purchase = await controller.find_purchase_by_id(id=purchase_id)
+    purchase = await controller.find_purchase_by_id(
+        id=purchase_id, projection=fields.projection, include_archived=True
+    )
 
     if not purchase:
         raise_not_found_exception(
@@ -96,12 +158,24 @@ async def get_purchase_by_id(
             location=["path parameter", "purchase_id"],
         )
 
-    return models.SinglePurchaseResponseModel(
-        success=True,
-        purchase=dict_to_model(
-            model=models.PurchaseReadModel,
-            dict_model=purchase,
-        ),
+    version = ResourceVersion(
+        request=request, updated_at=purchase.get("updated_at")
+    )
+
+    if version.is_not_modified():
+        return version.not_modified_response()
+
+    return version.apply(
+        model_response(
+            models.SinglePurchaseResponseModel(
+                success=True,
+                purchase=dict_to_model(
+                    model=fields.model,
+                    dict_model=purchase,
+                ),
+            ),
+            exclude=fields.exclude("purchase"),
+        )
     )
 
 
@@ -113,7 +187,7 @@ async def get_purchases(
     purchased_by: str | None = None,
     purchased_at_from: datetime | None = None,
     purchased_at_to: datetime | None = None,
-    limit: int | None = None,
+    limit: int = 0,
     skip: int = 0,
     sort_by: list[str] = Query(
         description="append +[for ascending] or -[for descending] before the name to be sorted with. NOTE: (1) no space between the sign and the name, (2) the arrangement/order of the array maters ..."
@@ -121,6 +195,7 @@ async def get_purchases(
     current_user_id: AuthJWT = Depends(
         EmployeeRoleChecker(required_role=EmployeeRole.VIEW_PURCHASE)
     ),
+    fields: FieldSet = Depends(FieldSelector(models.PurchaseReadModel)),
 ):
     if item and not ObjectId.is_valid(item):
         raise_unprocessable_value_exception(
@@ -134,6 +209,8 @@ async def get_purchases(
             location=["query parameter", "purchased_by"],
         )
 
+    # no conditional handling here, versioning a ledger filter would scan
+    # every matching row on each poll
     purchases = await controller.find_many_purchases(
         item=item,
         purchased_by=purchased_by,
@@ -142,6 +219,7 @@ async def get_purchases(
         limit=limit,
         skip=skip,
         sort_by=sort_by,
+        projection=fields.projection,
     )
 
     if not type(purchases) == list:
@@ -149,15 +227,18 @@ async def get_purchases(
             message="problem while getting purchase"
         )
 
-    return models.MultiplePurchasesResponseModel(
-        success=True,
-        purchases=[
-            dict_to_model(
-                model=models.PurchaseReadModel,
-                dict_model=purchase,
-            )
-            for purchase in purchases
-        ],
+    return model_response(
+        models.MultiplePurchasesResponseModel(
+            success=True,
+            purchases=[
+                dict_to_model(
+                    model=fields.model,
+                    dict_model=purchase,
+                )
+                for purchase in purchases
+            ],
+        ),
+        exclude=fields.exclude("purchases", many=True),
     )
 
 
@@ -211,18 +292,30 @@ async def update_purchase(
             await item_controller.find_item_by_id(id=old_purchase.get("item"))
         )
 
-    if updated_purchase.unit:
-        if not is_same_measurement_type(item["unit"], updated_purchase.unit):
-            raise_unprocessable_value_exception(
-                message="the item is not measured with the same type of measurement.",
-                location=["request body", "unit"],
-            )
-    else:
-        if not is_same_measurement_type(item["unit"], old_purchase["unit"]):
-            raise_unprocessable_value_exception(
-                message="the item is not measured with the same type of measurement.",
-                location=["request body", "unit"],
-            )
+    if not updated_purchase.unit:
+        old_purchase = dict(
+            await controller.find_purchase_by_id(id=purchase_id)
+        )
+
+    unit = updated_purchase.unit or old_purchase["unit"]
+
+    await unit_controller.sync_unit_registry(
+        unit, item["unit"], item=str(item["_id"])
+    )
+
+    if not unit_registry.lookup(unit=unit, item=str(item["_id"])):
+        raise_unprocessable_value_exception(
+            message=f"unknown unit [{unit}]",
+            location=["request body", "unit"],
+        )
+
+    if not unit_registry.is_same_measurement_type(
+        item["unit"], unit, item=str(item["_id"])
+    ):
+        raise_unprocessable_value_exception(
+            message="the item is not measured with the same type of measurement.",
+            location=["request body", "unit"],
+        )
 
     if await controller.update_purchase(
         id=purchase_id,
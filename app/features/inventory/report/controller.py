@@ -0,0 +1,361 @@
+from datetime import datetime
+from os import environ
+from bson.objectid import ObjectId
+from dotenv import load_dotenv
+from ....core.utilities.database import (
+    db,
+    issues_collection,
+    purchases_collection,
+)
+from ....core.utilities.archive import archived_totals
+from ....core.utilities.filters import time_range_filter
+from ....core.utilities.unit_registry import unit_registry
+from ..unit.controller import sync_unit_registry
+
+load_dotenv()
+
+REPORT_MAX_TIME_MS = int(environ.get("REPORT_MAX_TIME_MS", "30000"))
+
+
+def to_object_id_expression(field: str) -> dict:
+    return {
+        "$convert": {
+            "input": field,
+            "to": "objectId",
+            "onError": None,
+            "onNull": None,
+        }
+    }
+
+
+def unit_value_expression(field: str, item_field: str) -> dict:
+    # built from the registry on every call so custom units count too
+    return {
+        "$switch": {
+            "branches": [
+                {
+                    "case": (
+                        {"$eq": [field, unit]}
+                        if item is None
+                        else {
+                            "$and": [
+                                {"$eq": [item_field, item]},
+                                {"$eq": [field, unit]},
+                            ]
+                        }
+                    ),
+                    "then": factor,
+                }
+                for item, unit, factor in unit_registry.factors()
+            ],
+            "default": None,
+        }
+    }
+
+
+def lookup_by_id_stage(collection: str, local_field: str, as_field: str):
+    return [
+        {
+            "$lookup": {
+                "from": collection,
+                "let": {"lookup_id": to_object_id_expression(local_field)},
+                "pipeline": [
+                    {"$match": {"$expr": {"$eq": ["$_id", "$$lookup_id"]}}},
+                    {"$project": {"name": 1, "unit": 1, "category": 1}},
+                ],
+                "as": as_field,
+            }
+        },
+        {
+            "$unwind": {
+                "path": f"${as_field}",
+                "preserveNullAndEmptyArrays": True,
+            }
+        },
+    ]
+
+
+async def aggregate(
+    collection: str,
+    pipeline: list[dict],
+    allow_disk_use: bool = False,
+    max_time_ms: int = 0,
+) -> list[dict]:
+    cursor = db[collection].aggregate(
+        pipeline,
+        allowDiskUse=allow_disk_use,
+        maxTimeMS=max_time_ms if max_time_ms > 0 else REPORT_MAX_TIME_MS,
+    )
+
+    return await cursor.to_list(length=None)
+
+
+async def stock_valuation(
+    allow_disk_use: bool = False, max_time_ms: int = 0
+) -> dict:
+    pipeline = [
+        {
+            "$group": {
+                "_id": "$group",
+                "item_count": {"$sum": 1},
+                "value": {"$sum": {"$multiply": ["$quantity", "$cost"]}},
+            }
+        },
+        *lookup_by_id_stage("inventory_groups", "$_id", "group"),
+        *lookup_by_id_stage(
+            "inventory_categories", "$group.category", "category"
+        ),
+        {
+            "$facet": {
+                "groups": [
+                    {
+                        "$project": {
+                            "_id": 0,
+                            "group": "$_id",
+                            "group_name": "$group.name",
+                            "category": "$group.category",
+                            "category_name": "$category.name",
+                            "item_count": 1,
+                            "value": 1,
+                        }
+                    },
+                    {"$sort": {"category_name": 1, "group_name": 1}},
+                ],
+                "categories": [
+                    {
+                        "$group": {
+                            "_id": "$group.category",
+                            "category_name": {"$first": "$category.name"},
+                            "item_count": {"$sum": "$item_count"},
+                            "value": {"$sum": "$value"},
+                        }
+                    },
+                    {
+                        "$project": {
+                            "_id": 0,
+                            "category": "$_id",
+                            "category_name": 1,
+                            "item_count": 1,
+                            "value": 1,
+                        }
+                    },
+                    {"$sort": {"category_name": 1}},
+                ],
+                "total": [
+                    {"$group": {"_id": None, "value": {"$sum": "$value"}}}
+                ],
+            }
+        },
+    ]
+
+    result = await aggregate(
+        collection="inventory_items",
+        pipeline=pipeline,
+        allow_disk_use=allow_disk_use,
+        max_time_ms=max_time_ms,
+    )
+    valuation = result[0] if result else {}
+    total = valuation.get("total") or [{"value": 0}]
+
+    return {
+        "total_value": total[0]["value"],
+        "categories": valuation.get("categories", []),
+        "groups": valuation.get("groups", []),
+    }
+
+
+def get_ledger_totals_pipeline(
+    time_field: str,
+    money_field: str,
+    period: str,
+    item: str | None = None,
+    date_from: datetime | None = None,
+    date_to: datetime | None = None,
+) -> list[dict]:
+    match = time_range_filter(field=time_field, start=date_from, end=date_to)
+
+    if item:
+        match["item"] = item
+
+    return [
+        {"$match": match},
+        {
+            "$group": {
+                "_id": {
+                    "item": "$item",
+                    "period": {
+                        "$dateTrunc": {
+                            "date": f"${time_field}",
+                            "unit": period,
+                        }
+                    },
+                },
+                # rows written before base_amount was stored fall back to
+                # converting the entered unit inline
+                "base_amount": {
+                    "$sum": {
+                        "$ifNull": [
+                            "$base_amount",
+                            {
+                                "$multiply": [
+                                    "$amount",
+                                    unit_value_expression(
+                                        "$unit", item_field="$item"
+                                    ),
+                                ]
+                            },
+                        ]
+                    }
+                },
+                money_field: {"$sum": f"${money_field}"},
+                "count": {"$sum": 1},
+            }
+        },
+        *lookup_by_id_stage("inventory_items", "$_id.item", "item"),
+        {
+            "$project": {
+                "_id": 0,
+                "item": "$_id.item",
+                "item_name": "$item.name",
+                "unit": "$item.unit",
+                "period": "$_id.period",
+                "base_amount": 1,
+                money_field: 1,
+                "count": 1,
+            }
+        },
+        {"$sort": {"period": 1, "item_name": 1}},
+    ]
+
+
+async def ledger_totals(
+    ledger: str,
+    collection: str,
+    time_field: str,
+    money_field: str,
+    period: str,
+    item: str | None = None,
+    date_from: datetime | None = None,
+    date_to: datetime | None = None,
+    allow_disk_use: bool = False,
+    max_time_ms: int = 0,
+) -> list[dict]:
+    await sync_unit_registry()
+    totals = await aggregate(
+        collection=collection,
+        pipeline=get_ledger_totals_pipeline(
+            time_field=time_field,
+            money_field=money_field,
+            period=period,
+            item=item,
+            date_from=date_from,
+            date_to=date_to,
+        ),
+        allow_disk_use=allow_disk_use,
+        max_time_ms=max_time_ms,
+    )
+    archived = await archived_totals(
+        ledger=ledger,
+        money_field=money_field,
+        period=period,
+        equals={"item": item},
+        start=date_from,
+        end=date_to,
+    )
+
+    if archived:
+        merged = {(total["item"], total["period"]): total for total in totals}
+
+        for (
+            archived_item,
+            archived_period,
+        ), archived_total in archived.items():
+            total = merged.setdefault(
+                (archived_item, archived_period),
+                {
+                    "item": archived_item,
+                    "period": archived_period,
+                    "base_amount": 0.0,
+                    money_field: 0.0,
+                    "count": 0,
+                },
+            )
+
+            for name, value in archived_total.items():
+                total[name] += value
+
+        archived_only_items = [
+            ObjectId(total["item"])
+            for total in merged.values()
+            if "item_name" not in total and ObjectId.is_valid(total["item"])
+        ]
+        items = {
+            str(item["_id"]): item
+            async for item in db["inventory_items"].find(
+                filter={"_id": {"$in": archived_only_items}},
+                projection={"name": 1, "unit": 1},
+            )
+        }
+
+        for total in merged.values():
+            if "item_name" not in total and total["item"] in items:
+                total["item_name"] = items[total["item"]]["name"]
+                total["unit"] = items[total["item"]]["unit"]
+
+        totals = sorted(
+            merged.values(),
+            key=lambda total: (total["period"], total.get("item_name") or ""),
+        )
+
+    for total in totals:
+        # the item's own unit may be a custom unit defined for that item
+        factor = unit_registry.factor(
+            unit=total.get("unit"), item=total["item"]
+        )
+        total["amount"] = total.pop("base_amount") / (factor or 1)
+
+    return totals
+
+
+async def consumption_totals(
+    period: str,
+    item: str | None = None,
+    issued_at_from: datetime | None = None,
+    issued_at_to: datetime | None = None,
+    allow_disk_use: bool = False,
+    max_time_ms: int = 0,
+) -> list[dict]:
+    return await ledger_totals(
+        ledger="inventory_issues",
+        collection=issues_collection,
+        time_field="issued_at",
+        money_field="cost",
+        period=period,
+        item=item,
+        date_from=issued_at_from,
+        date_to=issued_at_to,
+        allow_disk_use=allow_disk_use,
+        max_time_ms=max_time_ms,
+    )
+
+
+async def purchase_totals(
+    period: str,
+    item: str | None = None,
+    purchased_at_from: datetime | None = None,
+    purchased_at_to: datetime | None = None,
+    allow_disk_use: bool = False,
+    max_time_ms: int = 0,
+) -> list[dict]:
+    return await ledger_totals(
+        ledger="inventory_purchases",
+        collection=purchases_collection,
+        time_field="purchased_at",
+        money_field="price",
+        period=period,
+        item=item,
+        date_from=purchased_at_from,
+        date_to=purchased_at_to,
+        allow_disk_use=allow_disk_use,
+        max_time_ms=max_time_ms,
+    )
@@ -0,0 +1,63 @@
+from datetime import datetime
+from enum import Enum
+from pydantic import BaseModel
+
+
+class ReportPeriod(str, Enum):
+    DAY = "day"
+    WEEK = "week"
+    MONTH = "month"
+    YEAR = "year"
+
+
+class GroupValuationModel(BaseModel):
+    group: str | None = None
+    group_name: str | None = None
+    category: str | None = None
+    category_name: str | None = None
+    item_count: int
+    value: float
+
+
+class CategoryValuationModel(BaseModel):
+    category: str | None = None
+    category_name: str | None = None
+    item_count: int
+    value: float
+
+
+class ValuationReportResponseModel(BaseModel):
+    success: bool
+    total_value: float
+    categories: list[CategoryValuationModel]
+    groups: list[GroupValuationModel]
+
+
+class ConsumptionTotalModel(BaseModel):
+    item: str
+    item_name: str | None = None
+    unit: str | None = None
+    period: datetime
+    amount: float
+    cost: float
+    count: int
+
+
+class PurchaseTotalModel(BaseModel):
+    item: str
+    item_name: str | None = None
+    unit: str | None = None
+    period: datetime
+    amount: float
+    price: float
+    count: int
+
+
+class ConsumptionReportResponseModel(BaseModel):
+    success: bool
+    totals: list[ConsumptionTotalModel]
+
+
+class PurchaseReportResponseModel(BaseModel):
+    success: bool
+    totals: list[PurchaseTotalModel]
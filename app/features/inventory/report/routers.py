@@ -0,0 +1,121 @@
+from datetime import datetime
+from bson.objectid import ObjectId
+from fastapi import APIRouter, Depends, Query
+from pymongo.errors import ExecutionTimeout
+from ....core.constants.employee_roles import EmployeeRole
+from ....core.utilities.jwt_config import AuthJWT, EmployeeRoleChecker
+from ....core.error.exceptions import (
+    raise_operation_failed_exception,
+    raise_unprocessable_value_exception,
+)
+from . import models
+from . import controller
+
+inventory_report_router = APIRouter()
+
+inventory_report_router.tags = ["Inventory - Reports"]
+
+
+@inventory_report_router.get(
+    "/valuation", response_model=models.ValuationReportResponseModel
+)
+async def get_stock_valuation(
+    allow_disk_use: bool = False,
+    max_time_ms: int = Query(default=0, ge=0),
+    current_user_id: AuthJWT = Depends(
+        EmployeeRoleChecker(
+            required_role=EmployeeRole.GENERATE_INVENTORY_REPORT
+        )
+    ),
+):
+    try:
+        valuation = await controller.stock_valuation(
+            allow_disk_use=allow_disk_use, max_time_ms=max_time_ms
+        )
+    except ExecutionTimeout:
+        raise_operation_failed_exception(
+            message="stock valuation report exceeded max_time_ms",
+            location=["query parameter", "max_time_ms"],
+        )
+
+    return models.ValuationReportResponseModel(success=True, **valuation)
+
+
+@inventory_report_router.get(
+    "/consumption", response_model=models.ConsumptionReportResponseModel
+)
+async def get_consumption_totals(
+    period: models.ReportPeriod = models.ReportPeriod.MONTH,
+    item: str | None = None,
+    issued_at_from: datetime | None = None,
+    issued_at_to: datetime | None = None,
+    allow_disk_use: bool = False,
+    max_time_ms: int = Query(default=0, ge=0),
+    current_user_id: AuthJWT = Depends(
+        EmployeeRoleChecker(
+            required_role=EmployeeRole.GENERATE_INVENTORY_REPORT
+        )
+    ),
+):
+    if item and not ObjectId.is_valid(item):
+        raise_unprocessable_value_exception(
+            message="invalid item id",
+            location=["query parameter", "item"],
+        )
+
+    try:
+        totals = await controller.consumption_totals(
+            period=period.value,
+            item=item,
+            issued_at_from=issued_at_from,
+            issued_at_to=issued_at_to,
+            allow_disk_use=allow_disk_use,
+            max_time_ms=max_time_ms,
+        )
+    except ExecutionTimeout:
+        raise_operation_failed_exception(
+            message="consumption report exceeded max_time_ms",
+            location=["query parameter", "max_time_ms"],
+        )
+
+    return models.ConsumptionReportResponseModel(success=True, totals=totals)
+
+
+@inventory_report_router.get(
+    "/purchase", response_model=models.PurchaseReportResponseModel
+)
+async def get_purchase_totals(
+    period: models.ReportPeriod = models.ReportPeriod.MONTH,
+    item: str | None = None,
+    purchased_at_from: datetime | None = None,
+    purchased_at_to: datetime | None = None,
+    allow_disk_use: bool = False,
+    max_time_ms: int = Query(default=0, ge=0),
+    current_user_id: AuthJWT = Depends(
+        EmployeeRoleChecker(
+            required_role=EmployeeRole.GENERATE_INVENTORY_REPORT
+        )
+    ),
+):
+    if item and not ObjectId.is_valid(item):
+        raise_unprocessable_value_exception(
+            message="invalid item id",
+            location=["query parameter", "item"],
+        )
+
+    try:
+        totals = await controller.purchase_totals(
+            period=period.value,
+            item=item,
+            purchased_at_from=purchased_at_from,
+            purchased_at_to=purchased_at_to,
+            allow_disk_use=allow_disk_use,
+            max_time_ms=max_time_ms,
+        )
+    except ExecutionTimeout:
+        raise_operation_failed_exception(
+            message="purchase report exceeded max_time_ms",
+            location=["query parameter", "max_time_ms"],
+        )
+
+    return models.PurchaseReportResponseModel(success=True, totals=totals)
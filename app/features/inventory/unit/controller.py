@@ -0,0 +1,111 @@
+from datetime import datetime
+from bson.objectid import ObjectId
+from pymongo import ASCENDING
+from ....core.utilities.database import db, default_find_limit
+from ....core.utilities.invalidation import (
+    CACHE_INVALIDATION_ENABLED,
+    invalidation_bus,
+)
+from ....core.utilities.unit_registry import unit_registry
+
+
+async def refresh_unit_registry():
+    unit_registry.load(
+        units=[
+            unit
+            async for unit in db["inventory_units"].find(
+                filter={},
+                projection={"name": 1, "item": 1, "unit": 1, "amount": 1},
+            )
+        ]
+    )
+
+
+async def sync_unit_registry(*units, item: str | None = None):
+    # without the invalidation bus this worker never hears about units
+    # created or changed through the other workers, so reload before use,
+    # with it on only a unit this worker does not know yet needs a reload
+    if not CACHE_INVALIDATION_ENABLED or any(
+        unit_registry.lookup(unit=unit, item=item) is None for unit in units
+    ):
+        await refresh_unit_registry()
+
+
+async def invalidate_unit_registry(event: dict):
+    await refresh_unit_registry()
+
+
+invalidation_bus.subscribe(
+    collection="inventory_units", listener=invalidate_unit_registry
+)
+
+
+async def create_indexes():
+    await db["inventory_units"].create_index(
+        [("item", ASCENDING), ("name", ASCENDING)], unique=True
+    )
+
+
+async def create_unit(new_unit: dict, create_by: str) -> str | None:
+    inserted_unit = await db["inventory_units"].insert_one(
+        {
+            **new_unit,
+            "created_at": datetime.utcnow(),
+            "created_by": create_by,
+            "updated_at": datetime.utcnow(),
+            "updated_by": create_by,
+        }
+    )
+    await refresh_unit_registry()
+
+    return inserted_unit.inserted_id
+
+
+async def find_many_units(
+    item: str | None = None,
+    limit: int = 0,
+    skip: int = 0,
+    projection: dict | None = None,
+) -> list[dict]:
+    filter = {}
+
+    if item:
+        filter["item"] = {"$in": [item, None]}
+
+    units = [
+        unit
+        async for unit in db["inventory_units"].find(
+            filter=filter,
+            projection=projection,
+            skip=skip,
+            limit=limit if limit > 0 else default_find_limit,
+        )
+    ]
+
+    return list(units) if units else []
+
+
+async def find_unit_by_id(id: str, projection: dict | None = None) -> dict:
+    unit = await db["inventory_units"].find_one(
+        filter={"_id": ObjectId(id)}, projection=projection
+    )
+
+    return dict(unit) if unit else {}
+
+
+async def update_unit_info(
+    id: str, updated_unit: dict, updated_by: str
+) -> bool:
+    result = await db["inventory_units"].update_one(
+        filter={"_id": ObjectId(id)},
+        update={
+            "$set": {
+                **updated_unit,
+                "updated_at": datetime.utcnow(),
+                "updated_by": updated_by,
+            }
+        },
+    )
+    await refresh_unit_registry()
+
+    return True if result.modified_count > 0 else False
@@ -0,0 +1,39 @@
+from datetime import datetime
+from pydantic import BaseModel, Field
+from app.core.constants.measurement_units import MeasurementUnit
+
+
+class UnitBaseModel(BaseModel):
+    name: str
+    item: str | None = None
+    unit: MeasurementUnit
+    amount: float = Field(gt=0)
+
+    class Config:
+        use_enum_values = True
+
+
+class UnitReadModel(UnitBaseModel):
+    id: str = Field(..., alias="_id")
+    created_at: datetime | None = None
+    created_by: str | None = None
+    updated_at: datetime | None = None
+    updated_by: str | None = None
+
+
+class UnitUpdateModel(BaseModel):
+    unit: MeasurementUnit | None = None
+    amount: float | None = Field(gt=0, default=None)
+
+    class Config:
+        use_enum_values = True
+
+
+class SingleUnitResponseModel(BaseModel):
+    success: bool
+    unit: UnitReadModel
+
+
+class MultipleUnitsResponseModel(BaseModel):
+    success: bool
+    units: list[UnitReadModel]
@@ -0,0 +1,211 @@
+from bson.objectid import ObjectId
+from pymongo.errors import DuplicateKeyError
+from fastapi import APIRouter, Depends
+from ....core.constants.employee_roles import EmployeeRole
+from ....core.constants.measurement_units import (
+    is_same_measurement_type,
+    unit_registry as measurement_unit_registry,
+)
+from ....core.utilities.converter import (
+    dict_to_model,
+    model_to_dict_without_None,
+)
+from ....core.utilities.jwt_config import AuthJWT, EmployeeRoleChecker
+from ....core.utilities.responses import model_response
+from ....core.utilities.fields import FieldSelector, FieldSet
+from ....core.error.exceptions import (
+    raise_duplicated_entry_exception,
+    raise_not_found_exception,
+    raise_operation_failed_exception,
+    raise_unprocessable_value_exception,
+)
+from ..item import controller as item_controller
+from . import models
+from . import controller
+
+inventory_unit_router = APIRouter()
+
+inventory_unit_router.tags = ["Inventory - Units"]
+
+
+@inventory_unit_router.post("/", response_model=models.SingleUnitResponseModel)
+async def create_unit(
+    new_unit: models.UnitBaseModel,
+    current_user_id: AuthJWT = Depends(
+        EmployeeRoleChecker(required_role=EmployeeRole.MANAGE_INVENTORY_ITEMS)
+    ),
+):
+    new_unit.name = new_unit.name.lower()
+
+    if new_unit.name in measurement_unit_registry:
+        raise_duplicated_entry_exception(
+            message=f"[{new_unit.name}] is already a built in unit",
+            location=["request body", "name"],
+        )
+
+    if new_unit.item:
+        if not ObjectId.is_valid(new_unit.item):
+            raise_unprocessable_value_exception(
+                message="invalid item id",
+                location=["request body", "item"],
+            )
+
+        item = await item_controller.find_item_by_id(id=new_unit.item)
+
+        if not item:
+            raise_not_found_exception(
+                message=f"no item found with an id={new_unit.item}",
+                location=["request body", "item"],
+            )
+
+        if not is_same_measurement_type(item["unit"], new_unit.unit):
+            raise_unprocessable_value_exception(
+                message="the item is not measured with the same type of measurement.",
+                location=["request body", "unit"],
+            )
+
+    try:
+        unit_id = await controller.create_unit(
+            new_unit=new_unit.dict(), create_by=current_user_id
+        )
+    except DuplicateKeyError:
+        raise_duplicated_entry_exception(
+            message="this unit already exists",
+            location=["request body", "name"],
+        )
+
+    unit = await controller.find_unit_by_id(id=unit_id)
+
+    if not unit:
+        raise_operation_failed_exception(
+            message="problem while creating inventory unit"
+        )
+
+    return models.SingleUnitResponseModel(
+        success=True,
+        unit=dict_to_model(model=models.UnitReadModel, dict_model=unit),
+    )
+
+
+@inventory_unit_router.get(
+    "/{unit_id}", response_model=models.SingleUnitResponseModel
+)
+async def get_unit(
+    unit_id: str,
+    current_user_id: AuthJWT = Depends(
+        EmployeeRoleChecker(required_role=EmployeeRole.VIEW_INVENTORY_ITEMS)
+    ),
+    fields: FieldSet = Depends(FieldSelector(models.UnitReadModel)),
+):
+    if not ObjectId.is_valid(unit_id):
+        raise_unprocessable_value_exception(
+            message=f"invalid unit_id={unit_id}",
+            location=["path parameter", "unit_id"],
+        )
+
+    unit = await controller.find_unit_by_id(
+        id=unit_id, projection=fields.projection
+    )
+
+    if not unit:
+        raise_not_found_exception(
+            message=f"no unit found with an id={unit_id}",
+            location=["path parameter", "unit_id"],
+        )
+
+    return model_response(
+        models.SingleUnitResponseModel(
+            success=True,
+            unit=dict_to_model(model=fields.model, dict_model=unit),
+        ),
+        exclude=fields.exclude("unit"),
+    )
+
+
+@inventory_unit_router.get(
+    "/", response_model=models.MultipleUnitsResponseModel
+)
+async def get_units(
+    item: str | None = None,
+    limit: int = 0,
+    skip: int = 0,
+    current_user_id: AuthJWT = Depends(
+        EmployeeRoleChecker(required_role=EmployeeRole.VIEW_INVENTORY_ITEMS)
+    ),
+    fields: FieldSet = Depends(FieldSelector(models.UnitReadModel)),
+):
+    if item and not ObjectId.is_valid(item):
+        raise_unprocessable_value_exception(
+            message="invalid item id",
+            location=["query parameter", "item"],
+        )
+
+    units = await controller.find_many_units(
+        item=item, limit=limit, skip=skip, projection=fields.projection
+    )
+
+    if not type(units) == list:
+        raise_operation_failed_exception(
+            message="problem while getting inventory units"
+        )
+
+    return model_response(
+        models.MultipleUnitsResponseModel(
+            success=True,
+            units=[
+                dict_to_model(model=fields.model, dict_model=unit)
+                for unit in units
+            ],
+        ),
+        exclude=fields.exclude("units", many=True),
+    )
+
+
+@inventory_unit_router.patch(
+    "/{unit_id}", response_model=models.SingleUnitResponseModel
+)
+async def update_unit(
+    unit_id: str,
+    updated_unit: models.UnitUpdateModel,
+    current_user_id: AuthJWT = Depends(
+        EmployeeRoleChecker(required_role=EmployeeRole.MANAGE_INVENTORY_ITEMS)
+    ),
+):
+    if not ObjectId.is_valid(unit_id):
+        raise_unprocessable_value_exception(
+            message=f"invalid unit_id={unit_id}",
+            location=["path parameter", "unit_id"],
+        )
+
+    old_unit = await controller.find_unit_by_id(id=unit_id)
+
+    if not old_unit:
+        raise_not_found_exception(
+            message=f"no unit found with an id={unit_id}",
+            location=["path parameter", "unit_id"],
+        )
+
+    # changing the dimension would silently re-cost every row using it
+    if updated_unit.unit and not is_same_measurement_type(
+        old_unit["unit"], updated_unit.unit
+    ):
+        raise_unprocessable_value_exception(
+            message="a unit can not change its type of measurement.",
+            location=["request body", "unit"],
+        )
+
+    result = await controller.update_unit_info(
+        id=unit_id,
+        updated_unit=model_to_dict_without_None(model=updated_unit),
+        updated_by=current_user_id,
+    )
+
+    unit = await controller.find_unit_by_id(id=unit_id)
+
+    if not result or not unit:
+        raise_operation_failed_exception(message="problem while updating unit")
+
+    return models.SingleUnitResponseModel(
+        success=True,
+        unit=dict_to_model(model=models.UnitReadModel, dict_model=unit),
+    )
@@ -1,11 +1,48 @@
 from datetime import datetime
 from bson.objectid import ObjectId
+from pymongo import ASCENDING
 from ....core.utilities.database import db, default_find_limit
+from ....core.utilities.conditional import collection_version
 from ....core.utilities.converter import str_to_match_all_regex
+from ....core.utilities.invalidation import invalidation_bus
+from ....core.utilities.reference_cache import ReferenceCache
+from ....core.utilities.single_flight import single_flight
 
 
-async def category_exists(name: str):
-    return bool(await db["menu_categories"].find_one({"name": name}))
+category_cache = ReferenceCache(collection="menu_categories")
+group_cache = ReferenceCache(collection="menu_groups")
+
+invalidation_bus.subscribe(
+    collection="menu_categories", listener=category_cache.invalidate
+)
+invalidation_bus.subscribe(
+    collection="menu_groups", listener=group_cache.invalidate
+)
+
+
+async def refresh_reference_caches():
+    await category_cache.refresh()
+    await group_cache.refresh()
+
+
+async def create_indexes():
+    await db["menu_categories"].create_index(
+        [("name", ASCENDING)], unique=True
+    )
+    await db["menu_groups"].create_index(
+        [("category", ASCENDING), ("name", ASCENDING)], unique=True
+    )
+    await db["menu_items"].create_index(
+        [("group", ASCENDING), ("name", ASCENDING)], unique=True
+    )
+
+
+async def find_cached_category_by_id(id: str) -> dict:
+    return await category_cache.get(id)
+
+
+async def find_cached_group_by_id(id: str) -> dict:
+    return await group_cache.get(id)
 
 
 async def create_category(new_category: dict, create_by: str) -> bool:
@@ -19,6 +56,8 @@ async def create_category(new_category: dict, create_by: str) -> bool:
         }
     )
 
+    await category_cache.refresh()
+
     return bool(inserted_id)
 
 
@@ -26,6 +65,7 @@ async def find_many_categories(
     name: str | None = None,
     limit: int = 0,
     skip: int = 0,
+    projection: dict | None = None,
 ) -> list[dict]:
     filter = {}
 
@@ -36,6 +76,7 @@ async def find_many_categories(
         category
         async for category in db["menu_categories"].find(
             filter=filter,
+            projection=projection,
             skip=skip,
             limit=limit if limit > 0 else default_find_limit,
         )
@@ -57,9 +98,9 @@ async def find_one_category(
     return dict(category) if category else {}
 
 
-async def find_category_by_id(id: str) -> dict:
+async def find_category_by_id(id: str, projection: dict | None = None) -> dict:
     category = await db["menu_categories"].find_one(
-        filter={"_id": ObjectId(id)}
+        filter={"_id": ObjectId(id)}, projection=projection
     )
 
     return dict(category) if category else {}
@@ -79,13 +120,9 @@ async def update_category_info(
         },
     )
 
-    return True if result.modified_count > 0 else False
-
+    await category_cache.refresh()
 
-async def group_exists(name: str, category: str):
-    return bool(
-        await db["menu_groups"].find_one({"name": name, "category": category})
-    )
+    return True if result.modified_count > 0 else False
 
 
 async def create_group(new_group: dict, create_by: str) -> bool:
@@ -99,6 +136,8 @@ async def create_group(new_group: dict, create_by: str) -> bool:
         }
     )
 
+    await group_cache.refresh()
+
     return bool(inserted_id)
 
 
@@ -106,6 +145,7 @@ async def find_many_groups(
     name: str | None = None,
     limit: int = 0,
     skip: int = 0,
+    projection: dict | None = None,
 ) -> list[dict]:
     filter = {}
     if name:
@@ -115,6 +155,7 @@ async def find_many_groups(
         group
         async for group in db["menu_groups"].find(
             filter=filter,
+            projection=projection,
             skip=skip,
             limit=limit if limit > 0 else default_find_limit,
         )
@@ -136,8 +177,10 @@ async def find_one_group(
     return dict(group) if group else {}
 
 
-async def find_group_by_id(id: str) -> dict:
-    group = await db["menu_groups"].find_one(filter={"_id": ObjectId(id)})
+async def find_group_by_id(id: str, projection: dict | None = None) -> dict:
+    group = await db["menu_groups"].find_one(
+        filter={"_id": ObjectId(id)}, projection=projection
+    )
 
     return dict(group) if group else {}
 
@@ -156,6 +199,8 @@ async def update_group_info(
         },
     )
 
+    await group_cache.refresh()
+
     return True if result.modified_count > 0 else False
 
 
@@ -181,12 +226,6 @@ def get_processed_sort(sort_by: list[str]) -> dict:
             sort_dict[sort_item[1:]] = 1 if sort_item[0] == "+" else "-"
 
 
-async def item_exists(name: str, group: str):
-    return bool(
-        await db["menu_items"].find_one({"name": name, "group": group})
-    )
-
-
 async def create_item(new_item: dict, create_by: str) -> bool:
     inserted_id = await db["menu_items"].insert_one(
         {
@@ -201,12 +240,14 @@ async def create_item(new_item: dict, create_by: str) -> bool:
     return bool(inserted_id)
 
 
+@single_flight()
 async def find_many_items(
     name: str | None = None,
     group: str | None = None,
     limit: int = 0,
     skip: int = 0,
     sort_by: list[str] = [],
+    projection: dict | None = None,
 ) -> list[dict]:
     filter = get_processed_filter(name=name, group=group)
     sort = get_processed_sort(sort_by=sort_by)
@@ -215,6 +256,7 @@ async def find_many_items(
         item
         async for item in db["menu_items"].find(
             filter=filter,
+            projection=projection,
             skip=skip,
             limit=limit if limit > 0 else default_find_limit,
             sort=sort,
@@ -224,6 +266,16 @@ async def find_many_items(
     return list(items) if items else []
 
 
+@single_flight()
+async def find_items_version(
+    name: str | None = None,
+    group: str | None = None,
+) -> dict:
+    filter = get_processed_filter(name=name, group=group)
+
+    return await collection_version(collection=db["menu_items"], filter=filter)
+
+
 async def find_one_item(
     name: str | None = None,
     group: str | None = None,
@@ -236,8 +288,10 @@ async def find_one_item(
     return dict(item) if item else {}
 
 
-async def find_item_by_id(id: str) -> dict:
-    item = await db["menu_items"].find_one(filter={"_id": ObjectId(id)})
+async def find_item_by_id(id: str, projection: dict | None = None) -> dict:
+    item = await db["menu_items"].find_one(
+        filter={"_id": ObjectId(id)}, projection=projection
+    )
 
     return dict(item) if item else {}
 
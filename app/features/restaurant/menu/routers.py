@@ -1,12 +1,16 @@
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Request
 
 from bson.objectid import ObjectId
+from pymongo.errors import DuplicateKeyError
 from app.core.constants.employee_roles import EmployeeRole
 from app.core.utilities.converter import (
     dict_to_model,
     model_to_dict_without_None,
 )
 from ....core.utilities.jwt_config import AuthJWT, EmployeeRoleChecker
+from ....core.utilities.responses import model_response
+from ....core.utilities.fields import FieldSelector, FieldSet
+from ....core.utilities.conditional import ResourceVersion
 from app.core.error.exceptions import (
     raise_duplicated_entry_exception,
     raise_not_found_exception,
@@ -33,16 +37,16 @@ async def create_category(
     ),
 ):
     new_category.name = new_category.name.lower()
-    if await controller.category_exists(name=new_category.name):
+    try:
+        await controller.create_category(
+            new_category=new_category.dict(), create_by=current_user_id
+        )
+    except DuplicateKeyError:
         raise_duplicated_entry_exception(
             message="this category already exists",
             location=["request body", "name"],
         )
 
-    await controller.create_category(
-        new_category=new_category.dict(), create_by=current_user_id
-    )
-
     category = await controller.find_one_category(name=new_category.name)
     if not category:
         raise_operation_failed_exception(
@@ -66,6 +70,7 @@ async def get_category(
     current_user_id: AuthJWT = Depends(
         EmployeeRoleChecker(required_role=EmployeeRole.VIEW_MENU_ITEMS)
     ),
+    fields: FieldSet = Depends(FieldSelector(models.CategoryReadModel)),
 ):
     if not ObjectId.is_valid(category_id):
         raise_unprocessable_value_exception(
@@ -73,7 +78,9 @@ async def get_category(
             location=["path parameter", "category_id"],
         )
 
-    category = await controller.find_category_by_id(id=category_id)
+    category = await controller.find_category_by_id(
+        id=category_id, projection=fields.projection
+    )
 
     if not category:
         raise_not_found_exception(
@@ -81,11 +88,12 @@ async def get_category(
             location=["path parameter", "category_id"],
         )
 
-    return models.SingleCategoryResponseModel(
-        success=True,
-        category=dict_to_model(
-            model=models.CategoryReadModel, dict_model=category
+    return model_response(
+        models.SingleCategoryResponseModel(
+            success=True,
+            category=dict_to_model(model=fields.model, dict_model=category),
         ),
+        exclude=fields.exclude("category"),
     )
 
 
@@ -96,23 +104,29 @@ async def get_categories(
     current_user_id: AuthJWT = Depends(
         EmployeeRoleChecker(required_role=EmployeeRole.VIEW_MENU_ITEMS)
     ),
+    fields: FieldSet = Depends(FieldSelector(models.CategoryReadModel)),
 ):
-    categories = await controller.find_many_categories()
+    categories = await controller.find_many_categories(
+        projection=fields.projection
+    )
 
     if not type(categories) == list:
         raise_operation_failed_exception(
             message="problem while getting menu category"
         )
 
-    return models.MultipleCategoriesResponseModel(
-        success=True,
-        categories=[
-            dict_to_model(
-                model=models.CategoryReadModel,
-                dict_model=category,
-            )
-            for category in categories
-        ],
+    return model_response(
+        models.MultipleCategoriesResponseModel(
+            success=True,
+            categories=[
+                dict_to_model(
+                    model=fields.model,
+                    dict_model=category,
+                )
+                for category in categories
+            ],
+        ),
+        exclude=fields.exclude("categories", many=True),
     )
 
 
@@ -136,18 +150,20 @@ async def update_category(
     if updated_category.name:
         updated_category.name = updated_category.name.lower()
 
-    if await controller.category_exists(name=updated_category.name):
+    try:
+        result = await controller.update_category_info(
+            id=category_id,
+            updated_category=model_to_dict_without_None(
+                model=updated_category
+            ),
+            updated_by=current_user_id,
+        )
+    except DuplicateKeyError:
         raise_duplicated_entry_exception(
             message="this category already exists",
             location=["request body", "name"],
         )
 
-    result = await controller.update_category_info(
-        id=category_id,
-        updated_category=model_to_dict_without_None(model=updated_category),
-        updated_by=current_user_id,
-    )
-
     category = await controller.find_category_by_id(id=category_id)
 
     if not result or not category:
@@ -176,7 +192,7 @@ async def create_groups(
             location=["request body", "category"],
         )
 
-    if not await controller.find_category_by_id(id=new_group.category):
+    if not await controller.find_cached_category_by_id(id=new_group.category):
         raise_not_found_exception(
             message=f"no category was found with {new_group.category} id",
             location=["request body", "category"],
@@ -184,18 +200,16 @@ async def create_groups(
 
     new_group.name = new_group.name.lower()
 
-    if await controller.group_exists(
-        name=new_group.name, category=new_group.category
-    ):
+    try:
+        await controller.create_group(
+            new_group=new_group.dict(), create_by=current_user_id
+        )
+    except DuplicateKeyError:
         raise_duplicated_entry_exception(
             message="this group already exists",
             location=["request body", "name"],
         )
 
-    await controller.create_group(
-        new_group=new_group.dict(), create_by=current_user_id
-    )
-
     group = await controller.find_one_group(name=new_group.name)
     if not group:
         raise_operation_failed_exception(
@@ -219,6 +233,7 @@ async def get_group(
     current_user_id: AuthJWT = Depends(
         EmployeeRoleChecker(required_role=EmployeeRole.VIEW_MENU_ITEMS)
     ),
+    fields: FieldSet = Depends(FieldSelector(models.GroupReadModel)),
 ):
     if not ObjectId.is_valid(group_id):
         raise_unprocessable_value_exception(
@@ -226,7 +241,9 @@ async def get_group(
             location=["path parameter", "group_id"],
         )
 
-    group = await controller.find_group_by_id(id=group_id)
+    group = await controller.find_group_by_id(
+        id=group_id, projection=fields.projection
+    )
 
     if not group:
         raise_not_found_exception(
@@ -234,9 +251,12 @@ async def get_group(
             location=["path parameter", "group_id"],
         )
 
-    return models.SingleGroupResponseModel(
-        success=True,
-        group=dict_to_model(model=models.GroupReadModel, dict_model=group),
+    return model_response(
+        models.SingleGroupResponseModel(
+            success=True,
+            group=dict_to_model(model=fields.model, dict_model=group),
+        ),
+        exclude=fields.exclude("group"),
     )
 
 
@@ -245,23 +265,27 @@ async def get_group(
     current_user_id: AuthJWT = Depends(
         EmployeeRoleChecker(required_role=EmployeeRole.VIEW_MENU_ITEMS)
     ),
+    fields: FieldSet = Depends(FieldSelector(models.GroupReadModel)),
 ):
-    groups = await controller.find_many_groups()
+    groups = await controller.find_many_groups(projection=fields.projection)
 
     if not type(groups) == list:
         raise_operation_failed_exception(
             message="problem while getting menu group"
         )
 
-    return models.MultipleGroupsResponseModel(
-        success=True,
-        groups=[
-            dict_to_model(
-                model=models.GroupReadModel,
-                dict_model=group,
-            )
-            for group in groups
-        ],
+    return model_response(
+        models.MultipleGroupsResponseModel(
+            success=True,
+            groups=[
+                dict_to_model(
+                    model=fields.model,
+                    dict_model=group,
+                )
+                for group in groups
+            ],
+        ),
+        exclude=fields.exclude("groups", many=True),
     )
 
 
@@ -288,7 +312,7 @@ async def update_group(
                 location=["path parameter", "category"],
             )
 
-        if not await controller.find_category_by_id(
+        if not await controller.find_cached_category_by_id(
             id=updated_group.category
         ):
             raise_not_found_exception(
@@ -299,29 +323,18 @@ async def update_group(
     if updated_group.name:
         updated_group.name = updated_group.name.lower()
 
-    old_group = await controller.find_group_by_id(id=group_id)
-
-    updated_group_checker_dict = {
-        "name": old_group["name"],
-        "category": old_group["category"],
-        **model_to_dict_without_None(model=updated_group),
-    }
-
-    if await controller.group_exists(
-        category=updated_group_checker_dict["category"],
-        name=updated_group_checker_dict["name"],
-    ):
+    try:
+        result = await controller.update_group_info(
+            id=group_id,
+            updated_group=model_to_dict_without_None(model=updated_group),
+            updated_by=current_user_id,
+        )
+    except DuplicateKeyError:
         raise_duplicated_entry_exception(
             message="this item already exists",
             location=["request body", "name"],
         )
 
-    result = await controller.update_group_info(
-        id=group_id,
-        updated_group=model_to_dict_without_None(model=updated_group),
-        updated_by=current_user_id,
-    )
-
     group = await controller.find_group_by_id(id=group_id)
 
     if not result or not group:
@@ -348,7 +361,7 @@ async def create_item(
             location=["request body", "group"],
         )
 
-    if not await controller.find_group_by_id(id=new_item.group):
+    if not await controller.find_cached_group_by_id(id=new_item.group):
         raise_not_found_exception(
             message=f"no group was found with {new_item.group} id",
             location=["request body", "group"],
@@ -388,19 +401,16 @@ async def create_item(
 
     new_item.name = new_item.name.lower()
 
-    if await controller.item_exists(
-        name=new_item.name,
-        group=new_item.group,
-    ):
+    try:
+        await controller.create_item(
+            new_item=new_item.dict(), create_by=current_user_id
+        )
+    except DuplicateKeyError:
         raise_duplicated_entry_exception(
             message="this item already exists",
             location=["request body", "name"],
         )
 
-    await controller.create_item(
-        new_item=new_item.dict(), create_by=current_user_id
-    )
-
     item = await controller.find_one_item(name=new_item.name)
     if not item:
         raise_operation_failed_exception(
@@ -418,10 +428,12 @@ async def create_item(
 
 @item_router.get("/{item_id}", response_model=models.SingleItemResponseModel)
 async def get_item(
+    request: Request,
     item_id: str,
     current_user_id: AuthJWT = Depends(
         EmployeeRoleChecker(required_role=EmployeeRole.VIEW_MENU_ITEMS)
     ),
+    fields: FieldSet = Depends(FieldSelector(models.ItemReadModel)),
 ):
     if not ObjectId.is_valid(item_id):
         raise_unprocessable_value_exception(
@@ -429,7 +441,9 @@ async def get_item(
             location=["path parameter", "item_id"],
         )
 
-    item = await controller.find_item_by_id(id=item_id)
+    item = await controller.find_item_by_id(
+        id=item_id, projection=fields.projection
+    )
 
     if not item:
         raise_not_found_exception(
@@ -437,14 +451,27 @@ async def get_item(
             location=["path parameter", "item_id"],
         )
 
-    return models.SingleItemResponseModel(
-        success=True,
-        item=dict_to_model(model=models.ItemReadModel, dict_model=item),
+    version = ResourceVersion(
+        request=request, updated_at=item.get("updated_at")
+    )
+
+    if version.is_not_modified():
+        return version.not_modified_response()
+
+    return version.apply(
+        model_response(
+            models.SingleItemResponseModel(
+                success=True,
+                item=dict_to_model(model=fields.model, dict_model=item),
+            ),
+            exclude=fields.exclude("item"),
+        )
     )
 
 
 @item_router.get("/", response_model=models.MultipleItemsResponseModel)
 async def get_items(
+    request: Request,
     name: str | None = None,
     group: str | None = None,
     limit: int = 0,
@@ -455,13 +482,23 @@ async def get_items(
     current_user_id: AuthJWT = Depends(
         EmployeeRoleChecker(required_role=EmployeeRole.VIEW_MENU_ITEMS)
     ),
+    fields: FieldSet = Depends(FieldSelector(models.ItemReadModel)),
 ):
+    version = ResourceVersion(
+        request=request,
+        **await controller.find_items_version(name=name, group=group),
+    )
+
+    if version.is_not_modified():
+        return version.not_modified_response()
+
     items = await controller.find_many_items(
         name=name,
         group=group,
         limit=limit,
         skip=skip,
         sort_by=sort_by,
+        projection=fields.projection,
     )
 
     if not type(items) == list:
@@ -469,15 +506,20 @@ async def get_items(
             message="problem while getting menu item"
         )
 
-    return models.MultipleItemsResponseModel(
-        success=True,
-        items=[
-            dict_to_model(
-                model=models.ItemReadModel,
-                dict_model=item,
-            )
-            for item in items
-        ],
+    return version.apply(
+        model_response(
+            models.MultipleItemsResponseModel(
+                success=True,
+                items=[
+                    dict_to_model(
+                        model=fields.model,
+                        dict_model=item,
+                    )
+                    for item in items
+                ],
+            ),
+            exclude=fields.exclude("items", many=True),
+        )
     )
 
 
@@ -498,7 +540,7 @@ async def update_item(
             location=["path parameter", "item_id"],
         )
     if updated_item.group:
-        if not await controller.find_group_by_id(id=updated_item.group):
+        if not await controller.find_cached_group_by_id(id=updated_item.group):
             raise_not_found_exception(
                 message=f"no group was found with {updated_item.group} id",
                 location=["request body", "group"],
@@ -507,29 +549,17 @@ async def update_item(
     if updated_item.name:
         updated_item.name = updated_item.name.lower()
 
-    if updated_item.name or updated_item.group:
-        old_item = await controller.find_item_by_id(id=item_id)
-
-        updated_item_checker_dict = {
-            "name": old_item["name"],
-            "group": old_item["group"],
-            **model_to_dict_without_None(model=updated_item),
-        }
-
-        if await controller.item_exists(
-            group=updated_item_checker_dict["group"],
-            name=updated_item_checker_dict["name"],
-        ):
-            raise_duplicated_entry_exception(
-                message="this item already exists",
-                location=["request body", "name"],
-            )
-
-    result = await controller.update_item_info(
-        id=item_id,
-        updated_item=model_to_dict_without_None(model=updated_item),
-        updated_by=current_user_id,
-    )
+    try:
+        result = await controller.update_item_info(
+            id=item_id,
+            updated_item=model_to_dict_without_None(model=updated_item),
+            updated_by=current_user_id,
+        )
+    except DuplicateKeyError:
+        raise_duplicated_entry_exception(
+            message="this item already exists",
+            location=["request body", "name"],
+        )
 
     item = await controller.find_item_by_id(id=item_id)
 
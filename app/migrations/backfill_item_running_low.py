@@ -0,0 +1,13 @@
+from asyncio import run
+from ..features.inventory.item import controller
+
+
+async def migrate():
+    await controller.create_indexes()
+    modified_count = await controller.backfill_running_low()
+
+    print(f"backfilled is_running_low on {modified_count} inventory items")
+
+
+if __name__ == "__main__":
+    run(migrate())
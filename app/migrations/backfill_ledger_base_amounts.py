@@ -0,0 +1,70 @@
+from argparse import ArgumentParser
+from asyncio import run
+from pymongo import UpdateOne
+from ..core.utilities.database import (
+    db,
+    issues_collection,
+    purchases_collection,
+)
+from ..core.utilities.unit_registry import unit_registry
+from ..features.inventory.unit.controller import refresh_unit_registry
+
+ledger_money_fields = {
+    issues_collection: "cost",
+    purchases_collection: "price",
+}
+
+
+async def backfill_ledger(collection: str, batch_size: int) -> int:
+    money_field = ledger_money_fields[collection]
+    modified_count = 0
+    batch = []
+
+    async for document in db[collection].find(
+        filter={"base_amount": {"$exists": False}},
+        projection={"item": 1, "amount": 1, "unit": 1, money_field: 1},
+        batch_size=batch_size,
+    ):
+        batch.append(
+            UpdateOne(
+                filter={"_id": document["_id"]},
+                update={
+                    "$set": unit_registry.base_values(
+                        amount=document.get("amount"),
+                        unit=document.get("unit"),
+                        money=document.get(money_field),
+                        item=document.get("item"),
+                    )
+                },
+            )
+        )
+
+        if len(batch) >= batch_size:
+            result = await db[collection].bulk_write(batch, ordered=False)
+            modified_count += result.modified_count
+            batch = []
+
+    if batch:
+        result = await db[collection].bulk_write(batch, ordered=False)
+        modified_count += result.modified_count
+
+    print(f"backfilled base amounts on {modified_count} rows of {collection}")
+
+    return modified_count
+
+
+async def migrate(batch_size: int = 1000):
+    await refresh_unit_registry()
+
+    for collection in ledger_money_fields:
+        await backfill_ledger(collection=collection, batch_size=batch_size)
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(
+        description="store base_amount and base_unit_cost on ledger rows"
+    )
+    parser.add_argument("--batch-size", type=int, default=1000)
+    arguments = parser.parse_args()
+
+    run(migrate(batch_size=arguments.batch_size))
@@ -0,0 +1,112 @@
+from argparse import ArgumentParser
+from asyncio import run
+from datetime import datetime
+from ..core.utilities.database import (
+    db,
+    ensure_ledger_collection,
+    ledger_collection_name,
+    ledger_time_series_options,
+)
+
+
+async def copy_batch(target, batch: list[dict]) -> int:
+    # time-series collections do not enforce a unique _id, so rows an
+    # earlier run already copied are left out instead of duplicated
+    copied_ids = {
+        document["_id"]
+        async for document in target.find(
+            filter={"_id": {"$in": [row["_id"] for row in batch]}},
+            projection={"_id": 1},
+        )
+    }
+    batch = [
+        document for document in batch if document["_id"] not in copied_ids
+    ]
+
+    if batch:
+        await target.insert_many(batch, ordered=False)
+
+    return len(batch)
+
+
+async def copy_ledger(name: str, batch_size: int, full: bool = False) -> int:
+    source = db[ledger_collection_name(name=name, mode="standard")]
+    target = db[ledger_collection_name(name=name, mode="timeseries")]
+
+    await ensure_ledger_collection(name=name, mode="timeseries")
+
+    time_field = ledger_time_series_options[name]["timeField"]
+    filter = {}
+
+    # resume after the newest row copied so far, a full run re-checks every
+    # row and also picks up rows inserted out of _id order
+    if not full:
+        last_copied = await target.find_one(
+            filter={}, projection={"_id": 1}, sort=[("_id", -1)]
+        )
+
+        if last_copied:
+            filter["_id"] = {"$gt": last_copied["_id"]}
+
+    copied_count = 0
+    skipped_count = 0
+    batch = []
+
+    async for document in source.find(
+        filter=filter, sort=[("_id", 1)], batch_size=batch_size
+    ):
+        # a time-series collection rejects rows without a date in its
+        # time field
+        if not isinstance(document.get(time_field), datetime):
+            skipped_count += 1
+            continue
+
+        batch.append(document)
+
+        if len(batch) >= batch_size:
+            copied_count += await copy_batch(target=target, batch=batch)
+            batch = []
+
+    if batch:
+        copied_count += await copy_batch(target=target, batch=batch)
+
+    print(
+        f"copied {copied_count} documents from {source.name} to {target.name}"
+    )
+
+    if skipped_count:
+        print(
+            f"skipped {skipped_count} documents of {source.name} without a "
+            f"date in {time_field}, fix them and run the migration again "
+            "with --full"
+        )
+
+    return copied_count
+
+
+async def migrate(batch_size: int = 1000, full: bool = False):
+    for name in ledger_time_series_options:
+        await copy_ledger(name=name, batch_size=batch_size, full=full)
+
+    print(
+        "the migration can run again at any time and only copies the rows "
+        "written since the last run. stop the api, run it once more, then "
+        "set LEDGER_STORAGE_MODE=timeseries and start the api to serve the "
+        "ledgers from the time-series collections. the standard collections "
+        "are left untouched and can be dropped once verified."
+    )
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(
+        description="copy inventory ledgers into time-series collections"
+    )
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="check every row instead of resuming after the last copied one",
+    )
+    arguments = parser.parse_args()
+
+    run(migrate(batch_size=arguments.batch_size, full=arguments.full))
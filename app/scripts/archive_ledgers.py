@@ -0,0 +1,74 @@
+from argparse import ArgumentParser
+from asyncio import run
+from datetime import datetime, timedelta
+from ..core.utilities.archive import (
+    is_archive_enabled,
+    ledger_archive_schemas,
+    month_start,
+    next_month,
+    read_segment,
+    write_segment,
+)
+from ..core.utilities.database import db, ledger_collection_name
+
+
+async def archive_ledger(ledger: str, cutoff: datetime) -> int:
+    collection = db[ledger_collection_name(name=ledger)]
+    time_field = ledger_archive_schemas[ledger]["time_field"]
+    # only whole months are archived so a segment never has to be reopened
+    cutoff_month = month_start(cutoff)
+    archived_count = 0
+
+    oldest = await collection.find_one(
+        filter={time_field: {"$lt": cutoff_month}},
+        projection={time_field: 1},
+        sort=[(time_field, 1)],
+    )
+    month = month_start(oldest[time_field]) if oldest else cutoff_month
+
+    while month < cutoff_month:
+        documents = await collection.find(
+            filter={time_field: {"$gte": month, "$lt": next_month(month)}}
+        ).to_list(length=None)
+
+        if documents:
+            ids = {document["_id"] for document in documents}
+            write_segment(
+                ledger=ledger,
+                month=month,
+                documents=[
+                    document
+                    for document in read_segment(ledger=ledger, month=month)
+                    if document["_id"] not in ids
+                ]
+                + documents,
+            )
+            await collection.delete_many(filter={"_id": {"$in": list(ids)}})
+            archived_count += len(documents)
+
+            print(f"archived {len(documents)} {ledger} rows for {month:%Y-%m}")
+
+        month = next_month(month)
+
+    return archived_count
+
+
+async def main(cutoff_days: int):
+    if not is_archive_enabled():
+        print("set LEDGER_ARCHIVE_DIR to enable the ledger archive")
+        return
+
+    cutoff = datetime.utcnow() - timedelta(days=cutoff_days)
+
+    for ledger in ledger_archive_schemas:
+        await archive_ledger(ledger=ledger, cutoff=cutoff)
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(
+        description="move old ledger rows from mongodb into the archive"
+    )
+    parser.add_argument("--cutoff-days", type=int, default=365)
+    arguments = parser.parse_args()
+
+    run(main(cutoff_days=arguments.cutoff_days))
@@ -0,0 +1,52 @@
+from argparse import ArgumentParser
+from timeit import repeat
+from starlette.requests import Request
+from ..core.utilities.jwt_config import AuthJWT, verified_token_cache
+
+
+def make_request(token: str) -> Request:
+    return Request(
+        {
+            "type": "http",
+            "method": "GET",
+            "path": "/restaurant/menu/item/",
+            "headers": [(b"authorization", f"Bearer {token}".encode())],
+        }
+    )
+
+
+def authorize(request: Request) -> str:
+    # the same calls EmployeeRoleChecker makes before touching the database
+    Authorize = AuthJWT(req=request)
+    Authorize.jwt_required()
+
+    return Authorize.get_jwt_subject()
+
+
+def run():
+    parser = ArgumentParser()
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=5)
+    arguments = parser.parse_args()
+
+    token = AuthJWT().create_access_token(subject="0" * 24)
+    request = make_request(token=token)
+    cache_size = verified_token_cache.max_entries
+
+    for name, max_entries in (("uncached", 0), ("cached", cache_size)):
+        verified_token_cache.clear()
+        verified_token_cache.max_entries = max_entries
+        seconds = min(
+            repeat(
+                lambda: authorize(request=request),
+                number=arguments.requests,
+                repeat=arguments.repeat,
+            )
+        )
+        print(
+            f"{name}: {seconds / arguments.requests * 1e6:.1f} us per request"
+        )
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,56 @@
+from argparse import ArgumentParser
+from timeit import repeat
+import jwt
+from ..core.utilities.jwt_keys import generate_key
+
+algorithms = ["RS256", "PS256", "ES256", "EdDSA"]
+
+
+def run():
+    parser = ArgumentParser()
+    parser.add_argument("--tokens", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--algorithm", action="append", choices=algorithms)
+    arguments = parser.parse_args()
+
+    claims = {"sub": "0" * 24, "type": "access", "fresh": False}
+
+    for algorithm in arguments.algorithm or algorithms:
+        key = generate_key(algorithm=algorithm)
+        token = jwt.encode(
+            claims,
+            key.private_key,
+            algorithm=algorithm,
+            headers={"kid": key.kid},
+        )
+        sign_seconds = min(
+            repeat(
+                lambda: jwt.encode(
+                    claims,
+                    key.private_key,
+                    algorithm=algorithm,
+                    headers={"kid": key.kid},
+                ),
+                number=arguments.tokens,
+                repeat=arguments.repeat,
+            )
+        )
+        verify_seconds = min(
+            repeat(
+                lambda: jwt.decode(
+                    token, key.public_key, algorithms=[algorithm]
+                ),
+                number=arguments.tokens,
+                repeat=arguments.repeat,
+            )
+        )
+        print(
+            f"{algorithm}: "
+            f"sign {arguments.tokens / sign_seconds:,.0f}/s, "
+            f"verify {arguments.tokens / verify_seconds:,.0f}/s, "
+            f"token {len(token)} bytes"
+        )
+
+
+if __name__ == "__main__":
+    run()
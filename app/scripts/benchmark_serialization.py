@@ -0,0 +1,82 @@
+from argparse import ArgumentParser
+from datetime import datetime
+from timeit import repeat
+from bson.objectid import ObjectId
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from ..core.utilities.converter import dict_to_model
+from ..core.utilities.responses import model_response
+from ..features.inventory.item import models
+
+
+def make_items(count: int) -> list[dict]:
+    now = datetime.utcnow()
+
+    return [
+        {
+            "_id": ObjectId(),
+            "name": f"item {i}",
+            "group": str(ObjectId()),
+            "unit": "kg",
+            "quantity": i * 1.5,
+            "minimum_quantity": 10.0,
+            "average_life_expectancy": 30.0,
+            "cost": 12.75,
+            "is_running_low": i % 7 == 0,
+            "created_at": now,
+            "created_by": str(ObjectId()),
+            "updated_at": now,
+            "updated_by": str(ObjectId()),
+        }
+        for i in range(count)
+    ]
+
+
+def build_response_model(items: list[dict]):
+    return models.MultipleItemsResponseModel(
+        success=True,
+        items=[
+            dict_to_model(model=models.ItemReadModel, dict_model=item)
+            for item in items
+        ],
+    )
+
+
+def stdlib_response(items: list[dict]) -> bytes:
+    # what fastapi does for a plain return value with a response_model
+    response = build_response_model(items=items)
+    validated = models.MultipleItemsResponseModel.validate(
+        response.dict(by_alias=True)
+    )
+
+    return JSONResponse(
+        content=jsonable_encoder(validated, by_alias=True)
+    ).body
+
+
+def orjson_response(items: list[dict]) -> bytes:
+    return model_response(build_response_model(items=items)).body
+
+
+def main(count: int, rounds: int):
+    items = make_items(count=count)
+
+    assert stdlib_response(items) == orjson_response(items)
+
+    for name, serializer in (
+        ("jsonable_encoder + json", stdlib_response),
+        ("model_response + orjson", orjson_response),
+    ):
+        best = min(repeat(lambda: serializer(items), number=1, repeat=rounds))
+        print(f"{name:<26} {best * 1000:8.2f} ms per {count} items")
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(
+        description="time list response serialization for inventory items"
+    )
+    parser.add_argument("--count", type=int, default=1000)
+    parser.add_argument("--rounds", type=int, default=20)
+    arguments = parser.parse_args()
+
+    main(count=arguments.count, rounds=arguments.rounds)
@@ -0,0 +1,91 @@
+from argparse import ArgumentParser
+from statistics import median
+from time import perf_counter
+from ..core.utilities.password import (
+    PASSWORD_ARGON2_PARALLELISM,
+    PASSWORD_ARGON2_TIME_COST,
+    create_password_context,
+)
+
+
+def verify_milliseconds(context, samples: int) -> float:
+    hashed_password = context.hash("calibration")
+    timings = []
+
+    for _ in range(samples):
+        started_at = perf_counter()
+        context.verify("calibration", hashed_password)
+        timings.append((perf_counter() - started_at) * 1000)
+
+    return median(timings)
+
+
+def calibrate_bcrypt(target: float, samples: int) -> dict:
+    chosen = {"PASSWORD_BCRYPT_ROUNDS": 4}
+
+    # each extra round doubles the cost
+    for rounds in range(4, 32):
+        milliseconds = verify_milliseconds(
+            create_password_context(scheme="bcrypt", bcrypt_rounds=rounds),
+            samples=samples,
+        )
+        print(f"bcrypt rounds={rounds}: {milliseconds:.1f} ms")
+
+        if milliseconds > target:
+            break
+
+        chosen = {"PASSWORD_BCRYPT_ROUNDS": rounds}
+
+    return chosen
+
+
+def calibrate_argon2(target: float, samples: int) -> dict:
+    memory_cost = 8192
+    chosen = {"PASSWORD_ARGON2_MEMORY_COST": memory_cost}
+
+    # time cost and parallelism stay as configured, memory is what makes
+    # argon2 expensive to attack on GPUs
+    while memory_cost <= 4194304:
+        milliseconds = verify_milliseconds(
+            create_password_context(
+                scheme="argon2",
+                argon2_time_cost=PASSWORD_ARGON2_TIME_COST,
+                argon2_memory_cost=memory_cost,
+                argon2_parallelism=PASSWORD_ARGON2_PARALLELISM,
+            ),
+            samples=samples,
+        )
+        print(f"argon2 memory_cost={memory_cost} KiB: {milliseconds:.1f} ms")
+
+        if milliseconds > target:
+            break
+
+        chosen = {"PASSWORD_ARGON2_MEMORY_COST": memory_cost}
+        memory_cost *= 2
+
+    return chosen
+
+
+def run():
+    parser = ArgumentParser()
+    parser.add_argument(
+        "--scheme", choices=["bcrypt", "argon2"], default="bcrypt"
+    )
+    parser.add_argument("--target-ms", type=float, default=250)
+    parser.add_argument("--samples", type=int, default=5)
+    arguments = parser.parse_args()
+
+    calibrate = (
+        calibrate_argon2 if arguments.scheme == "argon2" else calibrate_bcrypt
+    )
+    chosen = calibrate(target=arguments.target_ms, samples=arguments.samples)
+
+    print()
+    print(f"PASSWORD_SCHEME={arguments.scheme}")
+
+    for name, value in chosen.items():
+        print(f"{name}={value}")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,68 @@
+from argparse import ArgumentParser
+from asyncio import run as run_async, sleep
+from time import perf_counter
+from ..core.utilities.database import db
+from ..core.utilities.invalidation import InvalidationBus
+from ..core.utilities.reference_cache import ReferenceCache
+
+# needs a replica set, a single node one is enough:
+#   mongod --replSet rs0 && mongosh --eval "rs.initiate()"
+
+
+async def wait_until(condition, timeout: float) -> float:
+    started_at = perf_counter()
+
+    while not condition():
+        if perf_counter() - started_at > timeout:
+            raise TimeoutError("no invalidation event arrived in time")
+
+        await sleep(0.01)
+
+    return perf_counter() - started_at
+
+
+async def check(collection: str, timeout: float):
+    cache = ReferenceCache(collection=collection, enabled=True)
+    bus = InvalidationBus(consumer="check_invalidation")
+    bus.subscribe(collection=collection, listener=cache.invalidate)
+    await bus.clear_resume_token()
+    bus.start()
+
+    try:
+        await sleep(0.5)
+        inserted = await db[collection].insert_one({"name": "check"})
+        id = str(inserted.inserted_id)
+        seconds = await wait_until(lambda: id in cache, timeout=timeout)
+        print(f"insert seen after {seconds * 1000:.1f} ms")
+
+        await db[collection].update_one(
+            {"_id": inserted.inserted_id}, {"$set": {"name": "checked"}}
+        )
+        seconds = await wait_until(
+            lambda: cache.documents.get(id, {}).get("name") == "checked", timeout=timeout
+        )
+        print(f"update seen after {seconds * 1000:.1f} ms")
+
+        await db[collection].delete_one({"_id": inserted.inserted_id})
+        seconds = await wait_until(lambda: id not in cache, timeout=timeout)
+        print(f"delete seen after {seconds * 1000:.1f} ms")
+    finally:
+        await bus.stop()
+        await bus.clear_resume_token()
+        await db[collection].delete_many(
+            {"name": {"$in": ["check", "checked"]}}
+        )
+
+
+def run():
+    parser = ArgumentParser()
+    parser.add_argument("--collection", default="check_invalidation")
+    parser.add_argument("--timeout", type=float, default=5)
+    arguments = parser.parse_args()
+    run_async(
+        check(collection=arguments.collection, timeout=arguments.timeout)
+    )
+
+
+if __name__ == "__main__":
+    run()
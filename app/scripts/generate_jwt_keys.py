@@ -0,0 +1,24 @@
+from argparse import ArgumentParser
+from ..core.utilities.jwt_keys import encode_pem, generate_key
+
+
+def run():
+    parser = ArgumentParser()
+    parser.add_argument(
+        "--algorithm",
+        default="EdDSA",
+        choices=["RS256", "PS256", "ES256", "ES384", "ES512", "EdDSA"],
+    )
+    arguments = parser.parse_args()
+
+    key = generate_key(algorithm=arguments.algorithm)
+    # to rotate, move the current JWT_PUBLIC_KEY into JWT_PREVIOUS_PUBLIC_KEYS
+    # and keep it there until the refresh tokens it signed have expired
+    print(f"JWT_ALGORITHM={key.algorithm}")
+    print(f"JWT_PRIVATE_KEY={encode_pem(key.private_pem())}")
+    print(f"JWT_PUBLIC_KEY={encode_pem(key.public_pem())}")
+    print(f"# kid {key.kid}")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,122 @@
+from asyncio import new_event_loop
+from datetime import datetime, timedelta
+from itertools import product
+from os import environ
+import pytest
+from bson.objectid import ObjectId
+from dotenv import load_dotenv
+from pymongo import MongoClient
+from pymongo.errors import PyMongoError
+
+load_dotenv()
+
+
+def is_mongodb_reachable() -> bool:
+    try:
+        MongoClient(
+            environ.get("MONGODB_URL"), serverSelectionTimeoutMS=1000
+        ).admin.command("ping")
+    except PyMongoError:
+        return False
+
+    return True
+
+
+pytestmark = pytest.mark.skipif(
+    not is_mongodb_reachable(), reason="no MongoDB reachable at MONGODB_URL"
+)
+
+
+def plan_stages(plan: dict) -> set[str]:
+    stages = {plan.get("stage")}
+
+    for child in plan.get("inputStages", []):
+        stages |= plan_stages(child)
+
+    if "inputStage" in plan:
+        stages |= plan_stages(plan["inputStage"])
+
+    return stages
+
+
+def filter_combinations(
+    by_field: str, time_field: str
+) -> list[dict[str, object]]:
+    now = datetime.utcnow()
+    values = {
+        "item": str(ObjectId()),
+        by_field: str(ObjectId()),
+        f"{time_field}_from": now - timedelta(days=30),
+        f"{time_field}_to": now,
+    }
+
+    return [
+        {
+            key: value
+            for (key, value), used in zip(values.items(), mask)
+            if used
+        }
+        for mask in product([False, True], repeat=len(values))
+        if any(mask)
+    ]
+
+
+@pytest.fixture(scope="module")
+def loop():
+    # motor binds its client to the first loop it runs on
+    event_loop = new_event_loop()
+    yield event_loop
+    event_loop.close()
+
+
+async def explain_collection(
+    collection: str, controller, by_field: str, time_field: str
+) -> list[tuple[list[str], set[str]]]:
+    from app.core.utilities.database import db
+
+    await controller.create_indexes()
+    collection_scans = []
+
+    for arguments in filter_combinations(by_field, time_field):
+        filter = controller.get_processed_filter(**arguments)
+        explanation = await db[collection].find(filter=filter).explain()
+        stages = plan_stages(explanation["queryPlanner"]["winningPlan"])
+
+        if "IXSCAN" not in stages or "COLLSCAN" in stages:
+            collection_scans.append((sorted(arguments), stages))
+
+    return collection_scans
+
+
+def test_issue_filters_use_indexes(loop):
+    from app.core.utilities.database import issues_collection
+    from app.features.inventory.issue import controller
+
+    assert (
+        loop.run_until_complete(
+            explain_collection(
+                collection=issues_collection,
+                controller=controller,
+                by_field="issued_by",
+                time_field="issued_at",
+            )
+        )
+        == []
+    )
+
+
+def test_purchase_filters_use_indexes(loop):
+    from app.core.utilities.database import purchases_collection
+    from app.features.inventory.purchase import controller
+
+    assert (
+        loop.run_until_complete(
+            explain_collection(
+                collection=purchases_collection,
+                controller=controller,
+                by_field="purchased_by",
+                time_field="purchased_at",
+            )
+        )
+        == []
+    )
@@ -0,0 +1,87 @@
+from asyncio import new_event_loop
+from datetime import datetime
+import pytest
+from bson.objectid import ObjectId
+
+
+@pytest.fixture
+def report_controller(monkeypatch):
+    from app.core.utilities.unit_registry import unit_registry
+    from app.features.inventory.report import controller
+
+    monkeypatch.setattr(unit_registry, "custom_units", {})
+    async def archived_totals(**arguments) -> dict:
+        return {}
+
+    async def sync_unit_registry(*units, item=None):
+        pass
+
+    monkeypatch.setattr(controller, "archived_totals", archived_totals)
+    monkeypatch.setattr(controller, "sync_unit_registry", sync_unit_registry)
+
+    return controller
+
+
+def run_ledger_totals(controller, monkeypatch, totals: list[dict]):
+    async def aggregate(**arguments) -> list[dict]:
+        return totals
+
+    monkeypatch.setattr(controller, "aggregate", aggregate)
+    loop = new_event_loop()
+
+    try:
+        return loop.run_until_complete(
+            controller.ledger_totals(
+                ledger="inventory_issues",
+                collection="inventory_issues",
+                time_field="issued_at",
+                money_field="cost",
+                period="day",
+            )
+        )
+    finally:
+        loop.close()
+
+
+def test_ledger_totals_converts_built_in_and_custom_units(
+    report_controller, monkeypatch
+):
+    from app.core.utilities.unit_registry import unit_registry
+
+    crate_item = str(ObjectId())
+    kg_item = str(ObjectId())
+    unit_registry.load(
+        units=[
+            {"item": crate_item, "name": "Crate", "unit": "kg", "amount": 20}
+        ]
+    )
+    period = datetime(2024, 1, 1)
+
+    totals = run_ledger_totals(
+        report_controller,
+        monkeypatch,
+        [
+            {
+                "item": kg_item,
+                "unit": "kg",
+                "period": period,
+                "base_amount": 5000.0,
+                "cost": 10.0,
+                "count": 2,
+            },
+            {
+                "item": crate_item,
+                "unit": "crate",
+                "period": period,
+                "base_amount": 60000.0,
+                "cost": 30.0,
+                "count": 3,
+            },
+        ],
+    )
+
+    assert [(total["item"], total["amount"]) for total in totals] == [
+        (kg_item, 5.0),
+        (crate_item, 3.0),
+    ]
+    assert all("base_amount" not in total for total in totals)